@@ -1,6 +1,9 @@
 from django.contrib import admin
 
-from .models import Service, Box, Washer, Client, Booking
+from .forms import BookingAdminForm
+from .models import Service, Box, Washer, Client, Booking, ArchivedBooking
+from .search import client_search_q, search_clients
+from .services import save_booking
 
 
 @admin.register(Service)
@@ -21,6 +24,7 @@ class BoxAdmin(admin.ModelAdmin):
 @admin.register(Washer)
 class WasherAdmin(admin.ModelAdmin):
     list_display = ["get_full_name", "phone", "is_active", "created_at"]
+    list_select_related = ["user"]
     list_filter = ["is_active", "created_at"]
     search_fields = [
         "user__first_name",
@@ -50,9 +54,16 @@ class ClientAdmin(admin.ModelAdmin):
     search_fields = ["name", "phone"]
     list_editable = ["is_regular", "discount_percent"]
 
+    def get_search_results(self, request, queryset, search_term):
+        # Индексированный поиск вместо icontains по search_fields
+        if not search_term:
+            return queryset, False
+        return queryset.filter(client_search_q(search_term)), False
+
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
+    form = BookingAdminForm
     list_display = [
         "client",
         "scheduled_time",
@@ -62,6 +73,7 @@ class BookingAdmin(admin.ModelAdmin):
         "final_price",
         "created_at",
     ]
+    list_select_related = ["client", "box", "washer__user"]
     list_filter = ["status", "box", "created_at", "scheduled_time"]
     search_fields = ["client__name", "client__phone"]
     date_hierarchy = "scheduled_time"
@@ -99,22 +111,59 @@ class BookingAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.filter(client__in=search_clients(search_term)), False
+
     def save_model(self, request, obj, form, change):
-        if not change:  # Если создается новая запись
-            obj.created_by = request.user
-        # Валидация выполняется через clean() метод формы
-        super().save_model(request, obj, form, change)
+        # Цена считается по выбранным услугам, а запись и ее услуги
+        # сохраняются одной транзакцией
+        save_booking(
+            obj,
+            form.cleaned_data["services"],
+            created_by=None if change else request.user,
+        )
 
     def save_related(self, request, form, formsets, change):
-        """Пересчитываем цену после сохранения связанных объектов (услуг)"""  # noqa: E501
-        super().save_related(request, form, formsets, change)
-        obj = form.instance
-        if obj.pk:  # Если объект сохранен
-            # Пересчитываем цену
-            # (учитываются услуги и клиент со скидкой)
-            obj.calculate_price()
-            Booking.objects.filter(pk=obj.pk).update(
-                base_price=obj.base_price,
-                discount_amount=obj.discount_amount,
-                final_price=obj.final_price,
-            )
+        """Услуги уже сохранены в save_model, сохраняем только формсеты"""
+        for formset in formsets:
+            self.save_formset(request, form, formset, change=change)
+
+
+@admin.register(ArchivedBooking)
+class ArchivedBookingAdmin(admin.ModelAdmin):
+    """Архивные записи только для просмотра (переносит archive_bookings).
+
+    Удаление тоже запрещено: сводки сохраняют вклад архивных записей,
+    и после удаления отчеты разошлись бы с rollups.rebuild().
+    """
+
+    list_display = [
+        "client",
+        "scheduled_time",
+        "box",
+        "washer",
+        "status",
+        "final_price",
+        "archived_at",
+    ]
+    list_select_related = ["client", "box", "washer__user"]
+    list_filter = ["status", "box", "scheduled_time"]
+    search_fields = ["client__name", "client__phone"]
+    date_hierarchy = "scheduled_time"
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.filter(client__in=search_clients(search_term)), False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        # Вклад архивных записей остается в сводках DailyBookingStats
+        return False
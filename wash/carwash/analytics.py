@@ -0,0 +1,132 @@
+"""Загрузка боксов по 15-минутным интервалам (NumPy).
+
+Записи за период (вместе с архивными) загружаются одним запросом
+в компактные массивы (индекс бокса, начало, окончание в секундах),
+после чего матрица бокс x интервал строится разностным массивом: +1
+в интервале начала записи, -1 в интервале после ее окончания
+(np.add.at) и накопленная сумма по строкам. Время не зависит от длины
+записей, а проход по записям в Python нужен только для перевода дат
+в числа.
+
+Интервалы отсчитываются от местной полуночи каждого дня, в сутках
+всегда SLOTS_PER_DAY интервалов: при переходе на летнее время лишний
+час приходится на последний интервал суток.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+
+from .availability import day_bounds
+from .models import ArchivedBooking, Booking, Box
+
+BIN_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // BIN_MINUTES
+
+# Отмененные записи бокс не занимают
+STATUSES = ["pending", "in_progress", "completed"]
+
+
+def load_intervals(date_from, date_to, boxes):
+    """Записи боксов boxes за даты [date_from, date_to].
+
+    Возвращает массивы (индекс бокса в boxes, начало, окончание),
+    время - в секундах эпохи Unix.
+    """
+    start = day_bounds(date_from)[0]
+    end = day_bounds(date_to)[1]
+    positions = {box.pk: i for i, box in enumerate(boxes)}
+    # Текущие и архивные записи (archive.py) - одним запросом
+    rows = [
+        model.objects.filter(
+            box__in=list(positions),
+            status__in=STATUSES,
+            scheduled_time__lt=end,
+            end_time__gt=start,
+        )
+        .order_by()
+        .values_list("box_id", "scheduled_time", "end_time")
+        for model in (Booking, ArchivedBooking)
+    ]
+    rows = rows[0].union(rows[1], all=True)
+
+    box_index, starts, ends = [], [], []
+    for box_id, booking_start, booking_end in rows.iterator(chunk_size=5000):
+        box_index.append(positions[box_id])
+        starts.append(booking_start.timestamp())
+        ends.append(booking_end.timestamp())
+    return (
+        np.array(box_index, dtype=np.int32),
+        np.array(starts, dtype=np.float64),
+        np.array(ends, dtype=np.float64),
+    )
+
+
+def _slot_index(moments, day_starts):
+    """Номер 15-минутного интервала периода для моментов moments"""
+    day = np.searchsorted(day_starts, moments, side="right") - 1
+    offset = (moments - day_starts[np.clip(day, 0, None)]) // (BIN_MINUTES * 60)
+    offset = np.clip(offset, 0, SLOTS_PER_DAY - 1).astype(np.int64)
+    return day * SLOTS_PER_DAY + offset
+
+
+def occupancy_matrix(box_index, starts, ends, box_count, day_starts):
+    """Матрица бокс x интервал: число записей, занимающих интервал.
+
+    day_starts - местные полуночи дней периода в секундах эпохи.
+    Запись занимает интервал, если пересекается с ним хотя бы частично.
+    """
+    total = len(day_starts) * SLOTS_PER_DAY
+    first = np.clip(_slot_index(starts, day_starts), 0, total)
+    # Последний занятый интервал - тот, где запись еще идет
+    last = _slot_index(np.nextafter(ends, -np.inf), day_starts)
+    last = np.clip(last, -1, total - 1)
+    diff = np.zeros((box_count, total + 1), dtype=np.int32)
+    np.add.at(diff, (box_index, first), 1)
+    np.add.at(diff, (box_index, last + 1), -1)
+    return np.cumsum(diff[:, :total], axis=1, dtype=np.int32)
+
+
+def weekday_profile(matrix, date_from):
+    """Доля дней, когда бокс занят: бокс x день недели x интервал суток"""
+    box_count = matrix.shape[0]
+    days = matrix.shape[1] // SLOTS_PER_DAY
+    busy = (matrix > 0).reshape(box_count, days, SLOTS_PER_DAY)
+    weekdays = (date_from.weekday() + np.arange(days)) % 7
+
+    totals = np.zeros((box_count, 7, SLOTS_PER_DAY), dtype=np.int64)
+    np.add.at(totals, (slice(None), weekdays), busy)
+    counts = np.bincount(weekdays, minlength=7)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        profile = totals / counts[None, :, None]
+    return np.nan_to_num(profile)
+
+
+def occupancy(date_from, date_to):
+    """Загрузка активных боксов за даты [date_from, date_to]"""
+    boxes = list(Box.objects.filter(is_active=True))
+    days = (date_to - date_from).days + 1
+    day_starts = np.array(
+        [
+            day_bounds(date_from + timedelta(days=i))[0].timestamp()
+            for i in range(days)
+        ]
+    )
+    box_index, starts, ends = load_intervals(date_from, date_to, boxes)
+    matrix = occupancy_matrix(box_index, starts, ends, len(boxes), day_starts)
+    profile = weekday_profile(matrix, date_from)
+    return {
+        "boxes": boxes,
+        "matrix": matrix,
+        "profile": profile,
+        # Доля занятых боксов: день недели x интервал суток
+        "saturation": profile.mean(axis=0) if boxes else profile.sum(axis=0),
+    }
+
+
+def slot_labels():
+    """Подписи интервалов суток: "00:00", "00:15", ..."""
+    return [
+        f"{minutes // 60:02d}:{minutes % 60:02d}"
+        for minutes in range(0, 24 * 60, BIN_MINUTES)
+    ]
@@ -0,0 +1,115 @@
+"""Перенос завершенных записей в архив (ArchivedBooking).
+
+Завершенные и отмененные записи, закончившиеся раньше заданного
+момента, переносятся пакетами: на пакет - выборка строк, bulk_create
+архивных записей и их услуг и удаление исходных строк, все в одной
+транзакции. Номера записей сохраняются, поэтому ссылки на них
+продолжают работать (booking_detail ищет запись и в архиве).
+
+Сводки DailyBookingStats при переносе не меняются: вклад записи
+остается в них, а rollups.rebuild() учитывает обе таблицы.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .availability import day_bounds
+from .models import ArchivedBooking, Booking
+
+BATCH_SIZE = 1000
+
+# Статусы записей, которые больше не меняются
+FINISHED_STATUSES = ["completed", "cancelled"]
+
+# Поля, копируемые в архив (по attname)
+FIELDS = [
+    "id",
+    "client_id",
+    "box_id",
+    "washer_id",
+    "scheduled_time",
+    "duration_minutes",
+    "end_time",
+    "status",
+    "base_price",
+    "discount_amount",
+    "final_price",
+    "created_at",
+    "updated_at",
+    "created_by_id",
+    "notes",
+]
+
+
+def archive_cutoff(days):
+    """Начало местных суток days дней назад: граница переноса"""
+    return day_bounds(timezone.localdate() - timedelta(days=days))[0]
+
+
+def archivable(before):
+    """Записи, которые можно перенести: закончились раньше before"""
+    return Booking.objects.filter(
+        status__in=FINISHED_STATUSES, end_time__lt=before
+    )
+
+
+def _archive_batch(pks):
+    through = Booking.services.through
+    archived_through = ArchivedBooking.services.through
+    rows = Booking.objects.filter(pk__in=pks).values(*FIELDS)
+    ArchivedBooking.objects.bulk_create(ArchivedBooking(**row) for row in rows)
+    links = through.objects.filter(booking_id__in=pks)
+    archived_through.objects.bulk_create(
+        archived_through(archivedbooking_id=booking_id, service_id=service_id)
+        for booking_id, service_id in links.values_list(
+            "booking_id", "service_id"
+        )
+    )
+    links.delete()
+    _delete_moved(pks)
+
+
+def _delete_moved(pks):
+    """Удаляет перенесенные записи одним DELETE, без сигналов.
+
+    QuerySet.delete() отправил бы post_delete на каждую запись: сигналы
+    вычли бы записи из сводок и опубликовали события об удалении, а
+    записи лишь переехали. Публичного удаления без сигналов в Django
+    нет, поэтому вызывается внутренний QuerySet._raw_delete (им же
+    delete() удаляет строки без обработчиков). Каскадов он не выполняет:
+    кроме связей с услугами (они уже удалены), на Booking ничего не
+    ссылается, и это проверяет BookingArchiveTests.
+    """
+    Booking.objects.filter(pk__in=pks)._raw_delete(Booking.objects.db)
+
+
+def archive_bookings(before, batch_size=BATCH_SIZE, log=None):
+    """Переносит записи archivable(before) в архив; возвращает их число.
+
+    Каждый пакет - отдельная транзакция, поэтому прерванный перенос
+    можно просто запустить снова.
+    """
+    log = log or (lambda message: None)
+    queryset = archivable(before).order_by("pk").values_list("pk", flat=True)
+    moved = 0
+    while True:
+        with transaction.atomic():
+            pks = list(queryset[:batch_size])
+            if not pks:
+                break
+            _archive_batch(pks)
+        moved += len(pks)
+        log(f"Перенесено записей: {moved}")
+    return moved
+
+
+def find_booking(queryset, archived_queryset, pk):
+    """Запись pk из queryset, а если ее нет - из архива (или None)"""
+    for source in (queryset, archived_queryset):
+        try:
+            return source.get(pk=pk)
+        except source.model.DoesNotExist:
+            pass
+    return None
@@ -0,0 +1,93 @@
+"""Асинхронные варианты страниц только для чтения.
+
+Подключаются при запуске под ASGI (см. wash/asgi.py и wash/asgi_urls.py)
+и обращаются к БД и кешу только через асинхронный API, поэтому не
+занимают поток на время запроса. Логика страниц общая с views.py.
+"""
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.shortcuts import render
+from django.utils import timezone
+
+from .models import Service
+from .pricing import price_table
+from .views import (
+    PRICE_LIST_STATE,
+    _render_price_list,
+    active_services,
+    dashboard_cache_key,
+    dashboard_context,
+    dashboard_queries,
+    price_list_cache_key,
+    price_list_entry,
+    price_list_is_personal,
+    price_list_response,
+    price_list_version,
+    price_quotes,
+)
+
+
+async def _auser(request):
+    """Загружает пользователя асинхронно, чтобы шаблоны и контекстные
+    процессоры не обращались к БД синхронно"""
+    request.user = await request.auser()
+    return request.user
+
+
+async def price_list(request):
+    """Публичная страница с прайс-листом услуг (см. views.price_list)"""
+    user = await _auser(request)
+    if price_list_is_personal(request, user):
+        services = [service async for service in active_services()]
+        return _render_price_list(request, services)
+
+    state = await Service.objects.aaggregate(**PRICE_LIST_STATE)
+    version = price_list_version(state)
+    key = price_list_cache_key(version)
+    entry = await cache.aget(key)
+    if entry is None:
+        services = [service async for service in active_services()]
+        entry = price_list_entry(
+            version,
+            _render_price_list(request, services).content,
+            state["last_modified"],
+        )
+        await cache.aset(key, entry, settings.PRICE_LIST_CACHE_SECONDS)
+    return price_list_response(request, entry)
+
+
+@login_required
+async def calculate_price(request):
+    """API для расчета стоимости услуг (см. views.calculate_price)"""
+    if request.method == "GET":
+        prices = await price_table.aprices()
+        return JsonResponse(price_quotes(request, prices))
+
+    return JsonResponse({"error": "Invalid request"}, status=400)
+
+
+@login_required
+async def dashboard(request):
+    """Панель управления администратора (см. views.dashboard)"""
+    await _auser(request)
+    today = timezone.localdate()
+    key = dashboard_cache_key(today)
+    context = await cache.aget(key)
+    if context is None:
+        bookings, counters, boxes, washers, today_bookings, pending = (
+            dashboard_queries(today)
+        )
+        context = dashboard_context(
+            await bookings.aaggregate(**counters),
+            await boxes.acount(),
+            await washers.acount(),
+            [booking async for booking in today_bookings],
+            [booking async for booking in pending],
+        )
+        await cache.aset(key, context, settings.DASHBOARD_CACHE_SECONDS)
+    return render(
+        request, "carwash/dashboard.html", {**context, "today": today}
+    )
@@ -0,0 +1,284 @@
+"""Индекс занятости боксов и мойщиков в памяти процесса.
+
+Для каждого дня (по местному времени) индекс лениво загружает активные
+записи одним запросом и хранит по каждому боксу и мойщику отсортированный
+список интервалов. Проверка пересечения выполняется бинарным поиском
+без обращения к БД.
+
+Актуальность поддерживается двумя способами:
+- сигналы post_save/post_delete модели Booking обновляют загруженные дни
+  сразу после фиксации транзакции (изменения в текущем процессе);
+- не чаще раза в AVAILABILITY_VERSION_TTL секунд версия дня сверяется
+  с БД (количество активных записей и максимальный updated_at), что
+  позволяет увидеть изменения, сделанные другими процессами.
+Индекс может отставать от БД на время TTL, поэтому по нему проверяет
+только форма записи (BookingForm); окончательная проверка по БД после
+блокировки бокса и мойщика выполняется при сохранении (save_booking).
+
+В памяти хранится не больше AVAILABILITY_MAX_DAYS дней: давно не
+использованные дни вытесняются, а прошедшие (кроме вчерашнего) не
+хранятся вовсе.
+"""
+
+import bisect
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta
+from datetime import time as dtime
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import ACTIVE_STATUSES, Booking
+
+# Интервал занятости; совместим с Booking.conflict_message
+Interval = namedtuple("Interval", ["pk", "scheduled_time", "end_time"])
+
+
+def _version_ttl():
+    return getattr(settings, "AVAILABILITY_VERSION_TTL", 2)
+
+
+def _max_days():
+    return getattr(settings, "AVAILABILITY_MAX_DAYS", 62)
+
+
+def day_bounds(day):
+    """Границы местных суток [начало, конец) в виде aware datetime"""
+    start = timezone.make_aware(datetime.combine(day, dtime.min))
+    end = timezone.make_aware(
+        datetime.combine(day + timedelta(days=1), dtime.min)
+    )
+    return start, end
+
+
+def days_between(start, end):
+    """Местные даты, которые затрагивает интервал [start, end)"""
+    day = timezone.localtime(start).date()
+    last = timezone.localtime(end - timedelta(microseconds=1)).date()
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+class Timeline:
+    """Отсортированный по началу список интервалов одного ресурса.
+
+    max_ends[i] - максимальное окончание среди первых i + 1 интервалов;
+    последовательность неубывающая, поэтому первый пересекающийся
+    интервал находится бинарным поиском даже если в данных уже есть
+    наложения.
+    """
+
+    __slots__ = ("intervals", "starts", "max_ends")
+
+    def __init__(self, intervals=()):
+        self.intervals = sorted(intervals, key=lambda i: (i.scheduled_time, i.pk))
+        self.starts = []
+        self.max_ends = []
+        self._reindex()
+
+    def _reindex(self, start=0):
+        """Пересчитывает starts и max_ends начиная с позиции start"""
+        del self.starts[start:]
+        del self.max_ends[start:]
+        current = self.max_ends[-1] if self.max_ends else None
+        for interval in self.intervals[start:]:
+            if current is None or interval.end_time > current:
+                current = interval.end_time
+            self.starts.append(interval.scheduled_time)
+            self.max_ends.append(current)
+
+    def add(self, interval):
+        key = (interval.scheduled_time, interval.pk)
+        position = bisect.bisect_right(
+            self.intervals, key, key=lambda i: (i.scheduled_time, i.pk)
+        )
+        self.intervals.insert(position, interval)
+        self.starts.insert(position, interval.scheduled_time)
+        previous = self.max_ends[position - 1] if position else None
+        end = interval.end_time
+        self.max_ends.insert(
+            position, end if previous is None or end > previous else previous
+        )
+        # max_ends не убывает: правее меняются только значения меньше end,
+        # и они идут подряд
+        for i in range(position + 1, len(self.max_ends)):
+            if self.max_ends[i] >= end:
+                break
+            self.max_ends[i] = end
+
+    def remove(self, pk):
+        for position, interval in enumerate(self.intervals):
+            if interval.pk == pk:
+                del self.intervals[position]
+                self._reindex(position)
+                return
+
+    def find_conflict(self, start, end, exclude_pk=None):
+        """Первый по времени интервал, пересекающийся с [start, end)"""
+        # Кандидаты - интервалы, начинающиеся раньше end
+        stop = bisect.bisect_left(self.starts, end)
+        # Первый интервал, чье окончание (с учетом предыдущих) позже start
+        index = bisect.bisect_right(self.max_ends, start, hi=stop)
+        for interval in self.intervals[index:stop]:
+            if interval.end_time > start and interval.pk != exclude_pk:
+                return interval
+        return None
+
+
+class _DayWindow:
+    """Загруженные записи одного дня"""
+
+    def __init__(self, day, version, bookings):
+        self.day = day
+        self.version = version
+        self.checked_at = time.monotonic()
+        # pk -> (box_id, washer_id, Interval)
+        self.bookings = {}
+        self.timelines = {}
+        for box_id, washer_id, interval in bookings:
+            self.add(box_id, washer_id, interval)
+
+    def add(self, box_id, washer_id, interval):
+        self.bookings[interval.pk] = (box_id, washer_id, interval)
+        keys = [("box", box_id)]
+        if washer_id:
+            keys.append(("washer", washer_id))
+        for key in keys:
+            timeline = self.timelines.get(key)
+            if timeline is None:
+                self.timelines[key] = Timeline([interval])
+            else:
+                timeline.add(interval)
+
+    def remove(self, pk):
+        entry = self.bookings.pop(pk, None)
+        if entry is None:
+            return
+        box_id, washer_id, interval = entry
+        for key in (("box", box_id), ("washer", washer_id)):
+            timeline = self.timelines.get(key)
+            if timeline is not None:
+                timeline.remove(pk)
+
+
+class AvailabilityIndex:
+    """Индекс занятости ресурсов, общий для всех потоков процесса.
+
+    Блокировка защищает только структуры в памяти: запросы к БД
+    выполняются без нее, чтобы потоки не ждали друг друга.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # Дни в порядке последнего обращения (LRU)
+        self._days = OrderedDict()
+        # Меняется при каждом изменении индекса: день, загрузка которого
+        # началась до изменения, не сохраняется
+        self._generation = 0
+
+    def clear(self):
+        with self._lock:
+            self._days.clear()
+            self._generation += 1
+
+    def _window_queryset(self, day):
+        start, end = day_bounds(day)
+        return Booking.objects.filter(
+            status__in=ACTIVE_STATUSES,
+            scheduled_time__lt=end,
+            end_time__gt=start,
+        )
+
+    def _db_version(self, day):
+        version = self._window_queryset(day).aggregate(
+            count=Count("pk"), updated=Max("updated_at")
+        )
+        return version["count"], version["updated"]
+
+    def _load(self, day):
+        rows = self._window_queryset(day).values_list(
+            "pk", "box_id", "washer_id", "scheduled_time", "end_time",
+            "updated_at",
+        )
+        bookings = []
+        updated = None
+        for pk, box_id, washer_id, start, end, changed in rows:
+            bookings.append((box_id, washer_id, Interval(pk, start, end)))
+            if updated is None or changed > updated:
+                updated = changed
+        return _DayWindow(day, (len(bookings), updated), bookings)
+
+    def _get_day(self, day):
+        with self._lock:
+            window = self._days.get(day)
+            if window is not None:
+                self._days.move_to_end(day)
+                if time.monotonic() - window.checked_at < _version_ttl():
+                    return window
+            generation = self._generation
+
+        if window is not None and self._db_version(day) == window.version:
+            window.checked_at = time.monotonic()
+            return window
+        window = self._load(day)
+        with self._lock:
+            if self._generation == generation:
+                self._store(day, window)
+        return window
+
+    def _store(self, day, window):
+        """Сохраняет день, вытесняя прошедшие и лишние дни"""
+        oldest = timezone.localdate() - timedelta(days=1)
+        for stale in [d for d in self._days if d < oldest]:
+            del self._days[stale]
+        if day < oldest:
+            self._days.pop(day, None)
+            return
+        self._days[day] = window
+        self._days.move_to_end(day)
+        while len(self._days) > _max_days():
+            self._days.popitem(last=False)
+
+    def find_conflict(self, kind, resource_id, start, end, exclude_pk=None):
+        """Первая активная запись ресурса ("box" или "washer"),
+        пересекающаяся с интервалом [start, end), или None"""
+        for day in days_between(start, end):
+            window = self._get_day(day)
+            with self._lock:
+                timeline = window.timelines.get((kind, resource_id))
+                if timeline is None:
+                    continue
+                interval = timeline.find_conflict(start, end, exclude_pk)
+            if interval is not None:
+                return interval
+        return None
+
+    def booking_changed(self, booking):
+        """Обновляет загруженные дни после сохранения записи"""
+        with self._lock:
+            self._generation += 1
+            for window in self._days.values():
+                window.remove(booking.pk)
+            if booking.status not in ACTIVE_STATUSES:
+                return
+            interval = Interval(
+                booking.pk, booking.scheduled_time, booking.end_time
+            )
+            for day in days_between(booking.scheduled_time, booking.end_time):
+                window = self._days.get(day)
+                if window is not None:
+                    window.add(booking.box_id, booking.washer_id, interval)
+
+    def booking_deleted(self, pk):
+        """Удаляет запись из загруженных дней"""
+        with self._lock:
+            self._generation += 1
+            for window in self._days.values():
+                window.remove(pk)
+
+
+index = AvailabilityIndex()
@@ -0,0 +1,179 @@
+"""Замеры горячих путей на синтетических данных разного объема.
+
+measure() заполняет пустую БД набором dataset.generate() и для каждой
+операции сначала считает запросы к БД за один вызов, а затем замеряет
+время серии вызовов (без записи запросов). Результаты - словари,
+пригодные для выгрузки в JSON и сравнения прогонов.
+"""
+
+import statistics
+import time
+from datetime import datetime, timedelta
+from datetime import time as dtime
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import Client as TestClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import availability, dataset, search
+from .forms import BookingForm
+from .models import Booking, Box, Service, Washer
+
+# Наименьшее число дней до сегодняшнего и после него в наборе и число
+# записей на бокс в день
+DAYS_BACK = 90
+DAYS_AHEAD = 14
+BOOKINGS_PER_BOX_DAY = 6
+
+
+def benchmark_db_name():
+    """Имя отдельной БД замеров рядом с рабочей.
+
+    Команда benchmark пересоздает БД с autoclobber, поэтому имя не
+    должно совпадать с тестовой БД, которую может использовать
+    одновременно запущенный manage.py test.
+    """
+    name = connection.settings_dict["NAME"]
+    if connection.vendor == "sqlite":
+        return str(Path(name).with_name("benchmark_db.sqlite3"))
+    return f"benchmark_{name}"
+
+
+def dataset_options(size, seed=0):
+    """Параметры dataset.generate() для size записей.
+
+    Число боксов ограничено вариантами модели Box, поэтому больший
+    объем набирается более длинной историей при той же загрузке дня.
+    """
+    boxes = dataset.MAX_BOXES
+    days = max(
+        DAYS_BACK + DAYS_AHEAD, -(-size // (boxes * BOOKINGS_PER_BOX_DAY))
+    )
+    return {
+        "clients": max(100, size // 5),
+        "washers": boxes,
+        "boxes": boxes,
+        "bookings": size,
+        "days_back": days - DAYS_AHEAD,
+        "days_ahead": DAYS_AHEAD,
+        "seed": seed,
+    }
+
+
+def _timings(operation, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(iterations * 0.95))], 3),
+        "min_ms": round(timings[0], 3),
+    }
+
+
+def _operations():
+    """Операции: {имя: функция без аргументов} на текущих данных"""
+    box = Box.objects.order_by("pk").first()
+    washer = Washer.objects.order_by("pk").first()
+    services = list(Service.objects.filter(is_active=True)[:3])
+    booking = Booking.objects.filter(services__isnull=False).order_by("pk")[0]
+    # Завтра в середине дня - время, на которое уже есть записи
+    start = timezone.make_aware(
+        datetime.combine(timezone.localdate() + timedelta(days=1), dtime(13))
+    )
+    candidate = Booking(
+        box=box, washer=washer, scheduled_time=start, duration_minutes=60
+    )
+
+    def check_box_conflict():
+        try:
+            candidate.check_box_conflict()
+        except ValidationError:
+            pass
+
+    form_data = {
+        "client_name": "Клиент",
+        "client_phone": "+79990000000",
+        "services": [s.pk for s in services],
+        "box": box.pk,
+        "washer": washer.pk,
+        "scheduled_time": timezone.localtime(start).strftime("%Y-%m-%dT%H:%M"),
+        "duration_minutes": 60,
+        "status": "pending",
+    }
+
+    def form_clean():
+        BookingForm(data=form_data).is_valid()
+
+    def calculate_price():
+        # Цена по сохраненным услугам записи, как при пересчете
+        booking.calculate_price()
+
+    admin = User.objects.create_superuser("benchmark", "", None)
+    client = TestClient()
+    client.force_login(admin)
+    list_url = reverse("booking_list")
+    price_url = reverse("calculate_price")
+    price_params = {
+        "services[]": [s.pk for s in services],
+        "combo": ",".join(str(s.pk) for s in services[:2]),
+    }
+
+    def booking_list():
+        response = client.get(list_url)
+        assert response.status_code == 200, response.status_code
+
+    def calculate_price_api():
+        response = client.get(price_url, price_params)
+        assert response.status_code == 200, response.status_code
+
+    return {
+        "check_box_conflict": check_box_conflict,
+        "booking_form_clean": form_clean,
+        "booking_calculate_price": calculate_price,
+        "booking_list": booking_list,
+        "calculate_price_api": calculate_price_api,
+    }
+
+
+def measure(size, iterations=20, seed=0, log=None):
+    """Заполняет пустую БД size записями и замеряет операции"""
+    log = log or (lambda message: None)
+    cache.clear()
+    availability.index.clear()
+    search.autocomplete.clear()
+
+    started = time.perf_counter()
+    dataset.generate(**dataset_options(size, seed))
+    log(f"{size}: данные созданы за {time.perf_counter() - started:.1f} с")
+
+    results = []
+    for name, operation in _operations().items():
+        # Первый вызов прогревает кеши процесса; запросы считаются
+        # по второму, как в установившемся режиме
+        operation()
+        with CaptureQueriesContext(connection) as queries:
+            operation()
+        result = {
+            "size": size,
+            "operation": name,
+            "queries": len(queries),
+            **_timings(operation, iterations),
+        }
+        log(
+            f"{size} {name}: {result['median_ms']} мс, "
+            f"запросов {result['queries']}"
+        )
+        results.append(result)
+    return results
@@ -0,0 +1,6 @@
+from . import events
+
+
+def live_updates(request):
+    """Флаг live_updates: страницам доступен поток событий о записях"""
+    return {"live_updates": events.is_streaming(request)}
@@ -0,0 +1,271 @@
+"""Генерация синтетических данных для профилирования и нагрузочных тестов.
+
+Данные детерминированы: одно и то же зерно в один и тот же день дает
+тот же набор (даты записей отсчитываются от текущего дня). Записи
+раскладываются по дням и боксам последовательно (без наложений),
+а мойщики назначаются по очереди освобождения, поэтому пересечений
+нет ни по боксам, ни по мойщикам. Все таблицы заполняются через
+bulk_create пакетами, сводки строятся одним пересчетом в конце.
+"""
+
+import heapq
+import random
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from . import availability, rollups
+from .models import Booking, Box, Client, Service, Washer
+from .pricing import REGULAR_DISCOUNT_PERCENT
+from .versions import bump_version
+
+BATCH_SIZE = 5000
+
+# Номер бокса и места выбираются из вариантов модели Box
+BOX_PLACES = [
+    (number, place)
+    for number, _ in Box.BOX_NUMBERS
+    for place, _ in Box.PLACE_NUMBERS
+]
+MAX_BOXES = len(BOX_PLACES)
+
+# Часы работы мойки и длительности записей в минутах
+OPEN_HOUR = 8
+CLOSE_HOUR = 22
+DURATIONS = [30, 45, 60, 60, 90, 120]
+WORKDAY = (CLOSE_HOUR - OPEN_HOUR) * 60
+
+SERVICES = [
+    ("Мойка кузова", 500),
+    ("Мойка кузова + сушка", 700),
+    ("Чистка салона", 1000),
+    ("Комплексная мойка", 1500),
+    ("Полировка кузова", 2000),
+]
+
+FIRST_NAMES = [
+    "Александр", "Алексей", "Анна", "Дмитрий", "Екатерина", "Елена",
+    "Иван", "Мария", "Михаил", "Наталья", "Ольга", "Сергей",
+]
+LAST_NAMES = [
+    "Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров",
+    "Соколов", "Михайлов", "Новиков", "Федоров", "Морозов", "Волков",
+]
+
+
+class DatasetError(Exception):
+    """Набор данных нельзя сгенерировать с заданными параметрами"""
+
+
+def _batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _status(rng, start, end, now):
+    """Статус записи по ее времени относительно now"""
+    if end <= now:
+        return "completed" if rng.random() < 0.85 else "cancelled"
+    if start <= now:
+        return "in_progress"
+    return "pending" if rng.random() < 0.9 else "cancelled"
+
+
+def _day_schedule(rng, count):
+    """Начала (минуты от открытия) и длительности count записей бокса за
+    день; записи идут одна за другой, свободное время делится между
+    промежутками случайно"""
+    durations = []
+    for i in range(count):
+        # Оставшимся записям должно хватить времени хотя бы на самую
+        # короткую длительность
+        budget = WORKDAY - sum(durations) - (count - i - 1) * min(DURATIONS)
+        durations.append(rng.choice([d for d in DURATIONS if d <= budget]))
+    slack = (WORKDAY - sum(durations)) // 5
+    cuts = sorted(rng.randint(0, slack) for _ in durations)
+    schedule = []
+    offset = previous_cut = 0
+    for duration, cut in zip(durations, cuts):
+        offset += (cut - previous_cut) * 5
+        previous_cut = cut
+        schedule.append((offset, duration))
+        offset += duration
+    return schedule
+
+
+def _client(rng, index):
+    is_regular = rng.random() < 0.2
+    return Client(
+        name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        phone=f"+79{index:09d}",
+        # bulk_create не вызывает save()
+        phone_digits=f"9{index:09d}",
+        is_regular=is_regular,
+        discount_percent=REGULAR_DISCOUNT_PERCENT if is_regular else 0,
+    )
+
+
+def generate_bookings(rng, count, boxes, washers, clients, days_from, days_to):
+    """Записи (без сохранения) и их услуги: пары (Booking, [id услуг]).
+
+    Записи равномерно делятся между днями [days_from, days_to) от
+    сегодняшнего и боксами; около 10% записей без мойщика.
+    """
+    today = timezone.localdate()
+    now = timezone.now()
+    days = days_to - days_from
+    slots = days * len(boxes)
+    per_slot, extra = divmod(count, slots)
+    services = [(s.pk, s.price) for s in Service.objects.filter(is_active=True)]
+
+    for day_index in range(days):
+        day = today + timedelta(days=days_from + day_index)
+        opening = timezone.make_aware(
+            datetime.combine(day, time(OPEN_HOUR))
+        )
+        bookings = []
+        for box_index, box in enumerate(boxes):
+            wanted = per_slot + (day_index * len(boxes) + box_index < extra)
+            for offset, duration in _day_schedule(rng, wanted):
+                start = opening + timedelta(minutes=offset)
+                bookings.append((start, duration, box))
+
+        # Мойщик - освободившийся раньше всех, если он уже свободен
+        free = [(opening, washer.pk) for washer in washers]
+        heapq.heapify(free)
+        for start, duration, box in sorted(bookings, key=lambda b: b[0]):
+            end = start + timedelta(minutes=duration)
+            washer_id = None
+            if free and free[0][0] <= start and rng.random() < 0.9:
+                washer_id = heapq.heapreplace(free, (end, free[0][1]))[1]
+
+            client = rng.choice(clients)
+            size = min(len(services), rng.choice([1, 1, 2, 3]))
+            chosen = rng.sample(services, size)
+            base_price = sum((price for pk, price in chosen), Decimal(0))
+            discount = (
+                base_price * REGULAR_DISCOUNT_PERCENT / 100
+                if client.is_regular
+                else Decimal(0)
+            )
+            booking = Booking(
+                client_id=client.pk,
+                box_id=box.pk,
+                washer_id=washer_id,
+                scheduled_time=start,
+                duration_minutes=duration,
+                end_time=end,
+                status=_status(rng, start, end, now),
+                base_price=base_price,
+                discount_amount=discount,
+                final_price=base_price - discount,
+            )
+            yield booking, [pk for pk, price in chosen]
+
+
+def generate(
+    clients,
+    washers,
+    boxes,
+    bookings,
+    days_back=180,
+    days_ahead=14,
+    seed=0,
+    batch_size=BATCH_SIZE,
+    log=None,
+):
+    """Создает набор данных в пустой БД; возвращает число записей.
+
+    Записи распределяются по дням [сегодня - days_back,
+    сегодня + days_ahead). log - необязательная функция для сообщений
+    о ходе генерации.
+    """
+    log = log or (lambda message: None)
+    if boxes > MAX_BOXES:
+        raise DatasetError(
+            f"Боксов не больше {MAX_BOXES}: номера боксов и мест "
+            "ограничены вариантами модели Box"
+        )
+    if Booking.objects.exists() or Client.objects.exists():
+        raise DatasetError("В БД уже есть клиенты или записи")
+    if Box.objects.exists() or Washer.objects.exists():
+        raise DatasetError("В БД уже есть боксы или мойщики")
+    days = days_back + days_ahead
+    if days < 1:
+        raise DatasetError("Период генерации пуст")
+    per_box = -(-bookings // (days * boxes))
+    if per_box * min(DURATIONS) > WORKDAY:
+        raise DatasetError(
+            f"На бокс приходится до {per_box} записей в день, а помещается "
+            f"не больше {WORKDAY // min(DURATIONS)}: увеличьте число "
+            "боксов или дней"
+        )
+    rng = random.Random(seed)
+
+    with transaction.atomic():
+        if not Service.objects.filter(is_active=True).exists():
+            Service.objects.bulk_create(
+                Service(name=name, price=price) for name, price in SERVICES
+            )
+
+        box_objects = Box.objects.bulk_create(
+            Box(box_number=number, place_number=place)
+            for number, place in BOX_PLACES[:boxes]
+        )
+        users = User.objects.bulk_create(
+            User(
+                username=f"washer{i}",
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+            )
+            for i in range(washers)
+        )
+        washer_objects = Washer.objects.bulk_create(
+            Washer(user=user, phone=f"+7901{i:07d}")
+            for i, user in enumerate(users)
+        )
+        log(f"Боксов: {boxes}, мойщиков: {washers}")
+
+        client_objects = []
+        rows = (_client(rng, i) for i in range(clients))
+        for batch in _batches(rows, batch_size):
+            client_objects.extend(Client.objects.bulk_create(batch))
+        log(f"Клиентов: {clients}")
+
+        through = Booking.services.through
+        created = 0
+        rows = generate_bookings(
+            rng,
+            bookings,
+            box_objects,
+            washer_objects,
+            client_objects,
+            -days_back,
+            days_ahead,
+        )
+        for batch in _batches(rows, batch_size):
+            saved = Booking.objects.bulk_create([b for b, s in batch])
+            through.objects.bulk_create(
+                through(booking_id=booking.pk, service_id=service_id)
+                for booking, (_, service_ids) in zip(saved, batch)
+                for service_id in service_ids
+            )
+            created += len(saved)
+            log(f"Записей: {created} из {bookings}")
+
+        # bulk_create не вызывает сигналов
+        rollups.rebuild()
+        for name in ("clients", "services"):
+            transaction.on_commit(partial(bump_version, name))
+        transaction.on_commit(availability.index.clear)
+    return created
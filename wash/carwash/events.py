@@ -0,0 +1,191 @@
+"""События об изменении записей для живого обновления страниц (SSE).
+
+Сигналы Booking после фиксации транзакции публикуют событие в брокер
+процесса, а асинхронный поток /bookings/events/ отдает его всем
+подписчикам по одному постоянному соединению. Подписчик - очередь
+asyncio в цикле событий соединения; публикация из потока запроса
+передает событие в нее через call_soon_threadsafe.
+
+Брокер работает в памяти процесса: события видят соединения,
+обслуживаемые тем же процессом (одним ASGI-сервером). Последние
+события хранятся, чтобы переподключившийся клиент (Last-Event-ID)
+получил пропущенное.
+
+Под WSGI постоянное соединение заняло бы рабочий процесс целиком,
+поэтому поток отдается только ASGI-серверу (см. is_streaming).
+"""
+
+import asyncio
+import json
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateformat import format as date_format
+
+
+class Subscription:
+    """Очередь событий одного соединения"""
+
+    def __init__(self, loop, size):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=size)
+        self.overflowed = False
+
+    def push(self, event):
+        # Выполняется в цикле событий соединения
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Клиент не успевает: попросим его перезагрузить страницу
+            self.overflowed = True
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self):
+        """Следующее событие (id, данные) или None при переполнении"""
+        return await self.queue.get()
+
+
+class EventBroker:
+    """Рассылка событий подписчикам, общая для всех потоков процесса"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=settings.BOOKING_EVENTS_HISTORY)
+        self._last_id = 0
+
+    @property
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def publish(self, data):
+        """Отправляет событие всем подписчикам; возвращает его id"""
+        with self._lock:
+            self._last_id += 1
+            event = (self._last_id, data)
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, event)
+            except RuntimeError:
+                # Цикл событий соединения уже закрыт
+                self.unsubscribe(subscription)
+        return event[0]
+
+    def subscribe(self, last_event_id=None):
+        """Подписка для текущего цикла событий; события после
+        last_event_id, если они еще в истории, отдаются сразу"""
+        subscription = Subscription(
+            asyncio.get_running_loop(), settings.BOOKING_EVENTS_QUEUE_SIZE
+        )
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._history:
+                    if event[0] > last_event_id:
+                        subscription.push(event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+broker = EventBroker()
+
+
+def is_streaming(request):
+    """Запрос обслуживает ASGI-сервер, и поток событий ему доступен"""
+    return isinstance(request, ASGIRequest)
+
+
+def format_event(event):
+    """Событие в формате text/event-stream"""
+    event_id, data = event
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"id: {event_id}\nevent: booking\ndata: {payload}\n\n"
+
+
+def _previous(old):
+    if not old:
+        return None
+    scheduled_time = timezone.localtime(old["scheduled_time"])
+    return {
+        "status": old["status"],
+        "scheduled_time": scheduled_time.isoformat(),
+        "date": scheduled_time.date().isoformat(),
+    }
+
+
+def booking_payload(booking, event, old=None):
+    """Данные события о записи: все, что нужно для строки таблицы"""
+    scheduled_time = timezone.localtime(booking.scheduled_time)
+    previous = _previous(old)
+    return {
+        "event": event,
+        "id": booking.pk,
+        "status": booking.status,
+        "status_display": booking.get_status_display(),
+        "status_changed": bool(previous)
+        and previous["status"] != booking.status,
+        "scheduled_time": scheduled_time.isoformat(),
+        "date": scheduled_time.date().isoformat(),
+        "display_time": date_format(scheduled_time, "d.m.Y H:i"),
+        "client_name": booking.client.name,
+        "client_phone": booking.client.phone,
+        # Не из кеша prefetch: услуги могли смениться при сохранении
+        "services": list(booking.services.values_list("name", flat=True)),
+        "box": str(booking.box),
+        "washer": str(booking.washer) if booking.washer_id else None,
+        "final_price": str(booking.final_price),
+        "previous": previous,
+        "urls": {
+            "detail": reverse("booking_detail", args=[booking.pk]),
+            "edit": reverse("booking_edit", args=[booking.pk]),
+            "update_status": reverse("booking_update_status", args=[booking.pk]),
+        },
+    }
+
+
+def booking_saved(booking, created, old=None):
+    """Публикует создание или изменение записи"""
+    if not broker.has_subscribers:
+        # Без подписчиков не тратим запросы на данные события
+        return
+    event = "created" if created else "updated"
+    broker.publish(booking_payload(booking, event, old))
+
+
+def booking_deleted(pk, old):
+    """Публикует удаление записи"""
+    if broker.has_subscribers:
+        broker.publish({"event": "deleted", "id": pk, "previous": _previous(old)})
+
+
+async def stream(subscription):
+    """Поток text/event-stream для подписки; комментарии keepalive
+    не дают прокси закрыть простаивающее соединение"""
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.get(), settings.BOOKING_EVENTS_KEEPALIVE
+                )
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                yield "event: reload\ndata: {}\n\n"
+                return
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,110 @@
+"""Потоковая выгрузка записей в CSV и JSON.
+
+Записи читаются через QuerySet.iterator(chunk_size) - услуги
+подгружаются одним запросом на каждую порцию, - а строки отдаются
+генератором, поэтому расход памяти не зависит от числа записей.
+"""
+
+import csv
+import json
+
+from django.utils import timezone
+
+# Колонки выгрузки: заголовок CSV и ключи JSON
+COLUMNS = [
+    "id",
+    "scheduled_time",
+    "end_time",
+    "duration_minutes",
+    "status",
+    "client_name",
+    "client_phone",
+    "box",
+    "washer",
+    "services",
+    "base_price",
+    "discount_amount",
+    "final_price",
+    "created_at",
+]
+
+CHUNK_SIZE = 2000
+
+
+def export_queryset(queryset):
+    """Записи со всеми связанными данными в порядке id"""
+    return (
+        queryset.select_related("client", "box", "washer__user")
+        .prefetch_related("services")
+        .order_by("pk")
+    )
+
+
+def _datetime(value):
+    return timezone.localtime(value).isoformat() if value else None
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Словари с колонками COLUMNS для каждой записи"""
+    bookings = export_queryset(queryset).iterator(chunk_size=chunk_size)
+    for booking in bookings:
+        yield {
+            "id": booking.pk,
+            "scheduled_time": _datetime(booking.scheduled_time),
+            "end_time": _datetime(booking.end_time),
+            "duration_minutes": booking.duration_minutes,
+            "status": booking.status,
+            "client_name": booking.client.name,
+            "client_phone": booking.client.phone,
+            "box": str(booking.box),
+            "washer": str(booking.washer) if booking.washer else None,
+            "services": [service.name for service in booking.services.all()],
+            # Суммы строками, чтобы не терять точность Decimal
+            "base_price": str(booking.base_price),
+            "discount_amount": str(booking.discount_amount),
+            "final_price": str(booking.final_price),
+            "created_at": _datetime(booking.created_at),
+        }
+
+
+class _Buffer:
+    """Файлоподобный объект, возвращающий записанную строку"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(queryset, chunk_size=CHUNK_SIZE):
+    """Выгрузка в CSV: заголовок, затем строки порциями по chunk_size"""
+    writer = csv.writer(_Buffer())
+    yield writer.writerow(COLUMNS)
+    lines = []
+    for row in export_rows(queryset, chunk_size):
+        row["services"] = "; ".join(row["services"])
+        lines.append(writer.writerow([row[column] for column in COLUMNS]))
+        if len(lines) >= chunk_size:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+def iter_json(queryset, chunk_size=CHUNK_SIZE):
+    """Выгрузка в JSON: массив объектов, по объекту на строку"""
+    yield "["
+    separator = "\n"
+    lines = []
+    for row in export_rows(queryset, chunk_size):
+        lines.append(separator + json.dumps(row, ensure_ascii=False))
+        separator = ",\n"
+        if len(lines) >= chunk_size:
+            yield "".join(lines)
+            lines = []
+    lines.append("\n]\n")
+    yield "".join(lines)
+
+
+FORMATS = {
+    "csv": (iter_csv, "text/csv; charset=utf-8"),
+    "json": (iter_json, "application/json"),
+}
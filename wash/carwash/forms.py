@@ -1,8 +1,8 @@
-from datetime import timedelta
-
 from django import forms
 
-from .models import Booking, Client, Service, Box, Washer
+from . import availability
+from .models import Booking, Service, Box, Washer
+from .services import lock_resources, resolve_client, save_booking_form
 
 
 class BookingForm(forms.ModelForm):
@@ -57,7 +57,9 @@ class BookingForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields["box"].queryset = Box.objects.filter(is_active=True)
-        self.fields["washer"].queryset = Washer.objects.filter(is_active=True)
+        self.fields["washer"].queryset = Washer.objects.filter(
+            is_active=True
+        ).select_related("user")
         self.fields["services"].queryset = Service.objects.filter(
             is_active=True)
 
@@ -100,87 +102,82 @@ class BookingForm(forms.ModelForm):
         if not scheduled_time:
             return cleaned_data
 
-        # Проверка конфликта бокса
-        if box:
-            active_statuses = ["pending", "in_progress"]
-            end_time = scheduled_time + timedelta(minutes=duration_minutes)
-
-            conflicting_bookings = Booking.objects.filter(
-                box=box, status__in=active_statuses
-            ).exclude(pk=self.instance.pk if self.instance.pk else None)
-
-            for booking in conflicting_bookings:
-                booking_end = booking.get_end_time()
-                if booking_end and (
-                    scheduled_time < booking_end and
-                    end_time > booking.scheduled_time
-                ):
-                    start_str = booking.scheduled_time.strftime(
-                        "%d.%m.%Y %H:%M"
-                    )
-                    end_str = booking_end.strftime("%H:%M")
-                    msg = (
-                        f"Бокс {box} уже занят в это время "
-                        f"(запись #{booking.pk}, {start_str} - {end_str})"
-                    )
-                    raise forms.ValidationError({"box": msg})
-
-        # Проверка конфликта мойщика
-        if washer:
-            active_statuses = ["pending", "in_progress"]
-            end_time = scheduled_time + timedelta(minutes=duration_minutes)
-
-            conflicting_bookings = Booking.objects.filter(
-                washer=washer, status__in=active_statuses
-            ).exclude(pk=self.instance.pk if self.instance.pk else None)
-
-            for booking in conflicting_bookings:
-                booking_end = booking.get_end_time()
-                if booking_end and (
-                    scheduled_time < booking_end and
-                    end_time > booking.scheduled_time
-                ):
-                    start_str = booking.scheduled_time.strftime(
-                        "%d.%m.%Y %H:%M"
-                    )
-                    end_str = booking_end.strftime("%H:%M")
-                    msg = (
-                        f"Мойщик {washer} уже занят в это время "
-                        f"(запись #{booking.pk}, {start_str} - {end_str})"
-                    )
-                    raise forms.ValidationError({"washer": msg})
+        candidate = Booking(
+            pk=self.instance.pk,
+            box=box,
+            washer=washer,
+            scheduled_time=scheduled_time,
+            duration_minutes=duration_minutes or 60,
+        )
+        end_time = candidate.get_end_time()
+        for kind, resource, subject in (
+            ("box", box, "Бокс"),
+            ("washer", washer, "Мойщик"),
+        ):
+            if not resource:
+                continue
+            # Пересечение ищется по индексу в памяти процесса, без запроса
+            # к БД. Индекс может отставать от БД на AVAILABILITY_VERSION_TTL:
+            # найденная им запись подтверждается запросом по номеру, а
+            # пропущенное пересечение не даст сохранить save_booking - он
+            # повторяет проверку по БД после lock_resources
+            booking = availability.index.find_conflict(
+                kind, resource.pk, scheduled_time, end_time, self.instance.pk
+            )
+            if booking is not None:
+                booking = candidate._find_conflict(
+                    pk=booking.pk, **{f"{kind}_id": resource.pk}
+                )
+            if booking:
+                msg = Booking.conflict_message(f"{subject} {resource}", booking)
+                raise forms.ValidationError({kind: msg})
 
         return cleaned_data
 
     def save(self, commit=True):
         """Переопределяем save для создания/обновления клиента"""
+        if commit:
+            return save_booking_form(self)
+
         booking = super().save(commit=False)
 
-        client_name = self.cleaned_data["client_name"]
-        client_phone = self.cleaned_data["client_phone"]
-        is_regular = self.cleaned_data.get("is_regular_client", False)
-
-        # Ищем существующего клиента по телефону или создаем нового
-        client, created = Client.objects.get_or_create(
-            phone=client_phone,
-            defaults={
-                "name": client_name,
-                "is_regular": is_regular,
-                "discount_percent": 10 if is_regular else 0,
-            },
+        # Клиент ищется по телефону и обновляется только при изменениях
+        client = resolve_client(
+            self.cleaned_data["client_name"],
+            self.cleaned_data["client_phone"],
+            self.cleaned_data.get("is_regular_client", False),
         )
+        booking.client = client
+        return booking
 
-        # Обновляем данные клиента, если он уже существовал
-        if not created:
-            client.name = client_name
-            client.is_regular = is_regular
-            client.discount_percent = 10 if is_regular else 0
-            client.save()
 
-        booking.client = client
+class BookingAdminForm(forms.ModelForm):
+    """Форма записи в админ-панели"""
 
-        if commit:
-            booking.save()
-            self.save_m2m()
+    class Meta:
+        model = Booking
+        fields = "__all__"
 
-        return booking
+    def clean(self):
+        cleaned_data = super().clean()
+        scheduled_time = cleaned_data.get("scheduled_time")
+        box = cleaned_data.get("box")
+        washer = cleaned_data.get("washer")
+        if box and scheduled_time:
+            # Админка проверяет форму и вызывает save_model в одной
+            # транзакции (ModelAdmin.changeform_view): бокс и мойщик
+            # заблокированы до сохранения, и проверка пересечений ниже и
+            # в Booking.clean не может устареть к вызову save_booking
+            lock_resources(box.pk, washer.pk if washer else None)
+        # Существующие записи проверяет Booking.clean, новые - здесь,
+        # чтобы конфликт показывался в форме, а не при сохранении
+        if not self.instance.pk and scheduled_time:
+            booking = Booking(
+                box=box,
+                washer=washer,
+                scheduled_time=scheduled_time,
+                duration_minutes=cleaned_data.get("duration_minutes") or 60,
+            )
+            booking.check_box_conflict()
+            booking.check_washer_conflict()
+        return cleaned_data
@@ -0,0 +1,379 @@
+"""Массовый импорт записей из CSV.
+
+Строки читаются потоком и обрабатываются пакетами. На пакет:
+- пересечения проверяются в памяти: занятость боксов и мойщиков за
+  окно времени пакета загружается одним запросом, а строки пакета
+  между собой сверяются проходом по отсортированным началам;
+- клиенты находятся одним запросом по телефонам (phone_digits),
+  недостающие создаются одним bulk_create;
+- записи и связи с услугами пишутся через bulk_create, а сводки
+  обновляются разницей (rollups.apply), как при сохранении записей.
+Колонки совпадают с выгрузкой (export.COLUMNS), лишние игнорируются.
+
+Каждый пакет сохраняется в своей транзакции, поэтому блокировка записи
+SQLite держится только на время пакета. Сигналы при bulk_create не
+срабатывают, и после фиксации пакета кеши сбрасываются явно: индекс
+занятости этого процесса очищается, метка "clients" и метки мойщиков
+(rollups.apply) меняются в общем кеше меток. Индексы занятости других
+процессов видят новые записи по сверке версии дня с БД не позже чем
+через AVAILABILITY_VERSION_TTL секунд (см. availability.py).
+"""
+
+from collections import defaultdict, namedtuple
+from contextlib import nullcontext
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import availability, rollups
+from .availability import Interval, Timeline
+from .models import (
+    ACTIVE_STATUSES,
+    MAX_DURATION,
+    Booking,
+    Box,
+    Client,
+    Service,
+    Washer,
+    normalize_phone,
+)
+from .pricing import REGULAR_DISCOUNT_PERCENT
+from .versions import bump_version
+
+REQUIRED_COLUMNS = ["scheduled_time", "client_name", "client_phone", "box"]
+
+BATCH_SIZE = 1000
+
+# Значения колонки is_regular, означающие постоянного клиента
+TRUE_VALUES = {"1", "true", "yes", "да"}
+
+Rejected = namedtuple("Rejected", ["line", "reason"])
+
+_Row = namedtuple(
+    "_Row",
+    [
+        "line",
+        "booking",
+        "name",
+        "phone",
+        "digits",
+        "is_regular",
+        "services",
+        "prices",
+    ],
+)
+
+
+class RowError(Exception):
+    """Строку CSV нельзя импортировать; текст - причина"""
+
+
+class _References:
+    """Боксы, мойщики и услуги по их представлению в CSV"""
+
+    def __init__(self):
+        self.boxes = {}
+        for box in Box.objects.all():
+            self.boxes[str(box)] = self.boxes[str(box.pk)] = box
+        self.washers = {}
+        for washer in Washer.objects.select_related("user"):
+            for key in (str(washer), washer.user.username, str(washer.pk)):
+                self.washers[key] = washer
+        self.services = {
+            service.name: service
+            for service in Service.objects.filter(is_active=True)
+        }
+
+
+def _decimal(value, column):
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise RowError(f"Неверное значение {column}: {value}")
+
+
+def parse_row(line, values, references):
+    """Строка CSV в виде _Row; при ошибке - RowError"""
+    values = {key: (value or "").strip() for key, value in values.items()}
+    for column in REQUIRED_COLUMNS:
+        if not values.get(column):
+            raise RowError(f"Не заполнена колонка {column}")
+
+    scheduled_time = parse_datetime(values["scheduled_time"])
+    if scheduled_time is None:
+        raise RowError(f"Неверное время: {values['scheduled_time']}")
+    if timezone.is_naive(scheduled_time):
+        scheduled_time = timezone.make_aware(scheduled_time)
+
+    try:
+        duration = int(values.get("duration_minutes") or 60)
+    except ValueError:
+        raise RowError(f"Неверная длительность: {values['duration_minutes']}")
+    if not 1 <= duration <= MAX_DURATION:
+        raise RowError(
+            f"Длительность вне диапазона 1-{MAX_DURATION}: {duration}"
+        )
+
+    status = values.get("status") or "pending"
+    if status not in dict(Booking.STATUS_CHOICES):
+        raise RowError(f"Неизвестный статус: {status}")
+
+    box = references.boxes.get(values["box"])
+    if box is None or not box.is_active:
+        raise RowError(f"Неизвестный или неактивный бокс: {values['box']}")
+    washer = None
+    if values.get("washer"):
+        washer = references.washers.get(values["washer"])
+        if washer is None or not washer.is_active:
+            raise RowError(
+                f"Неизвестный или неактивный мойщик: {values['washer']}"
+            )
+
+    services = []
+    names = (name.strip() for name in values.get("services", "").split(";"))
+    for name in filter(None, names):
+        if name not in references.services:
+            raise RowError(f"Неизвестная услуга: {name}")
+        services.append(references.services[name])
+
+    # Длина проверяется здесь: SQLite сохранит и слишком длинное
+    # значение, а другие СУБД отклонили бы весь пакет
+    for column, field in (("client_name", "name"), ("client_phone", "phone")):
+        max_length = Client._meta.get_field(field).max_length
+        if len(values[column]) > max_length:
+            raise RowError(
+                f"Значение {column} длиннее {max_length} символов"
+            )
+
+    digits = normalize_phone(values["client_phone"])
+    if not digits:
+        raise RowError(f"Телефон без цифр: {values['client_phone']}")
+
+    # Цены из старой системы сохраняются как есть, иначе считаются
+    # по текущим ценам услуг
+    prices = None
+    if values.get("base_price"):
+        base_price = _decimal(values["base_price"], "base_price")
+        discount = _decimal(
+            values.get("discount_amount") or "0", "discount_amount"
+        )
+        final_price = (
+            _decimal(values["final_price"], "final_price")
+            if values.get("final_price")
+            else base_price - discount
+        )
+        prices = (base_price, discount, final_price)
+
+    booking = Booking(
+        box=box,
+        washer=washer,
+        scheduled_time=scheduled_time,
+        duration_minutes=duration,
+        end_time=scheduled_time + timedelta(minutes=duration),
+        status=status,
+        notes=values.get("notes", ""),
+    )
+    return _Row(
+        line,
+        booking,
+        values["client_name"],
+        values["client_phone"],
+        digits,
+        values.get("is_regular", "").lower() in TRUE_VALUES,
+        services,
+        prices,
+    )
+
+
+def _resources(booking):
+    """Ресурсы, которые занимает запись: (ключ, подпись для ошибки)"""
+    resources = [(("box", booking.box_id), f"Бокс {booking.box}")]
+    if booking.washer_id:
+        resources.append(
+            (("washer", booking.washer_id), f"Мойщик {booking.washer}")
+        )
+    return resources
+
+
+def _load_window(rows):
+    """Занятость боксов и мойщиков строк rows по данным БД"""
+    bookings = [row.booking for row in rows]
+    start = min(b.scheduled_time for b in bookings)
+    end = max(b.end_time for b in bookings)
+    resources = Q(box__in={b.box_id for b in bookings}) | Q(
+        washer__in={b.washer_id for b in bookings} - {None}
+    )
+    window = (
+        Booking.objects.filter(
+            resources,
+            status__in=ACTIVE_STATUSES,
+            scheduled_time__lt=end,
+            end_time__gt=start,
+        )
+        .order_by()
+        .values_list("pk", "box_id", "washer_id", "scheduled_time", "end_time")
+    )
+    intervals = defaultdict(list)
+    for pk, box_id, washer_id, scheduled_time, end_time in window:
+        interval = Interval(pk, scheduled_time, end_time)
+        intervals[("box", box_id)].append(interval)
+        if washer_id:
+            intervals[("washer", washer_id)].append(interval)
+    return {key: Timeline(value) for key, value in intervals.items()}
+
+
+def check_conflicts(rows):
+    """Делит строки на принятые и отклоненные по пересечениям.
+
+    Записи с активным статусом сверяются с записями в БД за окно
+    времени строк и друг с другом: строки проходятся по возрастанию
+    начала, и для каждого ресурса хранится принятая строка с самым
+    поздним окончанием - строка пересекается с принятыми, только если
+    начинается раньше этого окончания. Возвращает (принятые, отклоненные).
+    """
+    active = [row for row in rows if row.booking.status in ACTIVE_STATUSES]
+    if not active:
+        return list(rows), []
+    timelines = _load_window(active)
+
+    latest = {}
+    rejected = {}
+    for row in sorted(active, key=lambda r: (r.booking.scheduled_time, r.line)):
+        booking = row.booking
+        reason = None
+        for key, subject in _resources(booking):
+            timeline = timelines.get(key)
+            interval = timeline and timeline.find_conflict(
+                booking.scheduled_time, booking.end_time
+            )
+            if interval:
+                reason = Booking.conflict_message(subject, interval)
+                break
+            other = latest.get(key)
+            if other and other.booking.end_time > booking.scheduled_time:
+                reason = (
+                    f"{subject} уже занят в это время строкой {other.line}"
+                )
+                break
+        if reason:
+            rejected[row.line] = Rejected(row.line, reason)
+            continue
+        for key, subject in _resources(booking):
+            other = latest.get(key)
+            if other is None or other.booking.end_time < booking.end_time:
+                latest[key] = row
+
+    accepted = [row for row in rows if row.line not in rejected]
+    return accepted, sorted(rejected.values())
+
+
+def resolve_clients(rows):
+    """Клиенты строк по телефону: {цифры телефона: Client}.
+
+    Существующие клиенты находятся одним запросом и не изменяются,
+    недостающие создаются одним bulk_create по первой строке с их
+    телефоном.
+    """
+    digits = {row.digits for row in rows}
+    clients = {}
+    # При нескольких клиентах с одним номером берется самый ранний,
+    # как в services.resolve_client
+    existing = Client.objects.filter(phone_digits__in=digits).order_by("-pk")
+    for client in existing:
+        clients[client.phone_digits] = client
+
+    new = {}
+    for row in rows:
+        if row.digits not in clients and row.digits not in new:
+            new[row.digits] = Client(
+                name=row.name,
+                phone=row.phone,
+                # bulk_create не вызывает save()
+                phone_digits=row.digits,
+                is_regular=row.is_regular,
+                discount_percent=(
+                    REGULAR_DISCOUNT_PERCENT if row.is_regular else 0
+                ),
+            )
+    if new:
+        Client.objects.bulk_create(new.values())
+        clients.update(new)
+    return clients
+
+
+def save_rows(rows, created_by=None):
+    """Записывает принятые строки пакетно; возвращает созданные записи"""
+    clients = resolve_clients(rows)
+    bookings = []
+    for row in rows:
+        booking = row.booking
+        booking.client = clients[row.digits]
+        booking.created_by = created_by
+        if row.prices:
+            (
+                booking.base_price,
+                booking.discount_amount,
+                booking.final_price,
+            ) = row.prices
+        else:
+            booking.calculate_price(row.services)
+        bookings.append(booking)
+
+    Booking.objects.bulk_create(bookings)
+    through = Booking.services.through
+    through.objects.bulk_create(
+        through(booking_id=row.booking.pk, service_id=service)
+        for row in rows
+        for service in {service.pk for service in row.services}
+    )
+    # bulk_create не вызывает сигналов
+    rollups.apply(added=[rollups.snapshot(booking) for booking in bookings])
+    return bookings
+
+
+def import_rows(rows, batch_size=BATCH_SIZE, created_by=None, dry_run=False):
+    """Импортирует строки rows - пары (номер строки, словарь колонок).
+
+    Возвращает (число импортированных записей, список Rejected).
+    Пакеты фиксируются по одному: при ошибке уже сохраненные пакеты
+    остаются в БД. При dry_run все проверки выполняются в одной
+    транзакции, которая затем откатывается: пакеты должны видеть
+    строки предыдущих.
+    """
+    references = _References()
+    imported = 0
+    rejected = []
+
+    def flush(batch):
+        nonlocal imported
+        with transaction.atomic():
+            accepted, conflicts = check_conflicts(batch)
+            rejected.extend(conflicts)
+            if not accepted:
+                return
+            imported += len(save_rows(accepted, created_by))
+            transaction.on_commit(availability.index.clear)
+            transaction.on_commit(partial(bump_version, "clients"))
+
+    with transaction.atomic() if dry_run else nullcontext():
+        batch = []
+        for line, values in rows:
+            try:
+                batch.append(parse_row(line, values, references))
+            except RowError as error:
+                rejected.append(Rejected(line, str(error)))
+                continue
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+        if dry_run:
+            transaction.set_rollback(True)
+    return imported, sorted(rejected)
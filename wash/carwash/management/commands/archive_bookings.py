@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from carwash import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит завершенные и отмененные записи старше заданного "
+        "числа дней в архив (вместе с услугами и ценами)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.BOOKING_ARCHIVE_AFTER_DAYS,
+            help=(
+                "Переносить записи, закончившиеся раньше, чем столько дней "
+                f"назад (по умолчанию {settings.BOOKING_ARCHIVE_AFTER_DAYS})"
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=archive.BATCH_SIZE,
+            help=f"Размер пакета (по умолчанию {archive.BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только посчитать записи, ничего не перенося",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 1:
+            raise CommandError("Число дней должно быть положительным")
+        if options["batch_size"] < 1:
+            raise CommandError("Размер пакета должен быть положительным")
+
+        before = archive.archive_cutoff(options["days"])
+        if options["dry_run"]:
+            count = archive.archivable(before).count()
+            verb = "Можно перенести"
+        else:
+
+            def log(message):
+                if options["verbosity"] > 1:
+                    self.stderr.write(message)
+
+            count = archive.archive_bookings(
+                before, batch_size=options["batch_size"], log=log
+            )
+            verb = "Перенесено в архив"
+        cutoff = timezone.localtime(before).strftime("%d.%m.%Y")
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} записей до {cutoff}: {count}")
+        )
@@ -0,0 +1,106 @@
+import json
+import platform
+import sys
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from carwash import benchmarks
+
+
+def _sizes(value):
+    try:
+        sizes = [int(size) for size in value.split(",")]
+    except ValueError:
+        raise ValueError("Список размеров через запятую")
+    if not sizes or min(sizes) < 1:
+        raise ValueError("Размеры должны быть положительными")
+    return sizes
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет время и число запросов горячих путей (проверка "
+        "пересечений, форма записи, расчет цены, список записей) на "
+        "наборах данных разного объема во временной тестовой БД; "
+        "результат - JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=_sizes,
+            default=[1000, 10000, 100000],
+            help="Числа записей через запятую (по умолчанию 1000,10000,100000)",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Число замеров каждой операции (по умолчанию 20)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Зерно генератора данных (по умолчанию 0)",
+        )
+        parser.add_argument(
+            "--output",
+            help="Файл для результата (по умолчанию - стандартный вывод)",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("Число замеров должно быть положительным")
+
+        def log(message):
+            if options["verbosity"] > 1:
+                self.stderr.write(message)
+
+        results = []
+        test_settings = connection.settings_dict["TEST"]
+        test_name = test_settings.get("NAME")
+        # Своя БД замеров: тестовую БД может использовать manage.py test
+        test_settings["NAME"] = benchmarks.benchmark_db_name()
+        setup_test_environment()
+        try:
+            for size in options["sizes"]:
+                # Для каждого объема - новая пустая БД, рабочая БД не
+                # затрагивается
+                old_name = connection.creation.create_test_db(
+                    verbosity=0, autoclobber=True, serialize=False
+                )
+                try:
+                    results.extend(
+                        benchmarks.measure(
+                            size, options["iterations"], options["seed"], log
+                        )
+                    )
+                finally:
+                    connection.creation.destroy_test_db(old_name, verbosity=0)
+        finally:
+            teardown_test_environment()
+            test_settings["NAME"] = test_name
+
+        report = {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "argv": sys.argv[1:],
+                "iterations": options["iterations"],
+                "seed": options["seed"],
+            },
+            "results": results,
+        }
+        content = json.dumps(report, ensure_ascii=False, indent=2) + "\n"
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(content)
+        else:
+            self.stdout.write(content, ending="")
@@ -0,0 +1,197 @@
+import asyncio
+import io
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model,
+)
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+DEFAULT_PATHS = [
+    "/",
+    "/api/calculate-price/?services[]=1&services[]=2",
+    "/dashboard/",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает число запросов в секунду для страниц только для чтения "
+        "под WSGI (синхронные представления) и ASGI (асинхронные)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Адрес страницы; можно указать несколько раз. По умолчанию: "
+            + ", ".join(DEFAULT_PATHS),
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Число запросов на страницу (по умолчанию 500)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=20,
+            help="Число одновременных запросов (по умолчанию 20)",
+        )
+        parser.add_argument(
+            "--username",
+            help="Пользователь, от имени которого выполняются запросы. "
+            "Без него страницы администратора вернут перенаправление",
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Заголовок Host (по умолчанию localhost)",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError(
+                "Число запросов и одновременных запросов должно быть "
+                "положительным"
+            )
+        self.host = options["host"]
+        self.cookie = ""
+        if options["username"]:
+            self.cookie = self._session_cookie(options["username"])
+
+        handlers = [
+            ("WSGI", self._run_wsgi, import_string(settings.WSGI_APPLICATION)),
+            ("ASGI", self._run_asgi, import_string("wash.asgi.application")),
+        ]
+        for path in options["paths"] or DEFAULT_PATHS:
+            for name, run, app in handlers:
+                started = time.perf_counter()
+                results = run(
+                    app, path, options["requests"], options["concurrency"]
+                )
+                elapsed = time.perf_counter() - started
+                self._report(name, path, results, elapsed)
+
+    def _session_cookie(self, username):
+        """Сессия пользователя username, как после входа на сайт"""
+        try:
+            user = get_user_model().objects.get_by_natural_key(username)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Пользователь {username} не найден")
+        store = import_module(settings.SESSION_ENGINE).SessionStore()
+        store[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        store[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        store[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        store.save()
+        return f"{settings.SESSION_COOKIE_NAME}={store.session_key}"
+
+    def _split(self, path):
+        path, _, query = path.partition("?")
+        return path, query
+
+    def _run_wsgi(self, app, path, count, concurrency):
+        path, query = self._split(path)
+
+        def call():
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path,
+                "QUERY_STRING": query,
+                "SERVER_NAME": self.host,
+                "SERVER_PORT": "80",
+                "SERVER_PROTOCOL": "HTTP/1.1",
+                "HTTP_HOST": self.host,
+                "HTTP_COOKIE": self.cookie,
+                "wsgi.url_scheme": "http",
+                "wsgi.input": io.BytesIO(),
+                "wsgi.errors": io.StringIO(),
+            }
+            statuses = []
+            started = time.perf_counter()
+            response = app(
+                environ, lambda status, headers: statuses.append(status)
+            )
+            try:
+                for _ in response:
+                    pass
+            finally:
+                if hasattr(response, "close"):
+                    response.close()
+            return int(statuses[0].split()[0]), time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(call) for _ in range(count)]
+            return [future.result() for future in futures]
+
+    def _run_asgi(self, app, path, count, concurrency):
+        path, query = self._split(path)
+        headers = [(b"host", self.host.encode())]
+        if self.cookie:
+            headers.append((b"cookie", self.cookie.encode()))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": headers,
+            "server": (self.host, 80),
+            "client": ("127.0.0.1", 0),
+        }
+
+        async def call(semaphore):
+            async with semaphore:
+                status = []
+                messages = [{"type": "http.request", "body": b""}]
+                finished = asyncio.Event()
+                started = time.perf_counter()
+
+                async def receive():
+                    # После тела запроса клиент "отключается" только
+                    # когда ответ полностью отправлен
+                    if messages:
+                        return messages.pop()
+                    await finished.wait()
+                    return {"type": "http.disconnect"}
+
+                async def send(message):
+                    if message["type"] == "http.response.start":
+                        status.append(message["status"])
+                    elif not message.get("more_body"):
+                        finished.set()
+
+                await app(dict(scope), receive, send)
+                return status[0], time.perf_counter() - started
+
+        async def main():
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(
+                *(call(semaphore) for _ in range(count))
+            )
+
+        return asyncio.run(main())
+
+    def _report(self, name, path, results, elapsed):
+        latencies = sorted(latency for status, latency in results)
+        errors = sum(1 for status, latency in results if status >= 400)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        self.stdout.write(
+            f"{name} {path}: {len(results) / elapsed:.1f} запр/с, "
+            f"медиана {statistics.median(latencies) * 1000:.1f} мс, "
+            f"p95 {p95 * 1000:.1f} мс, ошибок {errors}"
+        )
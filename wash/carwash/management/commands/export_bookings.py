@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from carwash import export
+from carwash.models import Booking
+from carwash.search import filter_bookings
+
+
+class Command(BaseCommand):
+    help = "Выгружает записи в CSV или JSON (в файл или стандартный вывод)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=sorted(export.FORMATS),
+            default="csv",
+            help="Формат выгрузки (по умолчанию csv)",
+        )
+        parser.add_argument(
+            "--status",
+            choices=[value for value, label in Booking.STATUS_CHOICES],
+            help="Статус записей",
+        )
+        parser.add_argument(
+            "--search",
+            help="Поиск клиента по имени или телефону, как в списке записей",
+        )
+        parser.add_argument(
+            "--output",
+            help="Файл для выгрузки (по умолчанию - стандартный вывод)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=export.CHUNK_SIZE,
+            help=f"Размер порции (по умолчанию {export.CHUNK_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("Размер порции должен быть положительным")
+
+        generate, content_type = export.FORMATS[options["format"]]
+        bookings = filter_bookings(Booking.objects.all(), options)
+        content = generate(bookings, chunk_size=options["chunk_size"])
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as f:
+                f.writelines(content)
+        else:
+            for part in content:
+                self.stdout.write(part, ending="")
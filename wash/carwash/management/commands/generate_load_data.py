@@ -0,0 +1,97 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from carwash import dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Генерирует синтетический набор данных для профилирования: "
+        "клиентов, мойщиков, боксы и записи без пересечений"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clients",
+            type=int,
+            default=10000,
+            help="Число клиентов (по умолчанию 10000)",
+        )
+        parser.add_argument(
+            "--washers",
+            type=int,
+            default=20,
+            help="Число мойщиков (по умолчанию 20)",
+        )
+        parser.add_argument(
+            "--boxes",
+            type=int,
+            default=dataset.MAX_BOXES,
+            help=(
+                f"Число боксов, не больше {dataset.MAX_BOXES} "
+                f"(по умолчанию {dataset.MAX_BOXES})"
+            ),
+        )
+        parser.add_argument(
+            "--bookings",
+            type=int,
+            default=100000,
+            help="Число записей (по умолчанию 100000)",
+        )
+        parser.add_argument(
+            "--days-back",
+            type=int,
+            default=2190,
+            help="Сколько дней до сегодняшнего охватывают записи "
+            "(по умолчанию 2190)",
+        )
+        parser.add_argument(
+            "--days-ahead",
+            type=int,
+            default=14,
+            help="Сколько дней после сегодняшнего, включая его, охватывают "
+            "записи (по умолчанию 14)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Зерно генератора случайных чисел (по умолчанию 0)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=dataset.BATCH_SIZE,
+            help=f"Размер пакета (по умолчанию {dataset.BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        for name in ("clients", "boxes", "batch_size"):
+            if options[name] < 1:
+                raise CommandError(f"Параметр {name} должен быть положительным")
+        for name in ("washers", "bookings", "days_back", "days_ahead"):
+            if options[name] < 0:
+                raise CommandError(f"Параметр {name} не может быть отрицательным")
+
+        started = time.monotonic()
+        try:
+            created = dataset.generate(
+                clients=options["clients"],
+                washers=options["washers"],
+                boxes=options["boxes"],
+                bookings=options["bookings"],
+                days_back=options["days_back"],
+                days_ahead=options["days_ahead"],
+                seed=options["seed"],
+                batch_size=options["batch_size"],
+                log=self.stdout.write if options["verbosity"] > 1 else None,
+            )
+        except dataset.DatasetError as error:
+            raise CommandError(str(error))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Создано записей: {created} "
+                f"за {time.monotonic() - started:.1f} с"
+            )
+        )
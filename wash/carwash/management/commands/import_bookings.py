@@ -0,0 +1,81 @@
+import csv
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from carwash import importer
+
+
+class Command(BaseCommand):
+    help = (
+        "Импортирует записи из CSV (колонки как в выгрузке export_bookings) "
+        "с пакетной проверкой пересечений"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл CSV в кодировке UTF-8")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=importer.BATCH_SIZE,
+            help=f"Размер пакета (по умолчанию {importer.BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--delimiter",
+            default=",",
+            help="Разделитель колонок (по умолчанию запятая)",
+        )
+        parser.add_argument(
+            "--created-by",
+            help="Имя пользователя, от имени которого создаются записи",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только проверить строки, ничего не сохраняя",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("Размер пакета должен быть положительным")
+
+        created_by = None
+        if options["created_by"]:
+            User = get_user_model()
+            try:
+                created_by = User.objects.get_by_natural_key(
+                    options["created_by"]
+                )
+            except User.DoesNotExist:
+                raise CommandError(
+                    f"Пользователь {options['created_by']} не найден"
+                )
+
+        try:
+            source = open(options["path"], newline="", encoding="utf-8-sig")
+        except OSError as error:
+            raise CommandError(f"Не удалось открыть файл: {error}")
+        with source:
+            reader = csv.DictReader(source, delimiter=options["delimiter"])
+            missing = set(importer.REQUIRED_COLUMNS) - set(
+                reader.fieldnames or []
+            )
+            if missing:
+                raise CommandError(
+                    "В файле нет колонок: " + ", ".join(sorted(missing))
+                )
+            imported, rejected = importer.import_rows(
+                ((reader.line_num, row) for row in reader),
+                batch_size=options["batch_size"],
+                created_by=created_by,
+                dry_run=options["dry_run"],
+            )
+
+        for line, reason in rejected:
+            self.stdout.write(self.style.WARNING(f"Строка {line}: {reason}"))
+        verb = "Можно импортировать" if options["dry_run"] else "Импортировано"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} записей: {imported}, отклонено строк: {len(rejected)}"
+            )
+        )
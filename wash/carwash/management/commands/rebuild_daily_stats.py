@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from carwash.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает ежедневные сводки записей по таблице записей"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date-from",
+            type=datetime.fromisoformat,
+            help="Начальная дата (ГГГГ-ММ-ДД). По умолчанию - вся история",
+        )
+        parser.add_argument(
+            "--date-to",
+            type=datetime.fromisoformat,
+            help="Конечная дата включительно (ГГГГ-ММ-ДД)",
+        )
+
+    def handle(self, *args, **options):
+        date_from = options["date_from"] and options["date_from"].date()
+        date_to = options["date_to"] and options["date_to"].date()
+        if date_from and date_to and date_from > date_to:
+            raise CommandError("Начальная дата позже конечной")
+
+        created = rebuild(date_from, date_to)
+        self.stdout.write(
+            self.style.SUCCESS(f"Создано строк сводки: {created}")
+        )
@@ -0,0 +1,70 @@
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from carwash.models import ACTIVE_STATUSES, Booking
+from carwash.pricing import reprice_bookings
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает цены записей по текущим ценам услуг "
+        "и скидкам клиентов"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--status",
+            action="append",
+            choices=[value for value, label in Booking.STATUS_CHOICES],
+            help=(
+                "Статус записей (можно указать несколько раз). "
+                "По умолчанию - ожидающие и в работе"
+            ),
+        )
+        parser.add_argument(
+            "--date-from",
+            type=datetime.fromisoformat,
+            help="Начальная дата записи (ГГГГ-ММ-ДД)",
+        )
+        parser.add_argument(
+            "--date-to",
+            type=datetime.fromisoformat,
+            help="Конечная дата записи включительно (ГГГГ-ММ-ДД)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Размер пакета (по умолчанию 1000)",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("Размер пакета должен быть положительным")
+
+        bookings = Booking.objects.filter(
+            status__in=options["status"] or ACTIVE_STATUSES
+        )
+        if options["date_from"]:
+            start = datetime.combine(options["date_from"].date(), time.min)
+            bookings = bookings.filter(
+                scheduled_time__gte=timezone.make_aware(start)
+            )
+        if options["date_to"]:
+            end = datetime.combine(
+                options["date_to"].date() + timedelta(days=1), time.min
+            )
+            bookings = bookings.filter(
+                scheduled_time__lt=timezone.make_aware(end)
+            )
+
+        processed, changed = reprice_bookings(
+            bookings, batch_size=options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Обработано записей: {processed}, цена изменилась: {changed}"
+            )
+        )
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-17 09:12
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def fill_end_time(apps, schema_editor):
+    """Заполняет end_time для существующих записей"""
+    Booking = apps.get_model("carwash", "Booking")
+    batch = []
+    for booking in Booking.objects.only(
+        "pk", "scheduled_time", "duration_minutes"
+    ).iterator(chunk_size=1000):
+        booking.end_time = booking.scheduled_time + timedelta(
+            minutes=booking.duration_minutes
+        )
+        batch.append(booking)
+        if len(batch) >= 1000:
+            Booking.objects.bulk_update(batch, ["end_time"])
+            batch = []
+    if batch:
+        Booking.objects.bulk_update(batch, ["end_time"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carwash", "0002_booking_duration_minutes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="end_time",
+            field=models.DateTimeField(
+                editable=False, null=True, verbose_name="Время окончания"
+            ),
+        ),
+        migrations.RunPython(fill_end_time, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="booking",
+            name="end_time",
+            field=models.DateTimeField(
+                editable=False, verbose_name="Время окончания"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["box", "status", "scheduled_time", "end_time"],
+                name="booking_box_schedule_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["washer", "status", "scheduled_time", "end_time"],
+                name="booking_washer_schedule_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carwash", "0004_booking_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="service",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                verbose_name="Дата изменения",
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carwash", "0005_service_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="booking_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["status", "-created_at", "-id"],
+                name="booking_status_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:20
+
+from django.db import migrations, models
+
+FTS_TABLE = "carwash_client_fts"
+
+CREATE_FTS = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, notes,
+        content='carwash_client', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON carwash_client BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, notes)
+        VALUES (new.id, new.name, new.notes);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON carwash_client BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, notes)
+        VALUES ('delete', old.id, old.name, old.notes);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF name, notes
+    ON carwash_client BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, notes)
+        VALUES ('delete', old.id, old.name, old.notes);
+        INSERT INTO {FTS_TABLE}(rowid, name, notes)
+        VALUES (new.id, new.name, new.notes);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+DROP_FTS = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def normalize_phone(phone):
+    """Копия carwash.models.normalize_phone на момент миграции: миграция
+    не должна зависеть от текущего кода модели"""
+    digits = "".join(char for char in phone if char.isdigit())
+    if len(digits) == 11 and digits[0] in "78":
+        digits = digits[1:]
+    return digits
+
+
+def fill_phone_digits(apps, schema_editor):
+    """Заполняет phone_digits для существующих клиентов"""
+    Client = apps.get_model("carwash", "Client")
+    batch = []
+    for client in Client.objects.only("pk", "phone").iterator(chunk_size=1000):
+        client.phone_digits = normalize_phone(client.phone)
+        batch.append(client)
+        if len(batch) >= 1000:
+            Client.objects.bulk_update(batch, ["phone_digits"])
+            batch = []
+    if batch:
+        Client.objects.bulk_update(batch, ["phone_digits"])
+
+
+def create_fts(apps, schema_editor):
+    """Полнотекстовый индекс имен и заметок клиентов (только SQLite)"""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in CREATE_FTS:
+        schema_editor.execute(sql)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in DROP_FTS:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carwash", "0006_booking_list_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="client",
+            name="phone_digits",
+            field=models.CharField(
+                db_index=True,
+                default="",
+                editable=False,
+                max_length=20,
+                verbose_name="Телефон (цифры)",
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_phone_digits, migrations.RunPython.noop),
+        migrations.RunPython(create_fts, drop_fts),
+    ]
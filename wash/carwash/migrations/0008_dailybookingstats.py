@@ -0,0 +1,153 @@
+# Generated by Django 5.2.7 on 2026-10-17 13:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def fill_stats(apps, schema_editor):
+    """Строит сводки по существующим записям"""
+    Booking = apps.get_model("carwash", "Booking")
+    DailyBookingStats = apps.get_model("carwash", "DailyBookingStats")
+    rows = (
+        Booking.objects.annotate(
+            local_date=TruncDate(
+                "scheduled_time", tzinfo=timezone.get_current_timezone()
+            )
+        )
+        .order_by()
+        .values("local_date", "box_id", "washer_id", "status")
+        .annotate(
+            total=Count("pk"),
+            total_minutes=Sum("duration_minutes"),
+            total_base_price=Sum("base_price"),
+            total_discount_amount=Sum("discount_amount"),
+            total_final_price=Sum("final_price"),
+        )
+    )
+    DailyBookingStats.objects.bulk_create(
+        (
+            DailyBookingStats(
+                date=row["local_date"],
+                box_id=row["box_id"],
+                washer_id=row["washer_id"],
+                status=row["status"],
+                bookings=row["total"],
+                minutes=row["total_minutes"],
+                base_price=row["total_base_price"],
+                discount_amount=row["total_discount_amount"],
+                final_price=row["total_final_price"],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carwash", "0007_client_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyBookingStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Дата")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Ожидает"),
+                            ("in_progress", "В работе"),
+                            ("completed", "Завершена"),
+                            ("cancelled", "Отменена"),
+                        ],
+                        max_length=20,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "bookings",
+                    models.IntegerField(default=0, verbose_name="Записей"),
+                ),
+                ("minutes", models.IntegerField(default=0, verbose_name="Минут")),
+                (
+                    "base_price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=12,
+                        verbose_name="Базовая цена",
+                    ),
+                ),
+                (
+                    "discount_amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=12,
+                        verbose_name="Скидка",
+                    ),
+                ),
+                (
+                    "final_price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=12,
+                        verbose_name="Итоговая цена",
+                    ),
+                ),
+                (
+                    "box",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="carwash.box",
+                        verbose_name="Бокс",
+                    ),
+                ),
+                (
+                    "washer",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="carwash.washer",
+                        verbose_name="Мойщик",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Сводка за день",
+                "verbose_name_plural": "Сводки за день",
+                "ordering": ["date"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("date", "box", "washer", "status"),
+                        name="daily_stats_key",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("washer__isnull", True)),
+                        fields=("date", "box", "status"),
+                        name="daily_stats_key_no_washer",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-17 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carwash", "0008_dailybookingstats"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["washer", "scheduled_time"],
+                name="booking_washer_time_idx",
+            ),
+        ),
+    ]
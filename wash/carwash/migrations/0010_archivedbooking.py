@@ -0,0 +1,154 @@
+# Generated by Django 5.2.7 on 2026-10-17 14:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carwash", "0009_booking_washer_time_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedBooking",
+            fields=[
+                (
+                    "id",
+                    models.BigIntegerField(
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="Номер записи",
+                    ),
+                ),
+                (
+                    "scheduled_time",
+                    models.DateTimeField(verbose_name="Запланированное время"),
+                ),
+                (
+                    "duration_minutes",
+                    models.IntegerField(verbose_name="Длительность (минут)"),
+                ),
+                (
+                    "end_time",
+                    models.DateTimeField(verbose_name="Время окончания"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Ожидает"),
+                            ("in_progress", "В работе"),
+                            ("completed", "Завершена"),
+                            ("cancelled", "Отменена"),
+                        ],
+                        max_length=20,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "base_price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=10,
+                        verbose_name="Базовая цена",
+                    ),
+                ),
+                (
+                    "discount_amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=10,
+                        verbose_name="Сумма скидки",
+                    ),
+                ),
+                (
+                    "final_price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=10,
+                        verbose_name="Итоговая цена",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(verbose_name="Дата создания"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(verbose_name="Дата изменения"),
+                ),
+                ("notes", models.TextField(blank=True, verbose_name="Заметки")),
+                (
+                    "archived_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата переноса в архив"
+                    ),
+                ),
+                (
+                    "box",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="archived_bookings",
+                        to="carwash.box",
+                        verbose_name="Бокс",
+                    ),
+                ),
+                (
+                    "client",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_bookings",
+                        to="carwash.client",
+                        verbose_name="Клиент",
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="archived_bookings",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Создано администратором",
+                    ),
+                ),
+                (
+                    "services",
+                    models.ManyToManyField(
+                        related_name="archived_bookings",
+                        to="carwash.service",
+                        verbose_name="Услуги",
+                    ),
+                ),
+                (
+                    "washer",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="archived_bookings",
+                        to="carwash.washer",
+                        verbose_name="Мойщик",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Архивная запись",
+                "verbose_name_plural": "Архивные записи",
+                "ordering": ["-scheduled_time", "-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["box", "scheduled_time"],
+                        name="archived_box_time_idx",
+                    ),
+                    models.Index(
+                        fields=["scheduled_time"], name="archived_time_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
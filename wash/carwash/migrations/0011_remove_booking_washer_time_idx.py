@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 18:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carwash", "0010_archivedbooking"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="booking",
+            name="booking_washer_time_idx",
+        ),
+    ]
@@ -3,7 +3,13 @@ from datetime import timedelta
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import models, transaction
+
+# Максимальная длительность записи в минутах
+MAX_DURATION = 480
+
+# Статусы записей, занимающих бокс и мойщика
+ACTIVE_STATUSES = ["pending", "in_progress"]
 
 
 class Service(models.Model):
@@ -23,6 +29,9 @@ class Service(models.Model):
     created_at = models.DateTimeField(
         auto_now_add=True, verbose_name="Дата создания"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name="Дата изменения"
+    )
 
     class Meta:
         verbose_name = "Услуга"
@@ -91,12 +100,27 @@ class Washer(models.Model):
         return name if name else self.user.username
 
 
+def normalize_phone(phone):
+    """Телефон только из цифр, без кода страны у российских номеров"""
+    digits = "".join(char for char in phone if char.isdigit())
+    if len(digits) == 11 and digits[0] in "78":
+        digits = digits[1:]
+    return digits
+
+
 class Client(models.Model):
     """Клиент автомойки"""
 
     name = models.CharField(max_length=200, verbose_name="Имя клиента")
     phone = models.CharField(max_length=20, unique=True,
                              verbose_name="Телефон")
+    # Для поиска по началу номера (см. search.py); заполняется в save()
+    phone_digits = models.CharField(
+        max_length=20,
+        db_index=True,
+        editable=False,
+        verbose_name="Телефон (цифры)",
+    )
     is_regular = models.BooleanField(
         default=False, verbose_name="Постоянный клиент"
     )
@@ -118,6 +142,13 @@ class Client(models.Model):
     def __str__(self):
         return f"{self.name} ({self.phone})"
 
+    def save(self, *args, **kwargs):
+        self.phone_digits = normalize_phone(self.phone)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "phone" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "phone_digits"}
+        super().save(*args, **kwargs)
+
 
 class Booking(models.Model):
     """Запись клиента на мойку"""
@@ -156,7 +187,12 @@ class Booking(models.Model):
     duration_minutes = models.IntegerField(
         default=60,
         verbose_name="Длительность (минут)",
-        validators=[MinValueValidator(1), MaxValueValidator(480)],
+        validators=[MinValueValidator(1), MaxValueValidator(MAX_DURATION)],
+    )
+    # Хранится в БД, чтобы фильтровать и индексировать по окончанию записи;
+    # синхронизируется с scheduled_time и duration_minutes в save()
+    end_time = models.DateTimeField(
+        editable=False, verbose_name="Время окончания"
     )
     status = models.CharField(
         max_length=20,
@@ -185,6 +221,9 @@ class Booking(models.Model):
     created_at = models.DateTimeField(
         auto_now_add=True, verbose_name="Дата создания"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name="Дата изменения"
+    )
     created_by = models.ForeignKey(
         User,
         on_delete=models.SET_NULL,
@@ -198,6 +237,24 @@ class Booking(models.Model):
         verbose_name = "Запись"
         verbose_name_plural = "Записи"
         ordering = ["-scheduled_time", "-created_at"]
+        indexes = [
+            models.Index(
+                fields=["box", "status", "scheduled_time", "end_time"],
+                name="booking_box_schedule_idx",
+            ),
+            models.Index(
+                fields=["washer", "status", "scheduled_time", "end_time"],
+                name="booking_washer_schedule_idx",
+            ),
+            # Постраничный вывод списка записей по (created_at, id)
+            models.Index(
+                fields=["-created_at", "-id"], name="booking_created_idx"
+            ),
+            models.Index(
+                fields=["status", "-created_at", "-id"],
+                name="booking_status_created_idx",
+            ),
+        ]
 
     def __str__(self):
         date_str = self.scheduled_time.strftime("%d.%m.%Y %H:%M")
@@ -209,16 +266,19 @@ class Booking(models.Model):
             return self.scheduled_time + timedelta(minutes=self.duration_minutes)
         return None
 
-    @property
-    def end_time(self):
-        """Свойство для времени окончания (для использования в шаблонах)"""
-        return self.get_end_time()
+    def calculate_price(self, services=None):
+        """Вычисление итоговой цены с учетом скидки.
 
-    def calculate_price(self):
-        """Вычисление итоговой цены с учетом скидки"""
-        self.base_price = sum(
-            service.price for service in self.services.all()
-        )
+        services - уже загруженные услуги; если не переданы, берутся
+        сохраненные услуги записи.
+        """
+        if services is None:
+            services = self.services.all()
+        self.base_price = sum(service.price for service in services)
+        return self.apply_discount()
+
+    def apply_discount(self):
+        """Скидка и итоговая цена по базовой цене и скидке клиента"""
         if self.client.is_regular and self.client.discount_percent > 0:
             self.discount_amount = (
                 self.base_price * self.client.discount_percent / 100
@@ -228,63 +288,59 @@ class Booking(models.Model):
         self.final_price = self.base_price - self.discount_amount
         return self.final_price
 
+    def _find_conflict(self, **resource):
+        """Первая активная запись, пересекающаяся по времени с текущей"""
+        # Исключаем завершенные и отмененные записи
+        end_time = self.get_end_time()
+
+        # Длительность ограничена валидатором, поэтому пересекающиеся
+        # записи начинаются не раньше, чем за MAX_DURATION до начала
+        # текущей: нижняя граница делает поиск по индексу
+        # (бокс/мойщик, статус, начало, окончание) ограниченным диапазоном
+        return (
+            Booking.objects.filter(
+                status__in=ACTIVE_STATUSES,
+                scheduled_time__lt=end_time,
+                scheduled_time__gt=(
+                    self.scheduled_time - timedelta(minutes=MAX_DURATION)
+                ),
+                end_time__gt=self.scheduled_time,
+                **resource,
+            )
+            .exclude(pk=self.pk)
+            .order_by("scheduled_time", "pk")
+            .first()
+        )
+
+    @staticmethod
+    def conflict_message(subject, booking):
+        """Текст ошибки о пересечении с записью booking"""
+        start_str = booking.scheduled_time.strftime("%d.%m.%Y %H:%M")
+        end_str = booking.end_time.strftime("%H:%M")
+        return (
+            f"{subject} уже занят в это время "
+            f"(запись #{booking.pk}, {start_str} - {end_str})"
+        )
+
     def check_box_conflict(self):
         """Проверка конфликта времени для бокса"""
-        if not self.scheduled_time or not self.box:
+        if not self.scheduled_time or not self.box_id:
             return
 
-        # Исключаем завершенные и отмененные записи
-        active_statuses = ["pending", "in_progress"]
-        end_time = self.get_end_time()
-
-        conflicting_bookings = Booking.objects.filter(
-            box=self.box, status__in=active_statuses
-        ).exclude(pk=self.pk if self.pk else None)
-
-        # Проверяем пересечение интервалов времени
-        for booking in conflicting_bookings:
-            booking_end = booking.get_end_time()
-            # Проверяем пересечение интервалов
-            if (
-                self.scheduled_time < booking_end
-                and end_time > booking.scheduled_time
-            ):
-                start_str = booking.scheduled_time.strftime("%d.%m.%Y %H:%M")
-                end_str = booking_end.strftime("%H:%M")
-                msg = (
-                    f"Бокс {self.box} уже занят в это время "
-                    f"(запись #{booking.pk}, {start_str} - {end_str})"
-                )
-                raise ValidationError({"box": msg})
+        booking = self._find_conflict(box_id=self.box_id)
+        if booking:
+            msg = self.conflict_message(f"Бокс {self.box}", booking)
+            raise ValidationError({"box": msg})
 
     def check_washer_conflict(self):
         """Проверка конфликта времени для мойщика"""
-        if not self.scheduled_time or not self.washer:
+        if not self.scheduled_time or not self.washer_id:
             return
 
-        # Исключаем завершенные и отмененные записи
-        active_statuses = ["pending", "in_progress"]
-        end_time = self.get_end_time()
-
-        conflicting_bookings = Booking.objects.filter(
-            washer=self.washer, status__in=active_statuses
-        ).exclude(pk=self.pk if self.pk else None)
-
-        # Проверяем пересечение интервалов времени
-        for booking in conflicting_bookings:
-            booking_end = booking.get_end_time()
-            # Проверяем пересечение интервалов
-            if (
-                self.scheduled_time < booking_end
-                and end_time > booking.scheduled_time
-            ):
-                start_str = booking.scheduled_time.strftime("%d.%m.%Y %H:%M")
-                end_str = booking_end.strftime("%H:%M")
-                msg = (
-                    f"Мойщик {self.washer} уже занят в это время "
-                    f"(запись #{booking.pk}, {start_str} - {end_str})"
-                )
-                raise ValidationError({"washer": msg})
+        booking = self._find_conflict(washer_id=self.washer_id)
+        if booking:
+            msg = self.conflict_message(f"Мойщик {self.washer}", booking)
+            raise ValidationError({"washer": msg})
 
     def clean(self):
         """Валидация модели"""
@@ -300,4 +356,150 @@ class Booking(models.Model):
         """Переопределяем save для валидации"""
         # Не вызываем full_clean здесь, чтобы избежать проблем
         # при создании через форму
-        super().save(*args, **kwargs)
+        self.end_time = self.get_end_time()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and (
+            {"scheduled_time", "duration_minutes"} & set(update_fields)
+        ):
+            kwargs["update_fields"] = {*update_fields, "end_time"}
+        # Сводки обновляются сигналами в одной транзакции с записью
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class DailyBookingStats(models.Model):
+    """Сводка записей за день по боксу, мойщику и статусу.
+
+    Обновляется при каждом сохранении и удалении записи (см. rollups.py),
+    поэтому отчеты не сканируют таблицу записей.
+    """
+
+    date = models.DateField(verbose_name="Дата")
+    box = models.ForeignKey(
+        Box,
+        on_delete=models.CASCADE,
+        verbose_name="Бокс",
+        related_name="daily_stats",
+    )
+    washer = models.ForeignKey(
+        Washer,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name="Мойщик",
+        related_name="daily_stats",
+    )
+    status = models.CharField(
+        max_length=20, choices=Booking.STATUS_CHOICES, verbose_name="Статус"
+    )
+    bookings = models.IntegerField(default=0, verbose_name="Записей")
+    minutes = models.IntegerField(default=0, verbose_name="Минут")
+    base_price = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, verbose_name="Базовая цена"
+    )
+    discount_amount = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, verbose_name="Скидка"
+    )
+    final_price = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, verbose_name="Итоговая цена"
+    )
+
+    class Meta:
+        verbose_name = "Сводка за день"
+        verbose_name_plural = "Сводки за день"
+        ordering = ["date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "box", "washer", "status"],
+                name="daily_stats_key",
+            ),
+            # NULL в уникальном ключе не совпадает сам с собой
+            models.UniqueConstraint(
+                fields=["date", "box", "status"],
+                condition=models.Q(washer__isnull=True),
+                name="daily_stats_key_no_washer",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.box} {self.washer or '-'} {self.status}"
+
+
+class ArchivedBooking(models.Model):
+    """Завершенная или отмененная запись, перенесенная в архив.
+
+    Записи переносятся командой archive_bookings (см. archive.py) с тем же
+    номером, услугами и ценами, чтобы таблица Booking оставалась небольшой.
+    Архивные записи не меняются; их вклад в сводки DailyBookingStats
+    сохраняется.
+    """
+
+    # Номер исходной записи
+    id = models.BigIntegerField(primary_key=True, verbose_name="Номер записи")
+    client = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        verbose_name="Клиент",
+        related_name="archived_bookings",
+    )
+    services = models.ManyToManyField(
+        Service, verbose_name="Услуги", related_name="archived_bookings"
+    )
+    box = models.ForeignKey(
+        Box,
+        on_delete=models.PROTECT,
+        verbose_name="Бокс",
+        related_name="archived_bookings",
+    )
+    washer = models.ForeignKey(
+        Washer,
+        on_delete=models.PROTECT,
+        verbose_name="Мойщик",
+        related_name="archived_bookings",
+        null=True,
+        blank=True,
+    )
+    scheduled_time = models.DateTimeField(verbose_name="Запланированное время")
+    duration_minutes = models.IntegerField(verbose_name="Длительность (минут)")
+    end_time = models.DateTimeField(verbose_name="Время окончания")
+    status = models.CharField(
+        max_length=20, choices=Booking.STATUS_CHOICES, verbose_name="Статус"
+    )
+    base_price = models.DecimalField(
+        max_digits=10, decimal_places=2, verbose_name="Базовая цена"
+    )
+    discount_amount = models.DecimalField(
+        max_digits=10, decimal_places=2, verbose_name="Сумма скидки"
+    )
+    final_price = models.DecimalField(
+        max_digits=10, decimal_places=2, verbose_name="Итоговая цена"
+    )
+    created_at = models.DateTimeField(verbose_name="Дата создания")
+    updated_at = models.DateTimeField(verbose_name="Дата изменения")
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        verbose_name="Создано администратором",
+        related_name="archived_bookings",
+    )
+    notes = models.TextField(blank=True, verbose_name="Заметки")
+    archived_at = models.DateTimeField(
+        auto_now_add=True, verbose_name="Дата переноса в архив"
+    )
+
+    class Meta:
+        verbose_name = "Архивная запись"
+        verbose_name_plural = "Архивные записи"
+        ordering = ["-scheduled_time", "-created_at"]
+        indexes = [
+            # Загрузка боксов за период (analytics.py) и пересчет сводок
+            models.Index(
+                fields=["box", "scheduled_time"], name="archived_box_time_idx"
+            ),
+            models.Index(fields=["scheduled_time"], name="archived_time_idx"),
+        ]
+
+    def __str__(self):
+        date_str = self.scheduled_time.strftime("%d.%m.%Y %H:%M")
+        return f"{self.client.name} - {date_str}"
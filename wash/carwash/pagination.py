@@ -0,0 +1,67 @@
+"""Постраничный вывод по ключу (keyset) без OFFSET и COUNT(*)"""
+
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Q
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Наибольший id (BigAutoField, INTEGER в SQLite)
+MAX_PK = 2**63 - 1
+
+
+def encode_cursor(obj):
+    """Курсор записи: время создания в микросекундах и id"""
+    micros = (obj.created_at - EPOCH) // timedelta(microseconds=1)
+    return f"{micros}-{obj.pk}"
+
+
+def decode_cursor(cursor):
+    """(created_at, id) из курсора или None, если курсор некорректен"""
+    try:
+        micros, pk = (int(part) for part in cursor.split("-"))
+        created_at = EPOCH + timedelta(microseconds=micros)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+    if not 0 < pk <= MAX_PK:
+        return None
+    return created_at, pk
+
+
+def keyset_page(queryset, page_size, after=None, before=None):
+    """Страница записей в порядке (-created_at, -id).
+
+    after - курсор последней записи предыдущей страницы (вперед),
+    before - курсор первой записи следующей страницы (назад).
+    Выбирается page_size + 1 строк, чтобы узнать, есть ли еще
+    страница, поэтому стоимость любой страницы одинакова.
+    Возвращает (записи, курсор следующей, курсор предыдущей страницы).
+    """
+    after = decode_cursor(after) if after else None
+    before = decode_cursor(before) if before else None
+
+    if before:
+        created_at, pk = before
+        rows = list(
+            queryset.filter(
+                Q(created_at__gt=created_at)
+                | Q(created_at=created_at, pk__gt=pk)
+            ).order_by("created_at", "pk")[: page_size + 1]
+        )
+        has_more = len(rows) > page_size
+        items = rows[:page_size][::-1]
+        has_next, has_prev = True, has_more
+    else:
+        if after:
+            created_at, pk = after
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at)
+                | Q(created_at=created_at, pk__lt=pk)
+            )
+        rows = list(queryset.order_by("-created_at", "-pk")[: page_size + 1])
+        items = rows[:page_size]
+        has_next, has_prev = len(rows) > page_size, after is not None
+
+    next_cursor = encode_cursor(items[-1]) if items and has_next else None
+    prev_cursor = encode_cursor(items[0]) if items and has_prev else None
+    return items, next_cursor, prev_cursor
@@ -0,0 +1,177 @@
+"""Расчет цен записей"""
+
+import threading
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from . import rollups
+from .models import Booking, Service
+from .versions import aget_version, get_version
+
+# Скидка постоянного клиента, назначаемая в BookingForm
+REGULAR_DISCOUNT_PERCENT = 10
+
+PRICE_FIELDS = ["base_price", "discount_amount", "final_price"]
+
+# Точность цен в БД (decimal_places=2 у полей цен Booking)
+CENT = Decimal("0.01")
+
+
+def reprice_bookings(queryset, batch_size=1000):
+    """Пересчитывает цены записей queryset пакетами по batch_size.
+
+    На пакет: один запрос записей с клиентами, одна агрегация суммы
+    цен услуг по промежуточной таблице и по одному UPDATE на каждое
+    сочетание новых цен среди записей, цена которых изменилась, - все
+    в одной транзакции. Возвращает (обработано, изменено).
+    """
+    queryset = (
+        queryset.select_related("client")
+        .only(
+            "pk",
+            "client__is_regular",
+            "client__discount_percent",
+            *rollups.FIELDS,
+        )
+        .order_by("pk")
+    )
+    if connection.features.has_select_for_update:
+        # Записи пакета не должны меняться между чтением и UPDATE, иначе
+        # сводки получат устаревшие снимки; клиентов не блокируем
+        of = ("self",) if connection.features.has_select_for_update_of else ()
+        queryset = queryset.select_for_update(of=of)
+    processed = changed = 0
+    last_pk = 0
+    while True:
+        # Пакет читается и обновляется в одной транзакции (в SQLite она
+        # сразу берет блокировку на запись)
+        with transaction.atomic():
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            processed += len(batch)
+            changed += _reprice_batch(batch)
+    return processed, changed
+
+
+def _reprice_batch(batch):
+    """Пересчитывает цены пакета записей; возвращает число измененных"""
+    through = Booking.services.through
+    totals = dict(
+        through.objects.filter(booking_id__in=[b.pk for b in batch])
+        .values("booking_id")
+        .annotate(total=Sum("service__price"))
+        .values_list("booking_id", "total")
+    )
+    # Записи с одинаковыми новыми ценами обновляются одним UPDATE:
+    # различных сочетаний цен в пакете немного, а bulk_update строит
+    # CASE по каждой записи, что на больших пакетах очень медленно
+    groups = defaultdict(list)
+    removed, added = [], []
+    for booking in batch:
+        old = [getattr(booking, field) for field in PRICE_FIELDS]
+        before = rollups.snapshot(booking)
+        booking.base_price = totals.get(booking.pk) or 0
+        booking.apply_discount()
+        # Сравниваем с ценами в том виде, в каком их хранит БД, иначе
+        # запись с дробной скидкой менялась бы при каждом запуске
+        new = [
+            Decimal(getattr(booking, field)).quantize(CENT)
+            for field in PRICE_FIELDS
+        ]
+        for field, value in zip(PRICE_FIELDS, new):
+            setattr(booking, field, value)
+        if new != old:
+            groups[tuple(new)].append(booking.pk)
+            removed.append(before)
+            added.append(rollups.snapshot(booking))
+    now = timezone.now()
+    changed = 0
+    for prices, pks in groups.items():
+        Booking.objects.filter(pk__in=pks).update(
+            **dict(zip(PRICE_FIELDS, prices)), updated_at=now
+        )
+        changed += len(pks)
+    # UPDATE идет в обход save(), поэтому сводки обновляются здесь
+    rollups.apply(removed=removed, added=added)
+    return changed
+
+
+class ServicePriceTable:
+    """Цены активных услуг в памяти процесса.
+
+    Таблица перечитывается из БД, только когда меняется метка версии
+    "services" (ее обновляют сигналы Service), поэтому расчет цены
+    в обычном случае не обращается к БД.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._prices = {}
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._prices = {}
+
+    def prices(self):
+        """Словарь {id услуги: цена}"""
+        # Метку читаем до загрузки: изменение во время загрузки
+        # приведет к повторной загрузке при следующем обращении
+        version = get_version("services")
+        with self._lock:
+            if version != self._version:
+                self._prices = dict(
+                    Service.objects.filter(is_active=True).values_list(
+                        "pk", "price"
+                    )
+                )
+                self._version = version
+            return self._prices
+
+    async def aprices(self):
+        """Асинхронный вариант prices()"""
+        version = await aget_version("services")
+        with self._lock:
+            if version == self._version:
+                return self._prices
+        prices = {
+            pk: price
+            async for pk, price in Service.objects.filter(
+                is_active=True
+            ).values_list("pk", "price")
+        }
+        with self._lock:
+            self._prices = prices
+            self._version = version
+        return prices
+
+    def quote(self, service_ids, is_regular, prices=None):
+        """Расчет цены набора услуг (неактивные и неизвестные пропускаются).
+
+        prices - результат prices() или aprices(); по умолчанию
+        запрашивается здесь.
+        """
+        if prices is None:
+            prices = self.prices()
+        base_price = sum(
+            (prices[pk] for pk in set(service_ids) if pk in prices),
+            Decimal(0),
+        )
+        discount_percent = REGULAR_DISCOUNT_PERCENT if is_regular else 0
+        discount_amount = base_price * discount_percent / 100
+        return {
+            "base_price": float(base_price),
+            "discount_percent": discount_percent,
+            "discount_amount": float(discount_amount),
+            "final_price": float(base_price - discount_amount),
+        }
+
+
+price_table = ServicePriceTable()
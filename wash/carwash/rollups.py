@@ -0,0 +1,233 @@
+"""Ежедневные сводки записей (DailyBookingStats).
+
+Сводка хранит по ключу (дата, бокс, мойщик, статус) число записей,
+забронированные минуты и суммы цен. При сохранении или удалении записи
+вклад ее прежнего состояния вычитается, а нового - прибавляется
+(сигналы в signals.py), в той же транзакции, что и сама запись.
+Массовые изменения в обход save() применяют разницу через apply(),
+а rebuild() пересчитывает сводки за период по таблицам записей
+(текущей и архивной).
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .availability import day_bounds
+from .models import ArchivedBooking, Booking, DailyBookingStats, Washer
+from .stats import washer_version_name
+from .versions import bump_version
+
+# Поля записи, от которых зависит ее вклад в сводки
+FIELDS = [
+    "scheduled_time",
+    "duration_minutes",
+    "box_id",
+    "washer_id",
+    "status",
+    "base_price",
+    "discount_amount",
+    "final_price",
+]
+
+METRICS = ["bookings", "minutes", "base_price", "discount_amount", "final_price"]
+
+
+def snapshot(booking):
+    """Значения FIELDS записи в виде словаря"""
+    return {field: getattr(booking, field) for field in FIELDS}
+
+
+def saved_snapshot(booking, old, update_fields=None):
+    """Состояние записи в БД после save(update_fields=...)"""
+    new = snapshot(booking)
+    if old is None or update_fields is None:
+        return new
+    saved = {Booking._meta.get_field(name).attname for name in update_fields}
+    return {
+        field: new[field] if field in saved else old[field] for field in FIELDS
+    }
+
+
+def _key(row):
+    return (
+        timezone.localtime(row["scheduled_time"]).date(),
+        row["box_id"],
+        row["washer_id"],
+        row["status"],
+    )
+
+
+def _values(row):
+    return [
+        1,
+        row["duration_minutes"],
+        Decimal(row["base_price"]),
+        Decimal(row["discount_amount"]),
+        Decimal(row["final_price"]),
+    ]
+
+
+def apply(removed=(), added=()):
+    """Вычитает вклад записей removed и прибавляет вклад added.
+
+    Записи передаются словарями с полями FIELDS. Изменения по одному
+    ключу суммируются: на ключ - один UPDATE, а если строки сводки еще
+    нет - INSERT и повторный UPDATE.
+    """
+    deltas = defaultdict(lambda: [0, 0, Decimal(0), Decimal(0), Decimal(0)])
+    for sign, rows in ((-1, removed), (1, added)):
+        for row in rows:
+            delta = deltas[_key(row)]
+            for i, value in enumerate(_values(row)):
+                delta[i] += sign * value
+
+    washer_ids = set()
+    for (day, box_id, washer_id, status), delta in deltas.items():
+        if not any(delta):
+            continue
+        washer_ids.add(washer_id)
+        stats = DailyBookingStats.objects.filter(
+            date=day, box_id=box_id, washer_id=washer_id, status=status
+        )
+        changes = {
+            metric: F(metric) + value for metric, value in zip(METRICS, delta)
+        }
+        if stats.update(**changes):
+            continue
+        # Пустая строка создается, только если ее нет (ее могла успеть
+        # создать параллельная транзакция), затем к ней применяется разница
+        DailyBookingStats.objects.bulk_create(
+            [
+                DailyBookingStats(
+                    date=day, box_id=box_id, washer_id=washer_id, status=status
+                )
+            ],
+            ignore_conflicts=True,
+        )
+        stats.update(**changes)
+
+    # Кешированные показатели этих мойщиков (stats.py) устарели
+    for washer_id in washer_ids - {None}:
+        transaction.on_commit(
+            partial(bump_version, washer_version_name(washer_id))
+        )
+
+
+def _daily_totals(queryset, date_from, date_to):
+    """Суммы METRICS записей queryset за даты по ключу сводки"""
+    queryset = queryset.annotate(
+        local_date=TruncDate(
+            "scheduled_time", tzinfo=timezone.get_current_timezone()
+        )
+    )
+    # Границы местных суток, чтобы отбор записей шел по индексу
+    if date_from:
+        queryset = queryset.filter(scheduled_time__gte=day_bounds(date_from)[0])
+    if date_to:
+        queryset = queryset.filter(scheduled_time__lt=day_bounds(date_to)[1])
+    rows = (
+        queryset.order_by()
+        .values("local_date", "box_id", "washer_id", "status")
+        .annotate(
+            total=Count("pk"),
+            total_minutes=Sum("duration_minutes"),
+            total_base_price=Sum("base_price"),
+            total_discount_amount=Sum("discount_amount"),
+            total_final_price=Sum("final_price"),
+        )
+    )
+    for row in rows.iterator():
+        key = (row["local_date"], row["box_id"], row["washer_id"], row["status"])
+        yield key, [
+            row["total"],
+            row["total_minutes"],
+            row["total_base_price"],
+            row["total_discount_amount"],
+            row["total_final_price"],
+        ]
+
+
+def rebuild(date_from=None, date_to=None):
+    """Пересчитывает сводки за даты [date_from, date_to] по записям.
+
+    Учитываются и текущие, и архивные записи (archive.py). Границы
+    включительно, None - без ограничения. Возвращает число созданных
+    строк сводки.
+    """
+    stats = DailyBookingStats.objects.all()
+    if date_from:
+        stats = stats.filter(date__gte=date_from)
+    if date_to:
+        stats = stats.filter(date__lte=date_to)
+
+    totals = defaultdict(lambda: [0, 0, Decimal(0), Decimal(0), Decimal(0)])
+    with transaction.atomic():
+        for model in (Booking, ArchivedBooking):
+            rows = _daily_totals(model.objects.all(), date_from, date_to)
+            for key, values in rows:
+                total = totals[key]
+                for i, value in enumerate(values):
+                    total[i] += value
+        stats.delete()
+        created = DailyBookingStats.objects.bulk_create(
+            (
+                DailyBookingStats(
+                    date=day,
+                    box_id=box_id,
+                    washer_id=washer_id,
+                    status=status,
+                    **dict(zip(METRICS, total)),
+                )
+                for (day, box_id, washer_id, status), total in totals.items()
+            ),
+            batch_size=1000,
+        )
+        # Записи менялись в обход сигналов: сбрасываем показатели
+        # всех мойщиков
+        for washer_id in Washer.objects.values_list("pk", flat=True):
+            transaction.on_commit(
+                partial(bump_version, washer_version_name(washer_id))
+            )
+    return len(created)
+
+
+def report(date_from, date_to):
+    """Отчет за даты [date_from, date_to] только по сводкам.
+
+    Записи, часы и выручка считаются без отмененных записей; выручка и
+    скидки - только по завершенным.
+    """
+    not_cancelled = ~Q(status="cancelled")
+    completed = Q(status="completed")
+    metrics = {
+        "total": Sum("bookings", filter=not_cancelled, default=0),
+        "completed": Sum("bookings", filter=completed, default=0),
+        "cancelled": Sum("bookings", filter=Q(status="cancelled"), default=0),
+        "minutes": Sum("minutes", filter=not_cancelled, default=0),
+        "revenue": Sum("final_price", filter=completed, default=0),
+        "discounts": Sum("discount_amount", filter=completed, default=0),
+    }
+    stats = DailyBookingStats.objects.filter(
+        date__gte=date_from, date__lte=date_to
+    ).order_by()
+
+    def with_hours(row):
+        row["hours"] = round(row["minutes"] / 60, 1)
+        return row
+
+    def grouped(field):
+        rows = stats.values(field).annotate(**metrics).order_by(field)
+        return [with_hours(row) for row in rows]
+
+    return {
+        "summary": with_hours(stats.aggregate(**metrics)),
+        "days": grouped("date"),
+        "boxes": grouped("box"),
+        "washers": grouped("washer"),
+    }
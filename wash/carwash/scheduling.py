@@ -0,0 +1,129 @@
+"""Поиск свободного времени для боксов и мойщиков"""
+
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+from itertools import islice
+
+from django.db.models import Q
+
+from .models import ACTIVE_STATUSES, Booking, Box, Washer
+
+
+def merge_intervals(intervals):
+    """Объединяет пересекающиеся интервалы (проход по отсортированным)"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def free_intervals(busy, start, end):
+    """Свободные промежутки окна [start, end) между занятыми интервалами"""
+    result = []
+    current = start
+    for busy_start, busy_end in merge_intervals(busy):
+        if busy_end <= current:
+            continue
+        if busy_start >= end:
+            break
+        if busy_start > current:
+            result.append((current, busy_start))
+        current = max(current, busy_end)
+    if current < end:
+        result.append((current, end))
+    return result
+
+
+def intersect_intervals(first, second):
+    """Пересечение двух отсортированных списков непересекающихся интервалов"""
+    result = []
+    i = j = 0
+    while i < len(first) and j < len(second):
+        start = max(first[i][0], second[j][0])
+        end = min(first[i][1], second[j][1])
+        if start < end:
+            result.append((start, end))
+        if first[i][1] < second[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def _align(moment, origin, step):
+    """Первая точка сетки origin + k * step, не раньше moment"""
+    steps = -((origin - moment) // step)
+    return origin + max(steps, 0) * step
+
+
+def _slots(box, washer, intervals, origin, duration, step):
+    """Слоты бокса и мойщика в свободных промежутках по возрастанию начала"""
+    for free_start, free_end in intervals:
+        slot = _align(free_start, origin, step)
+        while slot + duration <= free_end:
+            yield {"box": box, "washer": washer, "start": slot}
+            slot += step
+
+
+def find_free_slots(start, end, duration, box=None, washer=None,
+                    step=timedelta(minutes=15), limit=None):
+    """Свободные слоты (бокс, мойщик, начало) длительностью duration.
+
+    Занятость окна [start, end) загружается одним запросом, затем для
+    каждого ресурса занятые интервалы объединяются, а свободные
+    промежутки бокса и мойщика пересекаются проходом по спискам.
+    Начала слотов выравниваются по сетке с шагом step от start.
+    Слоты пар (бокс, мойщик) сливаются по началу, поэтому при limit
+    создаются только первые limit слотов.
+    """
+    boxes = [box] if box else list(Box.objects.filter(is_active=True))
+    if washer:
+        washers = [washer]
+    else:
+        washers = list(
+            Washer.objects.filter(is_active=True).select_related("user")
+        )
+
+    busy = defaultdict(list)
+    rows = Booking.objects.filter(
+        Q(box__in=[b.pk for b in boxes])
+        | Q(washer__in=[w.pk for w in washers]),
+        status__in=ACTIVE_STATUSES,
+        scheduled_time__lt=end,
+        end_time__gt=start,
+    ).values_list("box_id", "washer_id", "scheduled_time", "end_time")
+    for box_id, washer_id, booking_start, booking_end in rows:
+        busy[("box", box_id)].append((booking_start, booking_end))
+        if washer_id:
+            busy[("washer", washer_id)].append((booking_start, booking_end))
+
+    box_free = {
+        b.pk: free_intervals(busy[("box", b.pk)], start, end) for b in boxes
+    }
+    # Без мойщиков слот подбирается только по боксу
+    washer_free = {
+        w.pk: free_intervals(busy[("washer", w.pk)], start, end)
+        for w in washers
+    } or {None: [(start, end)]}
+    washers_by_pk = {w.pk: w for w in washers}
+
+    pairs = [
+        _slots(
+            b,
+            washers_by_pk.get(washer_pk),
+            intersect_intervals(box_free[b.pk], washer_intervals),
+            start,
+            duration,
+            step,
+        )
+        for b in boxes
+        for washer_pk, washer_intervals in washer_free.items()
+    ]
+    # merge устойчива: слоты с одним началом идут в порядке боксов и мойщиков
+    slots = heapq.merge(*pairs, key=lambda s: s["start"])
+    return list(islice(slots, limit))
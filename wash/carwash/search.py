@@ -0,0 +1,151 @@
+"""Быстрый поиск клиентов по имени, заметкам и телефону.
+
+Телефон ищется по началу номера: в Client.phone_digits хранятся только
+цифры (без кода страны), и префикс превращается в диапазон
+phone_digits >= p AND phone_digits < p', который обслуживается обычным
+индексом. Имя и заметки на SQLite ищутся через полнотекстовую таблицу
+FTS5 carwash_client_fts (см. миграцию 0007) по началам слов; на других
+СУБД используется icontains.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Client
+from .versions import get_version
+
+FTS_TABLE = "carwash_client_fts"
+
+WORD_RE = re.compile(r"\w+")
+
+
+def _phone_prefix_q(digits):
+    """Номера, начинающиеся с digits (с кодом страны 7/8 или без него)"""
+    prefixes = {digits}
+    if len(digits) > 1 and digits[0] in "78":
+        prefixes.add(digits[1:])
+    condition = Q(pk__in=[])
+    for prefix in prefixes:
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        condition |= Q(phone_digits__gte=prefix, phone_digits__lt=upper)
+    return condition
+
+
+def _text_q(words):
+    """Клиенты, у которых в имени или заметках есть слова, начинающиеся
+    с каждого из words"""
+    if connection.vendor == "sqlite":
+        match = " ".join('"{}"*'.format(word.replace('"', '""')) for word in words)
+        return Q(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                [match],
+            )
+        )
+    condition = Q()
+    for word in words:
+        condition &= Q(name__icontains=word) | Q(notes__icontains=word)
+    return condition
+
+
+def client_search_q(query):
+    """Условие поиска клиентов по строке запроса.
+
+    Цифры запроса ищутся как начало телефона, остальные слова - в имени
+    и заметках; если есть и то и другое, должны совпасть оба условия.
+    """
+    words = [word for word in WORD_RE.findall(query) if not word.isdigit()]
+    digits = "".join(char for char in query if char.isdigit())
+    if not words and not digits:
+        return Q(pk__in=[])
+    condition = Q()
+    if digits:
+        condition &= _phone_prefix_q(digits)
+    if words:
+        condition &= _text_q(words)
+    return condition
+
+
+def search_clients(query):
+    """Клиенты, подходящие под строку запроса"""
+    return Client.objects.filter(client_search_q(query))
+
+
+def filter_bookings(bookings, params):
+    """Фильтры списка записей (status, search) из GET-параметров"""
+    status = params.get("status")
+    if status:
+        bookings = bookings.filter(status=status)
+    search = params.get("search")
+    if search:
+        bookings = bookings.filter(client__in=search_clients(search))
+    return bookings
+
+
+def _cache_size():
+    return getattr(settings, "CLIENT_AUTOCOMPLETE_CACHE_SIZE", 256)
+
+
+class ClientAutocomplete:
+    """Подсказки клиентов для формы записи с LRU-кешем запросов.
+
+    Результаты последних запросов хранятся в памяти процесса; кеш
+    сбрасывается целиком, когда меняется метка версии "clients" (ее
+    обновляют сигналы Client). Повторное нажатие клавиши, возврат
+    на символ назад или тот же запрос у соседнего администратора
+    отвечают без обращения к БД.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._results = OrderedDict()
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+    def _lookup(self, query, limit):
+        clients = search_clients(query).order_by("name", "pk")[:limit]
+        return [
+            {
+                "id": client.pk,
+                "name": client.name,
+                "phone": client.phone,
+                "is_regular": client.is_regular,
+            }
+            for client in clients.only("pk", "name", "phone", "is_regular")
+        ]
+
+    def suggest(self, query, limit=10):
+        """До limit клиентов, подходящих под начало имени или телефона"""
+        key = (" ".join(query.lower().split()), limit)
+        if not key[0]:
+            return []
+        version = get_version("clients")
+        with self._lock:
+            if version != self._version:
+                self._results.clear()
+                self._version = version
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                return result
+
+        result = self._lookup(query, limit)
+        with self._lock:
+            # Пока шел запрос, клиенты могли измениться
+            if version == self._version:
+                self._results[key] = result
+                while len(self._results) > _cache_size():
+                    self._results.popitem(last=False)
+        return result
+
+
+autocomplete = ClientAutocomplete()
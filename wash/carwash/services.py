@@ -0,0 +1,128 @@
+"""Запись бронирований в БД"""
+
+from django.db import connection, transaction
+
+from .models import Booking, Box, Client, Washer, normalize_phone
+
+
+def lock_resources(box_id, washer_id=None):
+    """Блокирует строки бокса и мойщика до конца текущей транзакции.
+
+    Записи на разные боксы и мойщиков не блокируют друг друга. Бокс
+    всегда блокируется раньше мойщика, поэтому взаимоблокировок нет.
+    """
+    if not connection.features.has_select_for_update:
+        # SQLite: транзакции берут блокировку всей БД на запись
+        # (transaction_mode = IMMEDIATE в настройках)
+        return
+    list(Box.objects.select_for_update().filter(pk=box_id).values_list("pk"))
+    if washer_id:
+        list(
+            Washer.objects.select_for_update()
+            .filter(pk=washer_id)
+            .values_list("pk")
+        )
+
+
+def resolve_client(name, phone, is_regular):
+    """Клиент по телефону: создается, если его нет, и сохраняется,
+    только если изменились имя или признак постоянного клиента"""
+    discount_percent = 10 if is_regular else 0
+    # Один и тот же номер в разной записи (+7..., 8..., со скобками)
+    # не должен создавать второго клиента
+    digits = normalize_phone(phone)
+    if digits:
+        clients = Client.objects.filter(phone_digits=digits)
+    else:
+        clients = Client.objects.filter(phone=phone)
+    client = clients.order_by("pk").first()
+    if client is None:
+        return Client.objects.create(
+            name=name,
+            phone=phone,
+            is_regular=is_regular,
+            discount_percent=discount_percent,
+        )
+
+    changed = []
+    for field, value in (
+        ("name", name),
+        ("is_regular", is_regular),
+        ("discount_percent", discount_percent),
+    ):
+        if getattr(client, field) != value:
+            setattr(client, field, value)
+            changed.append(field)
+    if changed:
+        client.save(update_fields=changed)
+    return client
+
+
+def set_booking_services(booking, services, created=False):
+    """Сохраняет услуги записи: удаляет лишние и добавляет новые
+    связи не более чем двумя запросами"""
+    through = Booking.services.through
+    service_ids = {service.pk for service in services}
+
+    if created:
+        current_ids = set()
+    elif "services" in getattr(booking, "_prefetched_objects_cache", {}):
+        current_ids = {
+            service.pk
+            for service in booking._prefetched_objects_cache["services"]
+        }
+    else:
+        current_ids = set(
+            through.objects.filter(booking_id=booking.pk).values_list(
+                "service_id", flat=True
+            )
+        )
+
+    removed = current_ids - service_ids
+    if removed:
+        through.objects.filter(
+            booking_id=booking.pk, service_id__in=removed
+        ).delete()
+    added = service_ids - current_ids
+    if added:
+        through.objects.bulk_create(
+            through(booking_id=booking.pk, service_id=service_id)
+            for service_id in added
+        )
+    # Кеш prefetch_related больше не соответствует БД
+    getattr(booking, "_prefetched_objects_cache", {}).pop("services", None)
+
+
+def save_booking(booking, services, created_by=None):
+    """Сохраняет запись вместе с услугами одной транзакцией.
+
+    Цена считается по уже загруженным услугам и клиенту, запись
+    сохраняется одним INSERT/UPDATE, связи с услугами - пакетно.
+    Проверка пересечений повторяется после блокировки бокса и мойщика,
+    поэтому две одновременные записи на одно время не могут пройти обе.
+    При конфликте выбрасывается ValidationError.
+    """
+    services = list(services)
+    created = booking.pk is None
+    # Во вложенном вызове работаем в транзакции вызывающего кода
+    with transaction.atomic(savepoint=False):
+        if created and created_by is not None:
+            booking.created_by = created_by
+
+        lock_resources(booking.box_id, booking.washer_id)
+        booking.check_box_conflict()
+        booking.check_washer_conflict()
+
+        booking.calculate_price(services)
+        booking.save()
+        set_booking_services(booking, services, created=created)
+    return booking
+
+
+def save_booking_form(form, created_by=None):
+    """Сохраняет запись из BookingForm, включая клиента, одной транзакцией"""
+    with transaction.atomic():
+        booking = form.save(commit=False)
+        return save_booking(
+            booking, form.cleaned_data["services"], created_by=created_by
+        )
@@ -0,0 +1,96 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import availability, events, rollups
+from .models import ACTIVE_STATUSES, Booking, Client, Service
+from .stats import washer_version_name
+from .versions import bump_version
+
+
+def _bump_washers(washer_ids):
+    """После фиксации транзакции меняет метки версий мойщиков
+    (очередь мойщика, washer_queue.py)"""
+    for washer_id in set(washer_ids) - {None}:
+        transaction.on_commit(
+            partial(bump_version, washer_version_name(washer_id))
+        )
+
+
+@receiver(pre_save, sender=Booking)
+def booking_saving(sender, instance, raw=False, **kwargs):
+    """Запоминаем состояние записи в БД для обновления сводок"""
+    instance._rollup_old = None
+    if instance.pk and not raw:
+        instance._rollup_old = (
+            Booking.objects.filter(pk=instance.pk).values(*rollups.FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(
+    sender, instance, created=False, raw=False, update_fields=None, **kwargs
+):
+    """Обновляем сводки в той же транзакции, а индекс занятости и
+    подписчиков событий - после ее фиксации"""
+    old = getattr(instance, "_rollup_old", None)
+    if not raw:
+        rollups.apply(
+            removed=[old] if old else [],
+            added=[rollups.saved_snapshot(instance, old, update_fields)],
+        )
+    _bump_washers([instance.washer_id, old and old["washer_id"]])
+    transaction.on_commit(
+        partial(availability.index.booking_changed, instance)
+    )
+    transaction.on_commit(
+        partial(events.booking_saved, instance, created, old)
+    )
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    """Вычитаем запись из сводок, а после фиксации транзакции удаляем
+    ее из индекса занятости и оповещаем подписчиков"""
+    snapshot = rollups.snapshot(instance)
+    rollups.apply(removed=[snapshot])
+    _bump_washers([instance.washer_id])
+    transaction.on_commit(
+        partial(availability.index.booking_deleted, instance.pk)
+    )
+    transaction.on_commit(
+        partial(events.booking_deleted, instance.pk, snapshot)
+    )
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def service_changed(sender, **kwargs):
+    """Сбрасываем кешированные цены услуг после фиксации транзакции"""
+    transaction.on_commit(partial(bump_version, "services"))
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def client_changed(sender, **kwargs):
+    """Сбрасываем подсказки клиентов после фиксации транзакции"""
+    transaction.on_commit(partial(bump_version, "clients"))
+
+
+@receiver(post_save, sender=Client)
+def client_saved(
+    sender, instance, created=False, raw=False, update_fields=None, **kwargs
+):
+    """Имя и телефон клиента показываются в очередях мойщиков"""
+    if created or raw:
+        return
+    if update_fields is not None and not {"name", "phone"} & set(update_fields):
+        return
+    _bump_washers(
+        Booking.objects.filter(client=instance, status__in=ACTIVE_STATUSES)
+        .exclude(washer=None)
+        .values_list("washer_id", flat=True)
+        .distinct()
+    )
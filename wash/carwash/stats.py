@@ -0,0 +1,101 @@
+"""Показатели мойщиков за период.
+
+Показатели считаются одним запросом с условными агрегатами по
+ежедневным сводкам мойщиков за период (DailyBookingStats, с учетом
+архивных записей) и кешируются по каждому мойщику отдельно.
+В ключ кеша входит метка версии "washer:<id>", которую меняет любое
+изменение записей мойщика (signals.py, rollups.apply), поэтому пересчитываются
+только мойщики, чьи записи изменились.
+"""
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from .models import DailyBookingStats, Washer
+from .versions import get_versions
+
+METRICS = [
+    "completed",
+    "avg_duration",
+    "revenue",
+    "booked_minutes",
+    "active_days",
+    "idle_minutes",
+]
+
+
+def washer_version_name(washer_id):
+    return f"washer:{washer_id}"
+
+
+def _compute(washer_ids, date_from, date_to):
+    """Показатели мойщиков washer_ids одним запросом по сводкам"""
+    # Сводки хранят вклад и архивных записей (archive.py)
+    completed = Q(status="completed")
+    worked = ~Q(status="cancelled") & Q(bookings__gt=0)
+    rows = (
+        DailyBookingStats.objects.filter(
+            washer_id__in=washer_ids, date__gte=date_from, date__lte=date_to
+        )
+        .values("washer_id")
+        .annotate(
+            completed=Sum("bookings", filter=completed, default=0),
+            completed_minutes=Sum("minutes", filter=completed, default=0),
+            revenue=Sum("final_price", filter=completed, default=0),
+            booked_minutes=Sum("minutes", filter=worked, default=0),
+            active_days=Count("date", filter=worked, distinct=True),
+        )
+        .order_by()
+    )
+    empty = {
+        "completed": 0,
+        "completed_minutes": 0,
+        "revenue": Decimal(0),
+        "booked_minutes": 0,
+        "active_days": 0,
+    }
+    result = {pk: dict(empty) for pk in washer_ids}
+    for row in rows:
+        result[row.pop("washer_id")] = row
+    for row in result.values():
+        # Простой - рабочее время дней с записями без занятого времени
+        working = row["active_days"] * settings.WASHER_WORKDAY_MINUTES
+        row["idle_minutes"] = max(working - row["booked_minutes"], 0)
+        minutes = row.pop("completed_minutes")
+        row["avg_duration"] = (
+            round(minutes / row["completed"], 1) if row["completed"] else None
+        )
+    return result
+
+
+def washer_stats(date_from, date_to, washers=None):
+    """Показатели мойщиков за даты [date_from, date_to].
+
+    Возвращает список словарей {"washer": мойщик, показатели METRICS}
+    в порядке washers (по умолчанию - все мойщики).
+    """
+    if washers is None:
+        washers = list(Washer.objects.select_related("user"))
+    versions = get_versions(washer_version_name(w.pk) for w in washers)
+    keys = {
+        w.pk: "carwash:washer_stats:{}:{}:{}:{}".format(
+            w.pk,
+            versions[washer_version_name(w.pk)],
+            date_from.isoformat(),
+            date_to.isoformat(),
+        )
+        for w in washers
+    }
+    cached = cache.get_many(keys.values())
+    missing = [pk for pk, key in keys.items() if key not in cached]
+    if missing:
+        computed = _compute(missing, date_from, date_to)
+        fresh = {keys[pk]: computed[pk] for pk in missing if pk in computed}
+        cache.set_many(fresh, settings.WASHER_STATS_CACHE_SECONDS)
+        cached.update(fresh)
+    return [
+        {"washer": w, **cached[keys[w.pk]]} for w in washers if keys[w.pk] in cached
+    ]
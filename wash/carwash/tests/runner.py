@@ -0,0 +1,41 @@
+import copy
+import os
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from ..versions import VERSIONS_CACHE
+
+VERSIONS_CACHE_DIR_VARIABLE = "WASH_VERSIONS_CACHE_DIR"
+
+
+class TestRunner(DiscoverRunner):
+    """Запуск тестов с метками версий во временном каталоге.
+
+    Тесты сбрасывают и меняют метки, а каталог CACHES["versions"]
+    общий с запущенными на той же копии процессами разработчика.
+    Каталог подменяется и в этом процессе (override_settings), и в
+    переменной окружения - для процессов, запускаемых тестами, и
+    рабочих процессов --parallel.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._versions_dir = tempfile.TemporaryDirectory(prefix="wash-versions-")
+        self._saved_variable = os.environ.get(VERSIONS_CACHE_DIR_VARIABLE)
+        os.environ[VERSIONS_CACHE_DIR_VARIABLE] = self._versions_dir.name
+        caches = copy.deepcopy(settings.CACHES)
+        caches[VERSIONS_CACHE]["LOCATION"] = self._versions_dir.name
+        self._caches_override = override_settings(CACHES=caches)
+        self._caches_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches_override.disable()
+        if self._saved_variable is None:
+            os.environ.pop(VERSIONS_CACHE_DIR_VARIABLE, None)
+        else:
+            os.environ[VERSIONS_CACHE_DIR_VARIABLE] = self._saved_variable
+        self._versions_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
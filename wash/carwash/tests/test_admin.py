@@ -0,0 +1,64 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import services
+from ..models import Booking, Service
+from .utils import CarwashTestCase
+
+
+class BookingAdminTests(CarwashTestCase):
+    """Сохранение записей из админ-панели"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin = User.objects.create_superuser("root", "", "root")
+        cls.wash = Service.objects.create(name="Мойка", price=500)
+        cls.day = timezone.localdate() + timedelta(days=1)
+        Booking.objects.create(
+            client=cls.client_obj,
+            box=cls.box,
+            scheduled_time=cls.at(10),
+            duration_minutes=60,
+        )
+
+    def add(self, hour):
+        self.client.force_login(self.admin)
+        return self.client.post(
+            reverse("admin:carwash_booking_add"),
+            {
+                "client": self.client_obj.pk,
+                "scheduled_time_0": self.day.isoformat(),
+                "scheduled_time_1": f"{hour}:00",
+                "duration_minutes": 60,
+                "box": self.box.pk,
+                "status": "pending",
+                "services": [self.wash.pk],
+            },
+        )
+
+    def test_conflict_is_a_form_error(self):
+        response = self.add(10)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("box", response.context["adminform"].form.errors)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_resources_are_locked_in_the_saving_transaction(self):
+        calls = []
+
+        def lock(box_id, washer_id=None):
+            calls.append((box_id, connection.in_atomic_block))
+            return services.lock_resources(box_id, washer_id)
+
+        with mock.patch("carwash.forms.lock_resources", lock):
+            response = self.add(12)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(calls, [(self.box.pk, True)])
+        booking = Booking.objects.latest("pk")
+        self.assertEqual(booking.final_price, 500)
+        self.assertEqual(booking.created_by, self.admin)
@@ -0,0 +1,77 @@
+from datetime import datetime, time, timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import analytics
+from ..models import Booking, Box
+from .utils import CarwashTestCase
+
+
+class OccupancyAnalyticsTests(CarwashTestCase):
+    """Матрица загрузки боксов по 15-минутным интервалам"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Box.objects.create(box_number=2, place_number=1)
+        cls.day = timezone.localdate()
+        start = timezone.make_aware(datetime.combine(cls.day, time(10)))
+        for scheduled_time, duration, status in [
+            (start, 30, "completed"),
+            (start + timedelta(hours=1, minutes=10), 20, "pending"),
+            (start + timedelta(hours=2), 60, "cancelled"),
+            # Переходит на следующие сутки
+            (start + timedelta(hours=13, minutes=45), 30, "pending"),
+        ]:
+            Booking.objects.create(
+                client=cls.client_obj,
+                box=cls.box,
+                scheduled_time=scheduled_time,
+                duration_minutes=duration,
+                status=status,
+            )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_matrix_bins(self):
+        data = analytics.occupancy(self.day, self.day + timedelta(days=1))
+        row = data["matrix"][0]
+        self.assertEqual(data["matrix"].shape, (2, 2 * 96))
+        # 10:00-10:30, 11:10-11:30 (частично занятый интервал 11:00),
+        # 23:45-00:15 через полночь; отмененная запись не учитывается
+        self.assertEqual(
+            row.nonzero()[0].tolist(), [40, 41, 44, 45, 95, 96]
+        )
+        self.assertFalse(data["matrix"][1].any())
+
+    def test_api(self):
+        response = self.client.get(
+            reverse("occupancy_api"),
+            {
+                "date_from": self.day.isoformat(),
+                "date_to": self.day.isoformat(),
+                "matrix": "1",
+            },
+        )
+        data = response.json()
+        weekday = self.day.weekday()
+        self.assertEqual(data["profile"][0][weekday][40], 1.0)
+        self.assertEqual(data["saturation"][weekday][40], 0.5)
+        self.assertEqual(len(data["matrix"][0]), 96)
+
+        response = self.client.get(
+            reverse("occupancy_api"),
+            {"date_from": self.day.isoformat(), "date_to": "2000-01-01"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(reverse("occupancy_api"), {"date_to": "2024-02-30"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_report_page(self):
+        response = self.client.get(reverse("occupancy_report"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["rows"]), 7)
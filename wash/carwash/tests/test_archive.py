@@ -0,0 +1,157 @@
+import io
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import analytics, archive, rollups
+from ..models import ArchivedBooking, Booking, DailyBookingStats, Service
+from ..stats import washer_stats
+from .utils import CarwashTestCase
+
+
+class BookingArchiveTests(CarwashTestCase):
+    """Перенос завершенных записей в архив и чтение архивных записей"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.wash = Service.objects.create(name="Мойка", price=500)
+        cls.polish = Service.objects.create(name="Полировка", price=1500)
+        cls.old_day = timezone.localdate() - timedelta(days=40)
+        cls.completed = cls.book(10, "completed", washer=cls.washer)
+        cls.completed.services.set([cls.wash, cls.polish])
+        cls.cancelled = cls.book(12, "cancelled")
+        # Незавершенные и недавние записи остаются в таблице записей
+        cls.pending = cls.book(14, "pending")
+        cls.recent = cls.book(10, "completed", days=38)
+
+    @classmethod
+    def book(cls, hour, status, washer=None, days=0):
+        return Booking.objects.create(
+            client=cls.client_obj,
+            box=cls.box,
+            washer=washer,
+            scheduled_time=timezone.make_aware(
+                datetime.combine(cls.old_day + timedelta(days=days), time(hour))
+            ),
+            duration_minutes=60,
+            status=status,
+            base_price=2000,
+            discount_amount=200,
+            final_price=1800,
+            notes="Без воска",
+        )
+
+    def stats(self):
+        return list(
+            DailyBookingStats.objects.filter(bookings__gt=0)
+            .order_by("date", "status")
+            .values_list("date", "status", "bookings", "minutes", "final_price")
+        )
+
+    def test_finished_bookings_are_moved_with_services(self):
+        stats = self.stats()
+        before = archive.archive_cutoff(31)
+        self.assertEqual(archive.archive_bookings(before, batch_size=1), 2)
+        self.assertEqual(
+            set(Booking.objects.values_list("pk", flat=True)),
+            {self.pending.pk, self.recent.pk},
+        )
+
+        archived = ArchivedBooking.objects.get(pk=self.completed.pk)
+        self.assertEqual(archived.client, self.client_obj)
+        self.assertEqual(archived.washer, self.washer)
+        self.assertEqual(archived.scheduled_time, self.completed.scheduled_time)
+        self.assertEqual(archived.end_time, self.completed.end_time)
+        self.assertEqual(archived.final_price, 1800)
+        self.assertEqual(archived.discount_amount, 200)
+        self.assertEqual(archived.notes, "Без воска")
+        self.assertEqual(set(archived.services.all()), {self.wash, self.polish})
+        self.assertFalse(
+            Booking.services.through.objects.filter(
+                booking_id=self.completed.pk
+            ).exists()
+        )
+
+        # Сводки не изменились и совпадают с пересчетом по обеим таблицам
+        self.assertEqual(self.stats(), stats)
+        rollups.rebuild()
+        self.assertEqual(self.stats(), stats)
+        self.assertEqual(archive.archive_bookings(before), 0)
+
+    def test_detail_and_reports_read_archive(self):
+        archive.archive_bookings(archive.archive_cutoff(31))
+        self.client.force_login(self.user)
+
+        url = reverse("booking_detail", args=[self.completed.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["is_archived"])
+        self.assertContains(response, "Полировка")
+        self.assertNotContains(
+            response, reverse("booking_edit", args=[self.completed.pk])
+        )
+        response = self.client.get(
+            reverse("booking_detail", args=[self.pending.pk])
+        )
+        self.assertFalse(response.context["is_archived"])
+        response = self.client.get(reverse("booking_detail", args=[10**6]))
+        self.assertEqual(response.status_code, 404)
+
+        [row] = washer_stats(self.old_day, self.old_day, [self.washer])
+        self.assertEqual(row["completed"], 1)
+        self.assertEqual(row["revenue"], 1800)
+        self.assertEqual(row["avg_duration"], 60)
+
+        # Отмененная запись бокс не занимает
+        box_index, starts, ends = analytics.load_intervals(
+            self.old_day, self.old_day, [self.box]
+        )
+        self.assertEqual(
+            sorted(starts),
+            [
+                self.completed.scheduled_time.timestamp(),
+                self.pending.scheduled_time.timestamp(),
+            ],
+        )
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("archive_bookings", "--dry-run", stdout=out)
+        self.assertIn("Можно перенести записей", out.getvalue())
+        self.assertIn(": 2", out.getvalue())
+        self.assertFalse(ArchivedBooking.objects.exists())
+
+        out = io.StringIO()
+        call_command("archive_bookings", "--days", "39", stdout=out)
+        self.assertIn("Перенесено в архив записей", out.getvalue())
+        self.assertEqual(ArchivedBooking.objects.count(), 2)
+        self.assertTrue(Booking.objects.filter(pk=self.recent.pk).exists())
+
+    def test_moved_rows_can_be_deleted_without_cascades(self):
+        # archive._delete_moved удаляет записи в обход delete(): если на
+        # Booking сошлется новая модель, перенос оставит висячие ссылки
+        references = {
+            field.related_model
+            for field in Booking._meta.get_fields(include_hidden=True)
+            if field.auto_created and not field.concrete
+        }
+        self.assertEqual(references, {Booking.services.through})
+        self.assertTrue(callable(getattr(QuerySet, "_raw_delete", None)))
+
+    def test_admin_is_read_only(self):
+        archive.archive_bookings(archive.archive_cutoff(31))
+        self.client.force_login(
+            User.objects.create_superuser("root", "root@example.com", "root")
+        )
+        response = self.client.get(reverse("admin:carwash_archivedbooking_changelist"))
+        self.assertContains(response, "Иван")
+        # Без удаления не остается ни одного массового действия
+        self.assertIsNone(response.context["action_form"])
+        url = reverse("admin:carwash_archivedbooking_delete", args=[self.completed.pk])
+        self.assertEqual(self.client.post(url, {"post": "yes"}).status_code, 403)
+        self.assertEqual(ArchivedBooking.objects.count(), 2)
@@ -0,0 +1,83 @@
+import io
+
+from django.test import override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from wash.asgi import ASGI_URLCONF, application
+
+from .. import async_views, availability
+from ..models import Booking, Service
+from .utils import CarwashTestCase
+
+
+@override_settings(ROOT_URLCONF="wash.asgi_urls")
+class AsyncReadViewsTests(CarwashTestCase):
+    """Асинхронные страницы только для чтения под ASGI"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.wash = Service.objects.create(name="Мойка", price=500)
+        cls.polish = Service.objects.create(name="Полировка", price=2000)
+        Booking.objects.create(
+            client=cls.client_obj,
+            box=cls.box,
+            scheduled_time=availability.day_bounds(timezone.localdate())[0],
+            duration_minutes=1,
+        )
+
+    def test_asgi_handler_routes_to_async_views(self):
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "query_string": b"",
+            "headers": [],
+        }
+        request, _ = application.create_request(scope, io.BytesIO())
+        self.assertEqual(request.urlconf, ASGI_URLCONF)
+        for name, view in [
+            ("price_list", async_views.price_list),
+            ("dashboard", async_views.dashboard),
+            ("calculate_price", async_views.calculate_price),
+        ]:
+            match = resolve(reverse(name, urlconf=ASGI_URLCONF), ASGI_URLCONF)
+            self.assertIs(match.func, view)
+
+    async def test_price_list(self):
+        response = await self.async_client.get(reverse("price_list"))
+        self.assertContains(response, "Полировка")
+        cached = await self.async_client.get(
+            reverse("price_list"), headers={"if-none-match": response["ETag"]}
+        )
+        self.assertEqual(cached.status_code, 304)
+
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("price_list"))
+        self.assertContains(response, "admin")
+
+    async def test_calculate_price(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(
+            reverse("calculate_price"),
+            {
+                "services[]": [self.wash.pk],
+                "is_regular": "true",
+                "combo": f"{self.wash.pk},{self.polish.pk}",
+            },
+        )
+        data = response.json()
+        self.assertEqual(data["final_price"], 450)
+        self.assertEqual(data["quotes"][0]["final_price"], 2250)
+
+    async def test_dashboard(self):
+        response = await self.async_client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 302)
+
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("dashboard"))
+        counters = response.context["counters"]
+        self.assertEqual(counters["today"], 1)
+        self.assertEqual(counters["active_boxes"], 1)
+        self.assertContains(response, "Иван")
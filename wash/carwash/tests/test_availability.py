@@ -0,0 +1,126 @@
+import random
+from datetime import datetime, time, timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+
+from .. import availability
+from ..models import Booking
+from .utils import CarwashTestCase
+
+
+class AvailabilityIndexTests(CarwashTestCase):
+    """Интервалы ресурса (Timeline) и индекс занятости в памяти"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.day = timezone.localdate() + timedelta(days=1)
+
+    @classmethod
+    def at(cls, hour, minute=0, days=0):
+        return timezone.make_aware(
+            datetime.combine(cls.day + timedelta(days=days), time(hour, minute))
+        )
+
+    def interval(self, pk, start_hour, end_hour):
+        return availability.Interval(pk, self.at(start_hour), self.at(end_hour))
+
+    def test_timeline_edges_and_long_intervals(self):
+        timeline = availability.Timeline(
+            [self.interval(1, 9, 10), self.interval(2, 10, 11)]
+        )
+        self.assertIsNone(timeline.find_conflict(self.at(11), self.at(12)))
+        self.assertIsNone(timeline.find_conflict(self.at(8), self.at(9)))
+        self.assertEqual(
+            timeline.find_conflict(self.at(9, 30), self.at(10, 30)).pk, 1
+        )
+        self.assertEqual(
+            timeline.find_conflict(self.at(10), self.at(11)).pk, 2
+        )
+        self.assertIsNone(
+            timeline.find_conflict(self.at(10), self.at(11), exclude_pk=2)
+        )
+        # Длинный интервал находится, даже если после него начались короткие
+        timeline.add(self.interval(3, 8, 14))
+        self.assertEqual(
+            timeline.find_conflict(self.at(12), self.at(13)).pk, 3
+        )
+
+    def test_timeline_add_and_remove_keep_index_consistent(self):
+        rng = random.Random(1)
+        timeline = availability.Timeline()
+        intervals = []
+        for pk in range(1, 60):
+            start = rng.randint(0, 40) * 15
+            interval = availability.Interval(
+                pk,
+                self.at(8) + timedelta(minutes=start),
+                self.at(8) + timedelta(minutes=start + rng.randint(1, 16) * 15),
+            )
+            intervals.append(interval)
+            timeline.add(interval)
+            if pk % 4 == 0:
+                removed = intervals.pop(rng.randrange(len(intervals)))
+                timeline.remove(removed.pk)
+            expected = availability.Timeline(intervals)
+            self.assertEqual(timeline.intervals, expected.intervals)
+            self.assertEqual(timeline.starts, expected.starts)
+            self.assertEqual(timeline.max_ends, expected.max_ends)
+
+    def book(self, hour, **extra):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Booking.objects.create(
+                client=self.client_obj,
+                box=self.box,
+                scheduled_time=self.at(hour),
+                duration_minutes=60,
+                **extra,
+            )
+
+    def conflict(self, hour, minute=0):
+        start = self.at(hour, minute)
+        return availability.index.find_conflict(
+            "box", self.box.pk, start, start + timedelta(minutes=30)
+        )
+
+    def test_index_follows_saved_and_deleted_bookings(self):
+        self.assertIsNone(self.conflict(10))
+        booking = self.book(10)
+        self.assertEqual(self.conflict(10, 30).pk, booking.pk)
+
+        booking.scheduled_time = self.at(12)
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertIsNone(self.conflict(10, 30))
+        self.assertEqual(self.conflict(12).pk, booking.pk)
+
+        booking.status = "cancelled"
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertIsNone(self.conflict(12))
+
+        other = self.book(15)
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertIsNone(self.conflict(15))
+
+    def test_clear_reloads_changes_made_bypassing_signals(self):
+        booking = self.book(10)
+        self.assertIsNotNone(self.conflict(10))
+        Booking.objects.filter(pk=booking.pk).update(status="completed")
+        self.assertIsNotNone(self.conflict(10))
+        availability.index.clear()
+        self.assertIsNone(self.conflict(10))
+
+    @override_settings(AVAILABILITY_MAX_DAYS=2)
+    def test_days_are_evicted(self):
+        for days in range(-3, 3):
+            start = self.at(10, days=days)
+            availability.index.find_conflict(
+                "box", self.box.pk, start, start + timedelta(hours=1)
+            )
+        self.assertEqual(
+            list(availability.index._days),
+            [self.day + timedelta(days=1), self.day + timedelta(days=2)],
+        )
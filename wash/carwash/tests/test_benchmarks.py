@@ -0,0 +1,42 @@
+import json
+
+from django.conf import settings
+from django.test import TestCase
+
+from .. import benchmarks, dataset
+
+
+class BenchmarkTests(TestCase):
+    """Замеры горячих путей"""
+
+    def test_measure(self):
+        results = benchmarks.measure(300, iterations=2)
+        queries = {row["operation"]: row["queries"] for row in results}
+        self.assertEqual(
+            queries,
+            {
+                "check_box_conflict": 1,
+                "booking_form_clean": 5,
+                "booking_calculate_price": 1,
+                "booking_list": 4,
+                "calculate_price_api": 2,
+            },
+        )
+        for row in results:
+            self.assertEqual((row["size"], row["iterations"]), (300, 2))
+            self.assertLessEqual(row["min_ms"], row["p95_ms"])
+        json.dumps(results)
+
+    def test_large_sizes_fit_box_choices(self):
+        options = benchmarks.dataset_options(100_000)
+        self.assertEqual(options["boxes"], dataset.MAX_BOXES)
+        days = options["days_back"] + options["days_ahead"]
+        self.assertLessEqual(
+            100_000 / (days * options["boxes"]), benchmarks.BOOKINGS_PER_BOX_DAY
+        )
+
+    def test_own_database(self):
+        self.assertNotEqual(
+            benchmarks.benchmark_db_name(),
+            str(settings.DATABASES["default"]["TEST"]["NAME"]),
+        )
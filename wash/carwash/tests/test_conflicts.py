@@ -0,0 +1,237 @@
+import threading
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .. import availability
+from ..forms import BookingForm
+from ..models import MAX_DURATION, Booking, Box, Service, Washer
+from ..services import save_booking_form
+from .utils import CarwashTestCase
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Одновременные записи на одно и то же время"""
+
+    THREADS = 8
+
+    def setUp(self):
+        availability.index.clear()
+        self.boxes = [
+            Box.objects.create(box_number=1, place_number=1),
+            Box.objects.create(box_number=1, place_number=2),
+        ]
+        self.service = Service.objects.create(name="Мойка", price=500)
+        self.scheduled_time = timezone.localtime() + timedelta(days=1)
+
+    def form_data(self, index, box, washer=None):
+        return {
+            "client_name": f"Клиент {index}",
+            "client_phone": f"+7900000{index:04d}",
+            "services": [self.service.pk],
+            "box": box.pk,
+            "washer": washer.pk if washer else "",
+            "scheduled_time": self.scheduled_time.strftime("%Y-%m-%dT%H:%M"),
+            "duration_minutes": 60,
+            "status": "pending",
+        }
+
+    def hammer(self, data_for_thread):
+        """Запускает потоки одновременно, возвращает (успехи, отказы)"""
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+
+        def worker(index):
+            try:
+                form = BookingForm(data_for_thread(index))
+                self.assertTrue(form.is_valid(), form.errors)
+                barrier.wait()
+                try:
+                    save_booking_form(form)
+                    results.append(True)
+                except ValidationError:
+                    results.append(False)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(i,))
+            for i in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results.count(True), results.count(False)
+
+    def test_same_box_has_single_winner(self):
+        box = self.boxes[0]
+        won, lost = self.hammer(lambda i: self.form_data(i, box))
+        self.assertEqual((won, lost), (1, self.THREADS - 1))
+        self.assertEqual(Booking.objects.filter(box=box).count(), 1)
+
+    def test_same_washer_has_single_winner(self):
+        user = User.objects.create(username="washer")
+        washer = Washer.objects.create(user=user, phone="+79000000000")
+        won, lost = self.hammer(
+            lambda i: self.form_data(i, self.boxes[i % 2], washer)
+        )
+        self.assertEqual((won, lost), (1, self.THREADS - 1))
+        self.assertEqual(Booking.objects.filter(washer=washer).count(), 1)
+
+    def test_different_boxes_both_succeed(self):
+        self.THREADS = 2
+        won, lost = self.hammer(lambda i: self.form_data(i, self.boxes[i]))
+        self.assertEqual((won, lost), (2, 0))
+
+
+class BookingConflictTests(CarwashTestCase):
+    """Поиск пересечений по боксу и мойщику и хранимое end_time"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_box = Box.objects.create(box_number=1, place_number=2)
+        cls.day = timezone.localdate() + timedelta(days=1)
+        # Существующая запись 10:00-11:00
+        cls.existing = Booking.objects.create(
+            client=cls.client_obj,
+            box=cls.box,
+            washer=cls.washer,
+            scheduled_time=cls.at(10),
+            duration_minutes=60,
+        )
+
+    def candidate(self, hour, minute=0, duration=60, **extra):
+        return Booking(
+            client=self.client_obj,
+            scheduled_time=self.at(hour, minute),
+            duration_minutes=duration,
+            **extra,
+        )
+
+    def assertConflicts(self, booking, expected):
+        for check, field, resource in (
+            ("check_box_conflict", "box", {"box": self.box}),
+            (
+                "check_washer_conflict",
+                "washer",
+                {"box": self.other_box, "washer": self.washer},
+            ),
+        ):
+            for name, value in resource.items():
+                setattr(booking, name, value)
+            with self.subTest(check=check, start=booking.scheduled_time):
+                if expected:
+                    with self.assertRaises(ValidationError) as raised:
+                        getattr(booking, check)()
+                    self.assertIn(field, raised.exception.message_dict)
+                    self.assertIn(
+                        f"#{self.existing.pk}", str(raised.exception)
+                    )
+                else:
+                    getattr(booking, check)()
+            booking.washer = None
+
+    def test_back_to_back_bookings_do_not_conflict(self):
+        self.assertConflicts(self.candidate(11), False)
+        self.assertConflicts(self.candidate(9), False)
+
+    def test_overlapping_bookings_conflict(self):
+        # Начинается раньше, начинается позже, охватывает, внутри
+        self.assertConflicts(self.candidate(9, 30), True)
+        self.assertConflicts(self.candidate(10, 30), True)
+        self.assertConflicts(self.candidate(9, duration=180), True)
+        self.assertConflicts(self.candidate(10, 15, duration=30), True)
+
+    def test_long_booking_started_earlier_conflicts(self):
+        Booking.objects.filter(pk=self.existing.pk).delete()
+        self.existing = Booking.objects.create(
+            client=self.client_obj,
+            box=self.box,
+            washer=self.washer,
+            scheduled_time=self.at(6),
+            duration_minutes=MAX_DURATION,
+        )
+        self.assertConflicts(self.candidate(13, 45, duration=15), True)
+        self.assertConflicts(self.candidate(14), False)
+
+    def test_finished_and_own_bookings_are_ignored(self):
+        for status in ("completed", "cancelled"):
+            self.existing.status = status
+            self.existing.save()
+            self.assertConflicts(self.candidate(10), False)
+        self.existing.status = "pending"
+        self.existing.save()
+        self.existing.duration_minutes = 90
+        self.existing.check_box_conflict()
+        self.existing.check_washer_conflict()
+
+    def form(self, hour):
+        service = Service.objects.create(name="Мойка", price=500)
+        return BookingForm(
+            {
+                "client_name": "Анна",
+                "client_phone": "+79005550000",
+                "services": [service.pk],
+                "box": self.box.pk,
+                "scheduled_time": self.at(hour).strftime("%Y-%m-%dT%H:%M"),
+                "duration_minutes": 60,
+                "status": "pending",
+            }
+        )
+
+    def test_form_uses_index_and_save_checks_db(self):
+        availability.index.clear()
+        self.assertFalse(self.form(10).is_valid())
+        form = self.form(14)
+        # Загруженный индекс отвечает без запроса пересечений к БД
+        with CaptureQueriesContext(connection) as context:
+            self.assertTrue(form.is_valid())
+        self.assertFalse(
+            any('"carwash_booking"' in q["sql"] for q in context.captured_queries)
+        )
+
+        # Изменения в обход сигналов индекс не видит до сверки версии
+        Booking.objects.bulk_create(
+            [
+                Booking(
+                    client=self.client_obj,
+                    box=self.box,
+                    scheduled_time=self.at(14),
+                    duration_minutes=60,
+                    end_time=self.at(15),
+                )
+            ]
+        )
+        Booking.objects.filter(pk=self.existing.pk).update(status="cancelled")
+        # Пропущенное индексом пересечение ловит проверка при сохранении
+        form = self.form(14)
+        self.assertTrue(form.is_valid())
+        with self.assertRaisesMessage(ValidationError, "Бокс"):
+            save_booking_form(form)
+        # Найденная индексом запись подтверждается по БД
+        self.assertTrue(self.form(10).is_valid())
+
+    def test_end_time_follows_start_and_duration(self):
+        booking = self.existing
+        self.assertEqual(booking.end_time, self.at(11))
+        booking.duration_minutes = 90
+        booking.save()
+        booking.refresh_from_db()
+        self.assertEqual(booking.end_time, self.at(11, 30))
+
+        # end_time сохраняется и при save(update_fields=...)
+        booking.scheduled_time = self.at(12)
+        booking.save(update_fields=["scheduled_time"])
+        booking.refresh_from_db()
+        self.assertEqual(booking.end_time, self.at(13, 30))
+        booking.duration_minutes = 30
+        booking.save(update_fields=["duration_minutes"])
+        booking.refresh_from_db()
+        self.assertEqual(booking.end_time, self.at(12, 30))
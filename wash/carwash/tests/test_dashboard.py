@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import availability
+from ..models import Booking, Box
+from .utils import CarwashTestCase
+
+
+class DashboardTests(CarwashTestCase):
+    """Счетчики панели управления и их кеширование"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        day_start, day_end = availability.day_bounds(timezone.localdate())
+        moments = [
+            (day_start - timedelta(minutes=1), "pending"),
+            (day_start, "completed"),
+            (day_end - timedelta(minutes=1), "pending"),
+            (day_end, "pending"),
+            (day_end + timedelta(days=1), "cancelled"),
+        ]
+        for scheduled_time, status in moments:
+            Booking.objects.create(
+                client=cls.client_obj,
+                box=cls.box,
+                scheduled_time=scheduled_time,
+                duration_minutes=1,
+                status=status,
+            )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_counters_use_local_day(self):
+        response = self.client.get(reverse("dashboard"))
+        counters = response.context["counters"]
+        self.assertEqual(counters["today"], 2)
+        self.assertEqual(counters["today_pending"], 1)
+        self.assertEqual(counters["today_completed"], 1)
+        self.assertEqual(counters["pending"], 2)
+        self.assertEqual(counters["active_boxes"], 1)
+        self.assertEqual(len(response.context["today_bookings"]), 2)
+        self.assertEqual(len(response.context["pending_bookings"]), 2)
+
+    def test_payload_is_cached(self):
+        self.client.get(reverse("dashboard"))
+        Box.objects.create(box_number=2, place_number=1)
+        response = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.context["counters"]["active_boxes"], 1)
+        cache.clear()
+        response = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.context["counters"]["active_boxes"], 2)
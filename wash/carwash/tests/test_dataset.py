@@ -0,0 +1,88 @@
+from django.contrib.auth.models import User
+from django.db.models import Sum
+from django.test import TestCase
+
+from .. import dataset
+from ..models import Booking, Box, Client, DailyBookingStats, Washer
+
+
+class DatasetTests(TestCase):
+    """Генерация синтетических данных"""
+
+    def generate(self, **kwargs):
+        options = {
+            "clients": 50,
+            "washers": 3,
+            "boxes": 4,
+            "bookings": 600,
+            "days_back": 10,
+            "days_ahead": 5,
+            "seed": 1,
+            "batch_size": 100,
+            **kwargs,
+        }
+        return dataset.generate(**options)
+
+    def bookings(self):
+        return list(
+            Booking.objects.order_by(
+                "scheduled_time", "box__box_number", "box__place_number"
+            ).values_list(
+                "scheduled_time",
+                "box__box_number",
+                "box__place_number",
+                "washer__user__username",
+                "client__phone",
+                "status",
+                "final_price",
+            )
+        )
+
+    def test_dataset(self):
+        self.assertEqual(self.generate(), 600)
+        self.assertEqual(Client.objects.count(), 50)
+        self.assertEqual(Washer.objects.count(), 3)
+        self.assertTrue(Booking.services.through.objects.exists())
+        statuses = set(Booking.objects.values_list("status", flat=True))
+        self.assertLessEqual({"completed", "cancelled", "pending"}, statuses)
+        # Ни один бокс и ни один мойщик не заняты дважды
+        for field in ("box_id", "washer_id"):
+            previous = {}
+            for resource, start, end in (
+                Booking.objects.exclude(**{field: None})
+                .order_by(field, "scheduled_time")
+                .values_list(field, "scheduled_time", "end_time")
+            ):
+                if resource in previous:
+                    self.assertLessEqual(previous[resource], start)
+                previous[resource] = end
+        self.assertEqual(
+            DailyBookingStats.objects.aggregate(total=Sum("bookings"))["total"],
+            600,
+        )
+
+    def test_deterministic(self):
+        self.generate()
+        first = self.bookings()
+        Booking.objects.all().delete()
+        Client.objects.all().delete()
+        Washer.objects.all().delete()
+        User.objects.all().delete()
+        Box.objects.all().delete()
+        self.generate()
+        self.assertEqual(self.bookings(), first)
+        self.assertNotEqual(first, [])
+
+    def test_rejects_overfull_days(self):
+        with self.assertRaisesMessage(dataset.DatasetError, "помещается"):
+            self.generate(bookings=10000)
+        self.assertFalse(Box.objects.exists())
+
+    def test_box_numbers_follow_model_choices(self):
+        with self.assertRaisesMessage(dataset.DatasetError, "Боксов не больше"):
+            self.generate(boxes=dataset.MAX_BOXES + 1)
+        self.generate()
+        self.assertEqual(
+            list(Box.objects.values_list("box_number", "place_number")),
+            [(1, 1), (1, 2), (2, 1), (2, 2)],
+        )
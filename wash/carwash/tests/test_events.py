@@ -0,0 +1,103 @@
+import asyncio
+
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import events
+from ..models import Booking
+from .utils import CarwashTestCase
+
+
+class BookingEventsTests(CarwashTestCase):
+    """Поток событий о записях (SSE)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+    def test_signals_publish_to_subscribers(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        async def subscribe():
+            return events.broker.subscribe()
+
+        async def receive():
+            return await asyncio.wait_for(subscription.get(), 1)
+
+        subscription = loop.run_until_complete(subscribe())
+        self.addCleanup(events.broker.unsubscribe, subscription)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = Booking.objects.create(
+                client=self.client_obj,
+                box=self.box,
+                scheduled_time=timezone.now(),
+            )
+        event_id, data = loop.run_until_complete(receive())
+        self.assertEqual((data["event"], data["id"]), ("created", booking.pk))
+        self.assertIsNone(data["previous"])
+
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("booking_update_status", args=[booking.pk]),
+                {"status": "in_progress"},
+            )
+        next_id, data = loop.run_until_complete(receive())
+        self.assertEqual(next_id, event_id + 1)
+        self.assertTrue(data["status_changed"])
+        self.assertEqual(data["previous"]["status"], "pending")
+
+        pk = booking.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.delete()
+        _, data = loop.run_until_complete(receive())
+        self.assertEqual((data["event"], data["id"]), ("deleted", pk))
+
+    def test_no_payload_without_subscribers(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = Booking.objects.create(
+                client=self.client_obj,
+                box=self.box,
+                scheduled_time=timezone.now(),
+            )
+        with self.assertNumQueries(0):
+            events.booking_saved(booking, created=False)
+
+    async def test_stream(self):
+        await self.async_client.aforce_login(self.user)
+        last_id = events.broker.publish({"event": "deleted", "id": 1})
+        response = await self.async_client.get(
+            reverse("booking_events"), headers={"Last-Event-ID": str(last_id - 1)}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = aiter(response.streaming_content)
+        self.assertEqual(await anext(content), b"retry: 3000\n\n")
+        # Пропущенное до подключения событие отдается из истории
+        self.assertIn(f"id: {last_id}\n".encode(), await anext(content))
+
+        events.broker.publish({"event": "deleted", "id": 2})
+        self.assertIn(b'"id": 2', await anext(content))
+        await content.aclose()
+
+    def test_no_stream_under_wsgi(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("booking_events"))
+        self.assertEqual(response.status_code, 204)
+        response = self.client.get(reverse("booking_list"))
+        self.assertFalse(response.context["live_updates"])
+        self.assertNotContains(response, "new EventSource")
+
+    async def test_pages_subscribe_under_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("booking_list"))
+        self.assertTrue(response.context["live_updates"])
+        self.assertContains(response, "new EventSource")
+
+    async def test_closed_stream_unsubscribes(self):
+        subscription = events.broker.subscribe()
+        stream = events.stream(subscription)
+        await anext(stream)
+        await stream.aclose()
+        self.assertNotIn(subscription, events.broker._subscribers)
@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import export
+from ..models import Booking, Client, Service
+from .utils import CarwashTestCase
+
+
+class BookingExportTests(CarwashTestCase):
+    """Потоковая выгрузка записей"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        wash = Service.objects.create(name="Мойка", price=500)
+        polish = Service.objects.create(name="Полировка", price=1000)
+        ivan = Client.objects.create(name="Иван", phone="+79001234567")
+        anna = Client.objects.create(name="Анна", phone="+79011112233")
+        start = timezone.now()
+        for i in range(5):
+            booking = Booking.objects.create(
+                client=anna if i == 4 else ivan,
+                box=cls.box,
+                scheduled_time=start + timedelta(hours=i),
+                status="completed" if i % 2 else "pending",
+                base_price=1500,
+                final_price=1500,
+            )
+            booking.services.set([wash, polish])
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_csv(self):
+        response = self.client.get(reverse("booking_export"))
+        self.assertTrue(response.streaming)
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["client_name"], "Иван")
+        self.assertEqual(rows[0]["services"], "Мойка; Полировка")
+        self.assertEqual(rows[0]["final_price"], "1500.00")
+
+    def test_json_with_list_filters(self):
+        response = self.client.get(
+            reverse("booking_export"),
+            {"format": "json", "status": "pending", "search": "+7900"},
+        )
+        rows = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({row["status"] for row in rows}, {"pending"})
+        self.assertEqual(rows[0]["services"], ["Мойка", "Полировка"])
+
+    def test_unknown_format(self):
+        response = self.client.get(reverse("booking_export"), {"format": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_services_are_prefetched_per_chunk(self):
+        # один запрос записей, читаемый порциями, и запрос услуг
+        # на каждую из трех порций
+        with self.assertNumQueries(4):
+            rows = list(export.iter_json(Booking.objects.all(), chunk_size=2))
+        self.assertEqual(len(json.loads("".join(rows))), 5)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("export_bookings", "--search", "анна", stdout=out)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual([row["client_name"] for row in rows], ["Анна"])
@@ -0,0 +1,174 @@
+import csv
+import io
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from .. import availability, importer, rollups, versions
+from ..models import Booking, Box, Client, DailyBookingStats, Service
+from .utils import CarwashTestCase
+
+
+class BookingImportTests(CarwashTestCase):
+    """Импорт записей из CSV с пакетной проверкой пересечений"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_box = Box.objects.create(box_number=2, place_number=1)
+        cls.wash = Service.objects.create(name="Мойка", price=500)
+        cls.polish = Service.objects.create(name="Полировка", price=1500)
+        cls.ivan = Client.objects.create(name="Иван", phone="+7 900 111-22-33")
+        cls.day = timezone.localdate() + timedelta(days=1)
+        cls.existing = Booking.objects.create(
+            client=cls.ivan,
+            box=cls.box,
+            scheduled_time=cls.at(10),
+            duration_minutes=60,
+        )
+
+    def row(self, hour, minute=0, **values):
+        return {
+            "scheduled_time": self.at(hour, minute).isoformat(),
+            "client_name": "Анна",
+            "client_phone": "+7 (900) 555-00-00",
+            "box": str(self.box),
+            "duration_minutes": "60",
+            **values,
+        }
+
+    def import_rows(self, rows, **kwargs):
+        return importer.import_rows(enumerate(rows, start=2), **kwargs)
+
+    def test_rows_are_checked_against_db_and_each_other(self):
+        imported, rejected = self.import_rows(
+            [
+                # Пересекается с записью в БД
+                self.row(10, 30),
+                self.row(12, services="Мойка; Полировка", washer="petr"),
+                # Пересекается со строкой выше по мойщику
+                self.row(
+                    12, 30, box=str(self.other_box), washer=str(self.washer)
+                ),
+                # Завершенные записи не занимают бокс
+                self.row(10, 30, status="completed"),
+                self.row(14, box="Бокс 9"),
+                self.row(14, scheduled_time="завтра"),
+                self.row(11, client_phone="89005550000", client_name="Аня"),
+                self.row(15, client_name="А" * 201),
+                self.row(16, client_phone="+7 900 555-00-00 доб. 12345"),
+            ]
+        )
+        self.assertEqual(imported, 3)
+        self.assertEqual(
+            [line for line, reason in rejected], [2, 4, 6, 7, 9, 10]
+        )
+        self.assertIn("client_name длиннее 200", rejected[4].reason)
+        self.assertIn("client_phone длиннее 20", rejected[5].reason)
+        self.assertIn(f"запись #{self.existing.pk}", rejected[0].reason)
+        self.assertIn("строкой 3", rejected[1].reason)
+        self.assertIn("бокс", rejected[2].reason)
+
+        # Оба телефона - один новый клиент
+        anna = Client.objects.get(phone_digits="9005550000")
+        self.assertEqual((anna.name, anna.phone), ("Анна", "+7 (900) 555-00-00"))
+        booking = Booking.objects.get(scheduled_time=self.at(12))
+        self.assertEqual(booking.client, anna)
+        self.assertEqual(booking.washer, self.washer)
+        self.assertEqual(booking.end_time, self.at(13))
+        self.assertEqual(booking.final_price, 2000)
+        self.assertEqual(booking.services.count(), 2)
+
+        # Сводки обновлены так же, как при пересчете
+        stats = list(DailyBookingStats.objects.values_list("status", "bookings"))
+        rollups.rebuild()
+        self.assertCountEqual(
+            stats,
+            DailyBookingStats.objects.values_list("status", "bookings"),
+        )
+
+    def test_existing_client_and_prices_from_file(self):
+        imported, rejected = self.import_rows(
+            [
+                self.row(
+                    15,
+                    client_phone="8 900 111 22 33",
+                    client_name="Иван Иванов",
+                    base_price="1000",
+                    discount_amount="100",
+                )
+            ]
+        )
+        self.assertEqual((imported, rejected), (1, []))
+        booking = Booking.objects.get(scheduled_time=self.at(15))
+        self.assertEqual(booking.client, self.ivan)
+        self.assertEqual(booking.client.name, "Иван")
+        self.assertEqual(booking.final_price, 900)
+
+    def test_queries_do_not_grow_with_rows(self):
+        rows = [self.row(hour, box=str(self.other_box)) for hour in range(24)]
+        # Боксы, мойщики, услуги; транзакция пакета (точка сохранения
+        # в тесте), окно занятости, клиенты, вставка клиента и записей,
+        # сводка (UPDATE, INSERT, UPDATE), освобождение точки сохранения
+        with self.assertNumQueries(12):
+            imported, rejected = self.import_rows(rows)
+        self.assertEqual((imported, rejected), (24, []))
+
+    def test_batches_are_committed_separately(self):
+        save_rows = importer.save_rows
+
+        def fail_second_batch(rows, created_by=None):
+            if Booking.objects.filter(client__name="Анна").exists():
+                raise RuntimeError("сбой")
+            return save_rows(rows, created_by)
+
+        rows = [self.row(13), self.row(15)]
+        with mock.patch.object(importer, "save_rows", fail_second_batch):
+            with self.assertRaises(RuntimeError):
+                self.import_rows(rows, batch_size=1)
+        self.assertEqual(
+            list(Booking.objects.filter(client__name="Анна").values_list(
+                "scheduled_time", flat=True
+            )),
+            [self.at(13)],
+        )
+
+    @override_settings(AVAILABILITY_VERSION_TTL=0)
+    def test_other_processes_see_imported_rows(self):
+        # Индекс другого процесса: сигналы импорта до него не доходят
+        other = availability.AvailabilityIndex()
+        self.assertIsNone(
+            other.find_conflict("box", self.box.pk, self.at(15), self.at(16))
+        )
+        clients = versions.get_version("clients")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.import_rows([self.row(15)])
+        self.assertIsNotNone(
+            other.find_conflict("box", self.box.pk, self.at(15), self.at(16))
+        )
+        self.assertNotEqual(versions.get_version("clients"), clients)
+
+    def test_dry_run(self):
+        imported, rejected = self.import_rows([self.row(15)], dry_run=True)
+        self.assertEqual(imported, 1)
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertFalse(Client.objects.filter(name="Анна").exists())
+
+    def test_command(self):
+        path = self.enterContext(tempfile.TemporaryDirectory()) + "/in.csv"
+        with open(path, "w", encoding="utf-8-sig", newline="") as source:
+            writer = csv.DictWriter(source, fieldnames=list(self.row(15)))
+            writer.writeheader()
+            writer.writerow(self.row(15))
+            writer.writerow(self.row(15, 30))
+        out = io.StringIO()
+        call_command("import_bookings", path, stdout=out)
+        self.assertIn("Строка 3: Бокс", out.getvalue())
+        self.assertIn(
+            "Импортировано записей: 1, отклонено строк: 1", out.getvalue()
+        )
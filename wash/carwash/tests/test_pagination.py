@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import pagination
+from ..models import Booking
+from .utils import CarwashTestCase
+
+
+class BookingListPaginationTests(CarwashTestCase):
+    """Постраничный вывод списка записей по курсору"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        start = timezone.now()
+        cls.bookings = [
+            Booking.objects.create(
+                client=cls.client_obj,
+                box=cls.box,
+                scheduled_time=start + timedelta(hours=i),
+                status="completed" if i % 2 else "pending",
+            )
+            for i in range(7)
+        ]
+        # Одинаковое время создания: порядок определяет id
+        Booking.objects.update(created_at=start)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.url = reverse("booking_list")
+
+    def pks(self, response):
+        return [booking.pk for booking in response.context["bookings"]]
+
+    def test_pages_follow_created_at_and_id(self):
+        expected = [booking.pk for booking in reversed(self.bookings)]
+        first = self.client.get(self.url, {"page_size": 3})
+        self.assertEqual(self.pks(first), expected[:3])
+        self.assertIsNone(first.context["prev_url"])
+
+        with CaptureQueriesContext(connection) as first_page:
+            self.client.get(self.url, {"page_size": 3})
+        with CaptureQueriesContext(connection) as last_page:
+            last = self.client.get(self.url + first.context["next_url"])
+            last = self.client.get(self.url + last.context["next_url"])
+        self.assertEqual(self.pks(last), expected[6:])
+        self.assertIsNone(last.context["next_url"])
+        self.assertEqual(len(first_page) * 2, len(last_page))
+
+        previous = self.client.get(self.url + last.context["prev_url"])
+        self.assertEqual(self.pks(previous), expected[3:6])
+        self.assertIsNotNone(previous.context["prev_url"])
+
+    def test_filters_are_kept_between_pages(self):
+        first = self.client.get(
+            self.url, {"status": "pending", "page_size": 2}
+        )
+        self.assertIn("status=pending", first.context["next_url"])
+        second = self.client.get(self.url + first.context["next_url"])
+        statuses = {
+            booking.status
+            for booking in [
+                *first.context["bookings"],
+                *second.context["bookings"],
+            ]
+        }
+        self.assertEqual(statuses, {"pending"})
+        self.assertEqual(len(self.pks(first) + self.pks(second)), 4)
+
+    def test_invalid_cursors_are_ignored(self):
+        for cursor in (
+            "99999999999999999999999-1",
+            "1-99999999999999999999999",
+            "-5-3",
+            "1-0",
+            "abc",
+        ):
+            with self.subTest(cursor=cursor):
+                self.assertIsNone(pagination.decode_cursor(cursor))
+                for param in ("after", "before"):
+                    response = self.client.get(self.url, {param: cursor})
+                    self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            pagination.decode_cursor(
+                pagination.encode_cursor(self.bookings[0])
+            ),
+            (self.bookings[0].created_at, self.bookings[0].pk),
+        )
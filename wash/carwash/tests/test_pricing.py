@@ -0,0 +1,197 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import versions
+from ..models import Booking, Box, Client, Service
+from ..pricing import reprice_bookings
+from .utils import reset_caches
+
+
+class RepriceBookingsTests(TestCase):
+    """Пакетный пересчет цен"""
+
+    def test_reprices_changed_bookings_in_batches(self):
+        box = Box.objects.create(box_number=1, place_number=1)
+        regular = Client.objects.create(
+            name="Иван", phone="1", is_regular=True, discount_percent=10
+        )
+        other = Client.objects.create(name="Петр", phone="2")
+        wash = Service.objects.create(name="Мойка", price=500)
+        polish = Service.objects.create(name="Полировка", price=2000)
+        # Все записи в одних сутках: одна строка сводки
+        start = timezone.make_aware(
+            datetime.combine(timezone.localdate(), time(9))
+        )
+        bookings = []
+        for i in range(5):
+            booking = Booking.objects.create(
+                client=regular if i % 2 else other,
+                box=box,
+                scheduled_time=start + timedelta(hours=i),
+            )
+            booking.services.set([wash, polish] if i % 2 else [wash])
+            bookings.append(booking)
+
+        # 3 пакета по (savepoint, выборка, агрегация, UPDATE сводки и
+        # release), по UPDATE на каждое сочетание цен в пакете (2 + 2 + 1)
+        # и пустая выборка в конце (с savepoint и release)
+        with self.assertNumQueries(3 * 5 + 5 + 3) as context:
+            processed, changed = reprice_bookings(
+                Booking.objects.all(), batch_size=2
+            )
+        self.assertEqual((processed, changed), (5, 5))
+        # Пакет читается внутри транзакции, в которой обновляется
+        sql = [query["sql"] for query in context.captured_queries]
+        self.assertTrue(sql[0].startswith("SAVEPOINT"))
+        self.assertIn('FROM "carwash_booking"', sql[1])
+        self.assertTrue(sql[-1].startswith("RELEASE SAVEPOINT"))
+
+        bookings[1].refresh_from_db()
+        self.assertEqual(bookings[1].base_price, 2500)
+        self.assertEqual(bookings[1].discount_amount, 250)
+        self.assertEqual(bookings[1].final_price, 2250)
+        bookings[0].refresh_from_db()
+        self.assertEqual(bookings[0].final_price, 500)
+
+        # Повторный пересчет ничего не меняет
+        self.assertEqual(reprice_bookings(Booking.objects.all()), (5, 0))
+
+    def test_fractional_discount_is_repriced_once(self):
+        box = Box.objects.create(box_number=1, place_number=1)
+        regular = Client.objects.create(
+            name="Иван", phone="1", is_regular=True, discount_percent=10
+        )
+        service = Service.objects.create(name="Мойка", price="333.33")
+        booking = Booking.objects.create(
+            client=regular, box=box, scheduled_time=timezone.now()
+        )
+        booking.services.set([service])
+
+        self.assertEqual(reprice_bookings(Booking.objects.all()), (1, 1))
+        booking.refresh_from_db()
+        self.assertEqual(booking.discount_amount, Decimal("33.33"))
+        self.assertEqual(booking.final_price, Decimal("300.00"))
+        # Скидка 33.333 хранится как 33.33: повторный запуск ничего не меняет
+        self.assertEqual(reprice_bookings(Booking.objects.all()), (1, 0))
+
+
+class CalculatePriceApiTests(TestCase):
+    """Расчет цены по кешированной таблице цен услуг"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("admin", password="admin")
+        cls.wash = Service.objects.create(name="Мойка", price=500)
+        cls.polish = Service.objects.create(name="Полировка", price=2000)
+        cls.hidden = Service.objects.create(
+            name="Архив", price=100, is_active=False
+        )
+
+    def setUp(self):
+        reset_caches()
+        self.client.force_login(self.user)
+        self.url = reverse("calculate_price")
+
+    def test_quotes_without_service_queries(self):
+        params = {
+            "services[]": [self.wash.pk, self.hidden.pk],
+            "is_regular": "true",
+            "combo": [
+                f"{self.wash.pk},{self.polish.pk}",
+                str(self.polish.pk),
+            ],
+        }
+        self.client.get(self.url, params)  # загрузка таблицы цен
+        # Только сессия и пользователь
+        with self.assertNumQueries(2):
+            data = self.client.get(self.url, params).json()
+
+        self.assertEqual(data["base_price"], 500)
+        self.assertEqual(data["discount_amount"], 50)
+        self.assertEqual(data["final_price"], 450)
+        self.assertEqual(
+            [quote["final_price"] for quote in data["quotes"]], [2250, 1800]
+        )
+        self.assertEqual(
+            data["quotes"][0]["services"], [self.wash.pk, self.polish.pk]
+        )
+
+    def test_service_change_invalidates_table(self):
+        params = {"services[]": [self.wash.pk]}
+        self.assertEqual(
+            self.client.get(self.url, params).json()["final_price"], 500
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.wash.price = 600
+            self.wash.save()
+        self.assertEqual(
+            self.client.get(self.url, params).json()["final_price"], 600
+        )
+
+
+class PriceListCacheTests(TestCase):
+    """Кеширование публичного прайс-листа"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.service = Service.objects.create(name="Мойка", price=500)
+
+    def setUp(self):
+        reset_caches()
+        self.url = reverse("price_list")
+
+    def test_anonymous_requests_are_served_from_cache(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, "Мойка")
+        # Только агрегат версии услуг
+        with self.assertNumQueries(1):
+            cached = self.client.get(self.url)
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached["ETag"], response["ETag"])
+        self.assertIn("Last-Modified", cached)
+
+    def test_conditional_get_returns_not_modified(self):
+        response = self.client.get(self.url)
+        with self.assertNumQueries(2):
+            by_etag = self.client.get(
+                self.url, headers={"if-none-match": response["ETag"]}
+            )
+            by_date = self.client.get(
+                self.url,
+                headers={"if-modified-since": response["Last-Modified"]},
+            )
+        self.assertEqual(by_etag.status_code, 304)
+        self.assertEqual(by_date.status_code, 304)
+
+    def test_service_change_refreshes_page(self):
+        response = self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(name="Полировка", price=2000)
+        fresh = self.client.get(
+            self.url, headers={"if-none-match": response["ETag"]}
+        )
+        self.assertEqual(fresh.status_code, 200)
+        self.assertContains(fresh, "Полировка")
+        self.assertNotEqual(fresh["ETag"], response["ETag"])
+
+    def test_etag_does_not_depend_on_process_state(self):
+        response = self.client.get(self.url)
+        # Как в другом процессе или после перезапуска: кеши пусты
+        cache.clear()
+        caches[versions.VERSIONS_CACHE].clear()
+        again = self.client.get(self.url)
+        self.assertEqual(again["ETag"], response["ETag"])
+
+        # Изменение в обход сигналов (другой процесс, update()) тоже видно
+        Service.objects.filter(pk=self.service.pk).update(
+            price=700, updated_at=timezone.now()
+        )
+        fresh = self.client.get(self.url)
+        self.assertNotEqual(fresh["ETag"], response["ETag"])
+        self.assertContains(fresh, "700")
@@ -0,0 +1,312 @@
+"""Бюджеты SQL-запросов для страниц приложения и админ-панели.
+
+Одни и те же бюджеты проверяются на 10 и на 10 000 записей: если
+число запросов растет вместе с объемом данных (N+1), тесты падают.
+"""
+
+from datetime import datetime, time, timedelta
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import archive, export, rollups
+from ..models import ArchivedBooking, Booking, Box, Client, Service, Washer
+from .utils import reset_caches
+
+STATUSES = ["pending", "in_progress", "completed", "cancelled"]
+
+
+def seed_dataset(rows):
+    """Создает rows клиентов и rows записей вокруг текущей даты"""
+    boxes = Box.objects.bulk_create(
+        Box(box_number=number, place_number=place)
+        for number in (1, 2)
+        for place in (1, 2)
+    )
+    users = User.objects.bulk_create(
+        User(username=f"washer{i}", first_name="Мойщик", last_name=str(i))
+        for i in range(5)
+    )
+    washers = Washer.objects.bulk_create(
+        Washer(user=user, phone=f"+7901000000{i}")
+        for i, user in enumerate(users)
+    )
+    services = Service.objects.bulk_create(
+        Service(name=f"Услуга {i}", price=100 * (i + 1)) for i in range(5)
+    )
+    # bulk_create не вызывает save(), phone_digits заполняется явно
+    clients = Client.objects.bulk_create(
+        Client(
+            name=f"Клиент {i}",
+            phone=f"+7900{i:07d}",
+            phone_digits=f"900{i:07d}",
+        )
+        for i in range(rows)
+    )
+
+    # Записи через каждые 2 часа, половина в прошлом, половина в будущем;
+    # сегодняшние записи есть при любом объеме
+    midnight = timezone.make_aware(
+        datetime.combine(timezone.localdate(), time.min)
+    )
+    bookings = []
+    for i in range(rows):
+        scheduled_time = midnight + timedelta(hours=2 * (i - rows // 2) + 9)
+        bookings.append(
+            Booking(
+                client=clients[i],
+                box=boxes[i % len(boxes)],
+                washer=washers[i % len(washers)] if i % 6 else None,
+                scheduled_time=scheduled_time,
+                duration_minutes=60,
+                end_time=scheduled_time + timedelta(minutes=60),
+                status=STATUSES[i % len(STATUSES)],
+                base_price=300,
+                final_price=300,
+            )
+        )
+    bookings = Booking.objects.bulk_create(bookings, batch_size=2000)
+
+    through = Booking.services.through
+    through.objects.bulk_create(
+        (
+            through(booking_id=booking.pk, service_id=service.pk)
+            for booking in bookings
+            for service in services[:2]
+        ),
+        batch_size=2000,
+    )
+    # bulk_create не вызывает сигналов: сводки строятся заново
+    rollups.rebuild()
+    return {
+        "boxes": boxes,
+        "washers": washers,
+        "services": services,
+        "bookings": bookings,
+    }
+
+
+class QueryBudgetMixin:
+    """Проверки числа запросов; ROWS задают подклассы"""
+
+    ROWS = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(cls.ROWS)
+        cls.admin = User.objects.create_superuser(
+            "admin", "admin@example.com", "admin"
+        )
+        cls.booking = cls.data["bookings"][cls.ROWS // 2]
+
+    def setUp(self):
+        reset_caches()
+        self.client.force_login(self.admin)
+
+    def assertBudget(self, budget, url, data=None, method="get"):
+        with self.assertNumQueries(budget):
+            response = getattr(self.client, method)(url, data)
+        self.assertIn(response.status_code, (200, 302))
+        return response
+
+    def test_price_list(self):
+        # сессия, пользователь, услуги
+        self.assertBudget(3, reverse("price_list"))
+
+    def test_price_list_anonymous_cached(self):
+        self.client.logout()
+        self.client.get(reverse("price_list"))
+        # агрегат версии услуг
+        self.assertBudget(1, reverse("price_list"))
+
+    def test_dashboard(self):
+        # сессия, пользователь, счетчики, боксы, мойщики, два списка
+        self.assertBudget(7, reverse("dashboard"))
+        self.assertBudget(2, reverse("dashboard"))
+
+    def test_booking_list(self):
+        # сессия, пользователь, страница записей, услуги страницы
+        self.assertBudget(4, reverse("booking_list"))
+
+    def test_booking_list_filtered(self):
+        self.assertBudget(
+            4, reverse("booking_list"), {"status": "pending", "search": "Клиент"}
+        )
+
+    def test_booking_list_phone_search(self):
+        self.assertBudget(4, reverse("booking_list"), {"search": "+7 900 000"})
+
+    def test_booking_export(self):
+        # сессия, пользователь, записи, услуги каждой порции
+        chunks = -(-self.ROWS // export.CHUNK_SIZE)
+        with self.assertNumQueries(3 + chunks):
+            response = self.client.get(reverse("booking_export"))
+            b"".join(response.streaming_content)
+
+    def test_booking_detail(self):
+        self.assertBudget(
+            4, reverse("booking_detail", args=[self.booking.pk])
+        )
+
+    def test_archived_booking_detail(self):
+        # Граница в будущем: в архив уходят все завершенные записи
+        archive.archive_bookings(timezone.now() + timedelta(days=3650))
+        booking = ArchivedBooking.objects.order_by("pk").first()
+        # сессия, пользователь, запись (нет), архивная запись, услуги
+        self.assertBudget(5, reverse("booking_detail", args=[booking.pk]))
+
+    def test_archive_bookings(self):
+        # На пакет: точка сохранения, номера, строки, архивные записи,
+        # услуги, их копия, удаление услуг и записей, освобождение точки;
+        # и еще 3 запроса на последнюю пустую выборку
+        before = archive.archive_cutoff(1)
+        batches = -(-archive.archivable(before).count() // 50)
+        with self.assertNumQueries(9 * batches + 3):
+            archive.archive_bookings(before, batch_size=50)
+
+    def test_booking_create_form(self):
+        self.assertBudget(5, reverse("booking_create"))
+
+    def test_booking_create(self):
+        scheduled_time = timezone.localtime() + timedelta(days=3650)
+        self.assertBudget(
+            19,
+            reverse("booking_create"),
+            {
+                "client_name": "Новый клиент",
+                "client_phone": "+79999999999",
+                "services": [s.pk for s in self.data["services"][:3]],
+                "box": self.data["boxes"][0].pk,
+                "washer": self.data["washers"][0].pk,
+                "scheduled_time": scheduled_time.strftime("%Y-%m-%dT%H:%M"),
+                "duration_minutes": 60,
+                "status": "pending",
+            },
+            method="post",
+        )
+
+    def test_booking_edit_form(self):
+        self.assertBudget(7, reverse("booking_edit", args=[self.booking.pk]))
+
+    def test_booking_update_status(self):
+        # сессия, пользователь, запись, прежнее состояние записи,
+        # UPDATE записи, сводка: UPDATE прежней строки, новой строки
+        # еще нет (UPDATE, INSERT, UPDATE)
+        self.assertBudget(
+            9,
+            reverse("booking_update_status", args=[self.booking.pk]),
+            {"status": "cancelled"},
+            method="post",
+        )
+
+    def test_calculate_price(self):
+        services = [s.pk for s in self.data["services"]]
+        self.assertBudget(
+            3,
+            reverse("calculate_price"),
+            {"services[]": services, "combo": ["1,2", "3"]},
+        )
+
+    def test_client_autocomplete(self):
+        # сессия, пользователь, подсказки; повтор - из кеша
+        url = reverse("client_autocomplete")
+        self.assertBudget(3, url, {"q": "Клиент 1"})
+        self.assertBudget(2, url, {"q": "Клиент 1"})
+        self.assertBudget(3, url, {"q": "+7900"})
+
+    def test_washer_queue(self):
+        # сессия, пользователь, мойщик, записи, услуги записей;
+        # при совпадении ETag - без записей
+        self.client.force_login(self.data["washers"][1].user)
+        response = self.assertBudget(5, reverse("washer_queue"))
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse("washer_queue"),
+                headers={"if-none-match": response["ETag"]},
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_free_slots(self):
+        start = timezone.localtime()
+        self.assertBudget(
+            5,
+            reverse("free_slots"),
+            {
+                "start": start.strftime("%Y-%m-%dT%H:%M"),
+                "end": (start + timedelta(days=7)).strftime("%Y-%m-%dT%H:%M"),
+                "duration": 60,
+            },
+        )
+
+    def test_reports(self):
+        # сессия, пользователь, итог и 3 группировки по сводкам, боксы,
+        # мойщики
+        self.assertBudget(8, reverse("reports"))
+
+    def test_occupancy_report(self):
+        # сессия, пользователь, боксы, интервалы записей
+        self.assertBudget(4, reverse("occupancy_report"))
+
+    def test_occupancy_api(self):
+        self.assertBudget(4, reverse("occupancy_api"), {"matrix": "1"})
+
+    def test_washer_stats_report(self):
+        # сессия, пользователь, мойщики, сводки; повтор - из кеша
+        self.assertBudget(4, reverse("washer_stats_report"))
+        self.assertBudget(3, reverse("washer_stats_report"))
+
+    def test_washer_stats_api(self):
+        self.assertBudget(4, reverse("washer_stats_api"))
+
+    def test_booking_events_without_asgi(self):
+        # сессия, пользователь; ответ 204 без потока
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("booking_events"))
+        self.assertEqual(response.status_code, 204)
+
+    def test_booking_events(self):
+        # сессия, пользователь; события идут из брокера в памяти
+        self.async_client.force_login(self.admin)
+        with self.assertNumQueries(2):
+            response = async_to_sync(self.async_client.get)(
+                reverse("booking_events")
+            )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        async_to_sync(response.streaming_content.aclose)()
+
+    def test_admin_booking_changelist(self):
+        self.assertBudget(8, reverse("admin:carwash_booking_changelist"))
+
+    def test_admin_client_changelist(self):
+        self.assertBudget(5, reverse("admin:carwash_client_changelist"))
+
+    def test_admin_client_changelist_search(self):
+        self.assertBudget(
+            5, reverse("admin:carwash_client_changelist"), {"q": "Клиент"}
+        )
+
+    def test_admin_washer_changelist(self):
+        self.assertBudget(5, reverse("admin:carwash_washer_changelist"))
+
+    def test_admin_box_changelist(self):
+        self.assertBudget(5, reverse("admin:carwash_box_changelist"))
+
+    def test_admin_service_changelist(self):
+        self.assertBudget(5, reverse("admin:carwash_service_changelist"))
+
+    def test_admin_archived_booking_changelist(self):
+        archive.archive_bookings(timezone.now() + timedelta(days=3650))
+        # сессия, пользователь, фильтр боксов, 2 счетчика, страница,
+        # границы и дни date_hierarchy
+        self.assertBudget(8, reverse("admin:carwash_archivedbooking_changelist"))
+
+
+class SmallDatasetQueryBudgetTests(QueryBudgetMixin, TestCase):
+    ROWS = 10
+
+
+class LargeDatasetQueryBudgetTests(QueryBudgetMixin, TestCase):
+    ROWS = 10_000
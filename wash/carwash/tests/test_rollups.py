@@ -0,0 +1,126 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import rollups
+from ..models import Booking, Box, DailyBookingStats, Service
+from ..pricing import reprice_bookings
+from .utils import CarwashTestCase
+
+
+class DailyStatsTests(CarwashTestCase):
+    """Инкрементальные сводки совпадают с пересчетом по записям"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_box = Box.objects.create(box_number=2, place_number=1)
+        cls.wash = Service.objects.create(name="Мойка", price=500)
+        cls.day = timezone.localdate()
+        # Запись около полуночи относится к местной дате начала
+        cls.start = timezone.make_aware(
+            datetime.combine(cls.day, time(23, 30))
+        )
+
+    def stats(self):
+        return list(
+            DailyBookingStats.objects.filter(bookings__gt=0)
+            .order_by("date", "box", "status", "washer")
+            .values_list(
+                "date", "box_id", "washer_id", "status", "bookings",
+                "minutes", "final_price",
+            )
+        )
+
+    def assertMatchesRebuild(self):
+        incremental = self.stats()
+        rollups.rebuild()
+        self.assertEqual(incremental, self.stats())
+        return incremental
+
+    def create(self, **extra):
+        booking = Booking(
+            client=self.client_obj,
+            box=self.box,
+            scheduled_time=self.start,
+            duration_minutes=60,
+            final_price=500,
+        )
+        for field, value in extra.items():
+            setattr(booking, field, value)
+        booking.save()
+        return booking
+
+    def test_save_update_and_delete(self):
+        first = self.create()
+        second = self.create(washer=self.washer, status="completed")
+        self.assertEqual(
+            self.assertMatchesRebuild(),
+            [
+                (self.day, self.box.pk, self.washer.pk, "completed", 1, 60, 500),
+                (self.day, self.box.pk, None, "pending", 1, 60, 500),
+            ],
+        )
+
+        first.box = self.other_box
+        first.duration_minutes = 90
+        first.save()
+        second.status = "cancelled"
+        second.save(update_fields=["status"])
+        self.assertMatchesRebuild()
+
+        first.delete()
+        self.assertEqual(
+            self.assertMatchesRebuild(),
+            [(self.day, self.box.pk, self.washer.pk, "cancelled", 1, 60, 500)],
+        )
+
+    def test_reprice_and_client_cascade(self):
+        booking = self.create()
+        booking.services.set([self.wash, Service.objects.create(
+            name="Полировка", price=1000
+        )])
+        reprice_bookings(Booking.objects.all())
+        self.assertEqual(self.assertMatchesRebuild()[0][-1], 1500)
+
+        self.client_obj.delete()
+        self.assertEqual(self.stats(), [])
+
+    def test_rebuild_range_keeps_other_days(self):
+        self.create()
+        self.create(scheduled_time=self.start + timedelta(days=1))
+        DailyBookingStats.objects.update(bookings=0)
+        self.assertEqual(rollups.rebuild(self.day, self.day), 1)
+        self.assertEqual([row[0] for row in self.stats()], [self.day])
+
+    def test_report_reads_only_rollups(self):
+        self.create(status="completed", washer=self.washer)
+        self.create(status="cancelled", scheduled_time=self.start - timedelta(hours=2))
+        self.client.force_login(self.user)
+        # сессия, пользователь, итог, 3 группировки, боксы, мойщики
+        with self.assertNumQueries(8):
+            response = self.client.get(
+                reverse("reports"),
+                {"date_from": self.day.isoformat(), "date_to": self.day.isoformat()},
+            )
+        summary = response.context["summary"]
+        self.assertEqual(summary["total"], 1)
+        self.assertEqual(summary["cancelled"], 1)
+        self.assertEqual(summary["revenue"], 500)
+        self.assertEqual(summary["hours"], 1.0)
+        washers = {row["washer"]: row["total"] for row in response.context["washers"]}
+        self.assertEqual(washers, {None: 0, self.washer: 1})
+
+    def test_report_rejects_invalid_period(self):
+        self.client.force_login(self.user)
+        too_long = self.day - timedelta(days=settings.ANALYTICS_MAX_DAYS)
+        for params in [
+            {"date_from": "2024-02-30"},
+            {"date_from": self.day.isoformat(), "date_to": "2000-01-01"},
+            {"date_from": too_long.isoformat(), "date_to": self.day.isoformat()},
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(reverse("reports"), params)
+                self.assertRedirects(response, reverse("reports"))
@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import scheduling
+from ..models import Booking, Box, Washer
+from .utils import CarwashTestCase
+
+
+class FreeSlotsTests(CarwashTestCase):
+    """Операции над интервалами и поиск свободного времени"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_box = Box.objects.create(box_number=1, place_number=2)
+        cls.day = timezone.localdate() + timedelta(days=1)
+        Booking.objects.create(
+            client=cls.client_obj,
+            box=cls.box,
+            washer=cls.washer,
+            scheduled_time=cls.at(10),
+            duration_minutes=60,
+        )
+
+    def test_merge_intervals(self):
+        self.assertEqual(
+            scheduling.merge_intervals([(3, 5), (1, 2), (2, 3), (6, 8), (7, 7)]),
+            [(1, 5), (6, 8)],
+        )
+        self.assertEqual(scheduling.merge_intervals([]), [])
+
+    def test_free_intervals(self):
+        self.assertEqual(
+            scheduling.free_intervals([(5, 7), (2, 3), (-1, 1)], 0, 6),
+            [(1, 2), (3, 5)],
+        )
+        self.assertEqual(scheduling.free_intervals([(0, 9)], 2, 4), [])
+
+    def test_intersect_intervals(self):
+        self.assertEqual(
+            scheduling.intersect_intervals([(0, 5), (7, 10)], [(3, 8), (9, 12)]),
+            [(3, 5), (7, 8), (9, 10)],
+        )
+        # Касающиеся интервалы не пересекаются
+        self.assertEqual(scheduling.intersect_intervals([(0, 3)], [(3, 5)]), [])
+
+    def slots(self, **kwargs):
+        slots = scheduling.find_free_slots(
+            self.at(9),
+            self.at(12),
+            timedelta(minutes=60),
+            step=timedelta(minutes=30),
+            **kwargs,
+        )
+        return [
+            (slot["box"], slot["washer"], timezone.localtime(slot["start"]).hour)
+            for slot in slots
+        ]
+
+    def test_find_free_slots(self):
+        self.assertEqual(
+            self.slots(box=self.box),
+            [(self.box, self.washer, 9), (self.box, self.washer, 11)],
+        )
+        # Второй бокс свободен, но мойщик занят с 10 до 11
+        self.assertEqual(
+            self.slots(),
+            [
+                (self.box, self.washer, 9),
+                (self.other_box, self.washer, 9),
+                (self.box, self.washer, 11),
+                (self.other_box, self.washer, 11),
+            ],
+        )
+        self.assertEqual(len(self.slots(limit=3)), 3)
+
+        Washer.objects.update(is_active=False)
+        self.assertEqual(
+            [hour for box, washer, hour in self.slots(box=self.other_box)],
+            [9, 9, 10, 10, 11],
+        )
+
+    def get(self, **params):
+        self.client.force_login(self.user)
+        data = {
+            "start": self.at(9).strftime("%Y-%m-%dT%H:%M"),
+            "end": self.at(12).strftime("%Y-%m-%dT%H:%M"),
+            "duration": 60,
+            **params,
+        }
+        return self.client.get(reverse("free_slots"), data)
+
+    @override_settings(FREE_SLOTS_MAX_RESULTS=2)
+    def test_api_limits(self):
+        data = self.get(box=self.box.pk).json()
+        self.assertEqual(len(data["slots"]), 2)
+        self.assertFalse(data["truncated"])
+        data = self.get().json()
+        self.assertEqual(len(data["slots"]), 2)
+        self.assertTrue(data["truncated"])
+
+        self.assertEqual(self.get(step=1).status_code, 400)
+        end = self.at(9) + timedelta(days=30)
+        response = self.get(end=end.strftime("%Y-%m-%dT%H:%M"))
+        self.assertEqual(response.status_code, 400)
+
+    def test_api_rejects_invalid_dates(self):
+        response = self.get(start="2024-02-30T10:00")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Booking, Box, Client
+from ..search import autocomplete, search_clients
+from ..services import resolve_client
+from .utils import reset_caches
+
+
+class ClientSearchTests(TestCase):
+    """Поиск клиентов по началу телефона и словам имени и заметок"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ivan = Client.objects.create(
+            name="Иван Петров", phone="+7 (900) 123-45-67", notes="Черный BMW"
+        )
+        cls.anna = Client.objects.create(name="Анна Иванова", phone="89011112233")
+        cls.oleg = Client.objects.create(name="Олег", phone="9001239999")
+
+    def found(self, query):
+        return set(search_clients(query).values_list("name", flat=True))
+
+    def test_phone_prefix_with_and_without_country_code(self):
+        self.assertEqual(self.ivan.phone_digits, "9001234567")
+        for query in ["900123", "+7 900 123", "8900123"]:
+            self.assertEqual(self.found(query), {"Иван Петров", "Олег"})
+        self.assertEqual(self.found("8 (901)"), {"Анна Иванова"})
+        # Совпадение в середине номера не ищется
+        self.assertEqual(self.found("4567"), set())
+
+    def test_name_and_notes_word_prefix(self):
+        self.assertEqual(self.found("иван"), {"Иван Петров", "Анна Иванова"})
+        self.assertEqual(self.found("Иван Петр"), {"Иван Петров"})
+        self.assertEqual(self.found("черн"), {"Иван Петров"})
+        self.assertEqual(self.found('"'), set())
+
+    def test_name_and_phone_together(self):
+        self.assertEqual(self.found("Иван 900"), {"Иван Петров"})
+
+    def test_index_follows_changes(self):
+        self.oleg.name = "Олег Сидоров"
+        self.oleg.save()
+        self.assertEqual(self.found("сидор"), {"Олег Сидоров"})
+        self.oleg.phone = "+79051230000"
+        self.oleg.save(update_fields=["phone"])
+        self.assertEqual(self.found("905"), {"Олег Сидоров"})
+        self.oleg.delete()
+        self.assertEqual(self.found("сидор"), set())
+
+    def test_booking_list_search(self):
+        user = User.objects.create_user("admin", password="admin")
+        box = Box.objects.create(box_number=1, place_number=1)
+        start = timezone.now()
+        for i, client in enumerate([self.ivan, self.anna, self.oleg]):
+            Booking.objects.create(
+                client=client, box=box, scheduled_time=start + timedelta(hours=i)
+            )
+        self.client.force_login(user)
+        response = self.client.get(reverse("booking_list"), {"search": "+7900"})
+        self.assertEqual(
+            {booking.client.name for booking in response.context["bookings"]},
+            {"Иван Петров", "Олег"},
+        )
+
+
+class ClientAutocompleteTests(TestCase):
+    """Подсказки клиентов и их кеш"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("admin", password="admin")
+        cls.ivan = Client.objects.create(name="Иван", phone="+79001234567")
+        Client.objects.create(name="Иванна", phone="+79007654321")
+
+    def setUp(self):
+        reset_caches()
+        self.client.force_login(self.user)
+        self.url = reverse("client_autocomplete")
+
+    def names(self, query):
+        return [client["name"] for client in autocomplete.suggest(query)]
+
+    def test_endpoint(self):
+        response = self.client.get(self.url, {"q": "+7 900 123"})
+        self.assertEqual(
+            response.json()["clients"],
+            [
+                {
+                    "id": self.ivan.pk,
+                    "name": "Иван",
+                    "phone": "+79001234567",
+                    "is_regular": False,
+                }
+            ],
+        )
+        response = self.client.get(self.url, {"q": "ива", "limit": 1})
+        self.assertEqual(len(response.json()["clients"]), 1)
+        response = self.client.get(self.url, {"q": "ива", "limit": "x"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_repeated_query_is_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.names("ива"), ["Иван", "Иванна"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names(" Ива "), ["Иван", "Иванна"])
+
+    def test_cache_is_reset_when_clients_change(self):
+        self.names("ива")
+        with self.captureOnCommitCallbacks(execute=True):
+            Client.objects.create(name="Иваныч", phone="+79000000000")
+        self.assertEqual(self.names("ива"), ["Иван", "Иванна", "Иваныч"])
+
+    @override_settings(CLIENT_AUTOCOMPLETE_CACHE_SIZE=1)
+    def test_least_recently_used_query_is_evicted(self):
+        self.names("ива")
+        self.names("900")
+        with self.assertNumQueries(0):
+            self.names("900")
+        with self.assertNumQueries(1):
+            self.names("ива")
+
+    def test_resolve_client_matches_phone_digits(self):
+        client = resolve_client("Иван", "8 (900) 123-45-67", False)
+        self.assertEqual(client, self.ivan)
+        self.assertEqual(Client.objects.count(), 2)
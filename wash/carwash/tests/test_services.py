@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from ..forms import BookingForm
+from ..models import Booking, Client, Service
+from ..services import save_booking_form
+from .utils import CarwashTestCase
+
+
+class BookingWriteQueryTests(CarwashTestCase):
+    """Число запросов при сохранении записи не зависит от числа услуг"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.services = [
+            Service.objects.create(name=f"Услуга {i}", price=100 * i)
+            for i in range(1, 6)
+        ]
+        cls.scheduled_time = timezone.localtime() + timedelta(days=1)
+
+    def form_data(self, services, **extra):
+        data = {
+            "client_name": "Иван",
+            "client_phone": "+79001234567",
+            "is_regular_client": True,
+            "services": [service.pk for service in services],
+            "box": self.box.pk,
+            "washer": self.washer.pk,
+            "scheduled_time": self.scheduled_time.strftime("%Y-%m-%dT%H:%M"),
+            "duration_minutes": 60,
+            "status": "pending",
+        }
+        data.update(extra)
+        return data
+
+    def valid_form(self, data, instance=None):
+        form = BookingForm(data, instance=instance)
+        self.assertTrue(form.is_valid(), form.errors)
+        return form
+
+    def test_create_with_new_client(self):
+        form = self.valid_form(self.form_data(self.services))
+        # savepoint, клиент (поиск + INSERT), 2 проверки конфликтов,
+        # INSERT записи, сводка (UPDATE, INSERT, UPDATE), пакетный
+        # INSERT услуг, release
+        with self.assertNumQueries(11):
+            booking = save_booking_form(form)
+
+        self.assertEqual(booking.services.count(), len(self.services))
+        self.assertEqual(booking.base_price, 1500)
+        self.assertEqual(booking.discount_amount, 150)
+        self.assertEqual(booking.final_price, 1350)
+
+    def test_create_with_unchanged_client(self):
+        Client.objects.create(
+            name="Иван",
+            phone="+79001234567",
+            is_regular=True,
+            discount_percent=10,
+        )
+        form = self.valid_form(self.form_data(self.services[:1]))
+        with self.assertNumQueries(10):
+            save_booking_form(form)
+
+    def test_create_updates_changed_client(self):
+        client = Client.objects.create(name="Иван", phone="+79001234567")
+        form = self.valid_form(self.form_data(self.services[:2]))
+        with self.assertNumQueries(11):
+            booking = save_booking_form(form)
+
+        client.refresh_from_db()
+        self.assertTrue(client.is_regular)
+        self.assertEqual(client.discount_percent, 10)
+        self.assertEqual(booking.final_price, 270)
+
+    def test_edit_without_service_changes(self):
+        booking = save_booking_form(
+            self.valid_form(self.form_data(self.services[:2]))
+        )
+        booking = Booking.objects.prefetch_related("services").get(
+            pk=booking.pk
+        )
+        form = self.valid_form(
+            self.form_data(self.services[:2], notes="Без воска"), booking
+        )
+        # savepoint, поиск клиента, 2 проверки, прежнее состояние записи
+        # для сводки, UPDATE записи, release; сводка не меняется
+        with self.assertNumQueries(7):
+            save_booking_form(form)
+
+    def test_edit_replaces_services(self):
+        booking = save_booking_form(
+            self.valid_form(self.form_data(self.services[:2]))
+        )
+        booking = Booking.objects.prefetch_related("services").get(
+            pk=booking.pk
+        )
+        form = self.valid_form(
+            self.form_data(self.services[1:4]), booking
+        )
+        # + UPDATE сводки (изменилась цена), DELETE и INSERT связей
+        # с услугами
+        with self.assertNumQueries(10):
+            booking = save_booking_form(form)
+
+        self.assertEqual(
+            set(booking.services.values_list("pk", flat=True)),
+            {service.pk for service in self.services[1:4]},
+        )
+        self.assertEqual(booking.base_price, 900)
@@ -0,0 +1,114 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Booking, Box, Client, Washer
+from ..stats import washer_stats
+from .utils import reset_caches
+
+
+@override_settings(WASHER_WORKDAY_MINUTES=600)
+class WasherStatsTests(TestCase):
+    """Показатели мойщиков и сброс их кеша"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("admin", password="admin")
+        cls.box = Box.objects.create(box_number=1, place_number=1)
+        cls.petr, cls.oleg = [
+            Washer.objects.create(
+                user=User.objects.create(username=name, first_name=name),
+                phone=name,
+            )
+            for name in ["Петр", "Олег"]
+        ]
+        cls.client_obj = Client.objects.create(name="Иван", phone="1")
+        cls.day = timezone.localdate()
+        cls.start = timezone.make_aware(datetime.combine(cls.day, time(10)))
+        for hours, duration, status, price in [
+            (0, 30, "completed", 500),
+            (1, 60, "completed", 1000),
+            (3, 45, "pending", 700),
+            (5, 60, "cancelled", 900),
+            # Вне периода
+            (-48, 60, "completed", 5000),
+        ]:
+            cls.book(hours, duration, status, price)
+
+    @classmethod
+    def book(cls, hours, duration=60, status="completed", price=100):
+        return Booking.objects.create(
+            client=cls.client_obj,
+            box=cls.box,
+            washer=cls.petr,
+            scheduled_time=cls.start + timedelta(hours=hours),
+            duration_minutes=duration,
+            status=status,
+            final_price=price,
+        )
+
+    def setUp(self):
+        reset_caches()
+
+    def stats(self):
+        return {
+            row["washer"]: row
+            for row in washer_stats(self.day, self.day)
+        }
+
+    def test_metrics(self):
+        with self.assertNumQueries(2):
+            stats = self.stats()
+        petr = stats[self.petr]
+        self.assertEqual(petr["completed"], 2)
+        self.assertEqual(petr["avg_duration"], 45)
+        self.assertEqual(petr["revenue"], 1500)
+        self.assertEqual(petr["booked_minutes"], 135)
+        self.assertEqual(petr["active_days"], 1)
+        self.assertEqual(petr["idle_minutes"], 600 - 135)
+        self.assertEqual(stats[self.oleg]["completed"], 0)
+        self.assertIsNone(stats[self.oleg]["avg_duration"])
+
+    def test_cache_is_reset_only_for_changed_washer(self):
+        self.stats()
+        # Только список мойщиков, показатели из кеша
+        with self.assertNumQueries(1):
+            self.stats()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = self.book(6)
+        with CaptureQueriesContext(connection) as queries:
+            stats = self.stats()
+        self.assertEqual(stats[self.petr]["completed"], 3)
+        self.assertIn(f"IN ({self.petr.pk})", queries[-1]["sql"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.washer = self.oleg
+            booking.save()
+        stats = self.stats()
+        self.assertEqual(stats[self.petr]["completed"], 2)
+        self.assertEqual(stats[self.oleg]["completed"], 1)
+
+    def test_api(self):
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse("washer_stats_api"), {"date_from": self.day.isoformat()}
+        )
+        self.assertEqual(response.status_code, 200)
+        washers = {row["name"]: row for row in response.json()["washers"]}
+        self.assertEqual(washers["Петр"]["revenue"], 1500.0)
+        response = self.client.get(reverse("washer_stats_report"))
+        self.assertEqual(len(response.context["rows"]), 2)
+
+    def test_invalid_date_is_rejected(self):
+        self.client.force_login(self.user)
+        params = {"date_from": "2024-02-30"}
+        response = self.client.get(reverse("washer_stats_api"), params)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse("washer_stats_report"), params)
+        self.assertRedirects(response, reverse("washer_stats_report"))
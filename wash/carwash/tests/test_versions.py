@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from .. import versions
+
+
+class VersionStampTests(SimpleTestCase):
+    """Метки версий общие для всех процессов"""
+
+    def test_stamps_are_shared_between_cache_instances(self):
+        # Отдельный экземпляр кеша - как в другом процессе
+        other = caches.create_connection(versions.VERSIONS_CACHE)
+        self.assertIsNot(other, caches[versions.VERSIONS_CACHE])
+        key = versions.KEY_PREFIX + "test:shared"
+        versions.get_version("test:shared")
+        other.set(key, "changed elsewhere", None)
+        self.assertEqual(versions.get_version("test:shared"), "changed elsewhere")
+        versions.bump_version("test:shared")
+        self.assertEqual(other.get(key), versions.get_version("test:shared"))
+
+    def test_tests_use_temporary_directory(self):
+        # Каталог меток разработчика тесты не трогают
+        location = settings.CACHES[versions.VERSIONS_CACHE]["LOCATION"]
+        self.assertNotEqual(
+            os.path.abspath(location),
+            os.path.abspath(settings.BASE_DIR / "cache" / "versions"),
+        )
+        self.assertEqual(os.environ["WASH_VERSIONS_CACHE_DIR"], location)
+
+    def test_bump_from_another_process_is_visible(self):
+        before = versions.get_version("test:process")
+        subprocess.run(
+            [
+                sys.executable,
+                "manage.py",
+                "shell",
+                "-c",
+                "from carwash.versions import bump_version; "
+                "bump_version('test:process')",
+            ],
+            cwd=settings.BASE_DIR,
+            check=True,
+            capture_output=True,
+        )
+        self.assertNotEqual(versions.get_version("test:process"), before)
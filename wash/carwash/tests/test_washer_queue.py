@@ -0,0 +1,129 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import importer
+from ..models import Booking, Box, Client, Washer
+from .utils import reset_caches
+
+
+class WasherQueueTests(TestCase):
+    """Очередь мойщика с проверкой ETag"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.box = Box.objects.create(box_number=1, place_number=1)
+        cls.petr, cls.oleg = [
+            Washer.objects.create(
+                user=User.objects.create_user(name, password=name),
+                phone=name,
+            )
+            for name in ["petr", "oleg"]
+        ]
+        cls.client_obj = Client.objects.create(name="Иван", phone="1")
+        start = timezone.make_aware(
+            datetime.combine(timezone.localdate(), time(10))
+        )
+        cls.later, cls.current, cls.overnight = [
+            cls.book(start + timedelta(hours=hours), status)
+            for hours, status in [
+                (4, "pending"),
+                (0, "in_progress"),
+                # Начата до полуночи и еще выполняется
+                (-10.5, "in_progress"),
+            ]
+        ]
+        # Не попадают в очередь Петра
+        cls.book(start + timedelta(hours=1), "completed")
+        cls.book(start - timedelta(days=1), "pending")
+        cls.book(start, "pending", washer=cls.oleg)
+
+    @classmethod
+    def book(cls, scheduled_time, status, washer=None):
+        return Booking.objects.create(
+            client=cls.client_obj,
+            box=cls.box,
+            washer=washer or cls.petr,
+            scheduled_time=scheduled_time,
+            status=status,
+        )
+
+    def setUp(self):
+        reset_caches()
+        self.client.force_login(self.petr.user)
+        self.url = reverse("washer_queue")
+
+    def test_queue(self):
+        response = self.client.get(self.url)
+        data = response.json()
+        self.assertEqual(
+            [row["id"] for row in data["bookings"]],
+            [self.overnight.pk, self.current.pk, self.later.pk],
+        )
+        self.assertEqual(data["bookings"][0]["client_name"], "Иван")
+        self.assertIn("private", response["Cache-Control"])
+
+    def test_not_modified_without_booking_queries(self):
+        etag = self.client.get(self.url)["ETag"]
+        # Сессия, пользователь, мойщик
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                self.url, headers={"if-none-match": etag}
+            )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_changes_refresh_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        # Перенос в пределах суток не меняет сводок, но меняет очередь
+        with self.captureOnCommitCallbacks(execute=True):
+            self.later.scheduled_time += timedelta(minutes=30)
+            self.later.save()
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client_obj.name = "Иван Петров"
+            self.client_obj.save(update_fields=["name"])
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["bookings"][0]["client_name"], "Иван Петров"
+        )
+        etag = response["ETag"]
+
+        # Изменения записей другого мойщика не сбрасывают очередь
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book(self.later.scheduled_time, "pending", washer=self.oleg)
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        # Импорт пишет записи bulk_create, без сигналов
+        with self.captureOnCommitCallbacks(execute=True):
+            importer.import_rows(
+                [
+                    (
+                        2,
+                        {
+                            "scheduled_time": (
+                                self.later.scheduled_time + timedelta(hours=2)
+                            ).isoformat(),
+                            "client_name": "Анна",
+                            "client_phone": "2",
+                            "box": str(self.box),
+                            "washer": "petr",
+                        },
+                    )
+                ]
+            )
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["bookings"]), 4)
+
+    def test_not_a_washer(self):
+        self.client.force_login(User.objects.create_user("admin"))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
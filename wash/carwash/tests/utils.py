@@ -0,0 +1,60 @@
+"""Общие помощники тестов"""
+
+from datetime import datetime, time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.test import TestCase
+from django.utils import timezone
+
+from .. import availability, search
+from ..models import Box, Client, Washer
+from ..pricing import price_table
+from ..versions import VERSIONS_CACHE
+
+
+def reset_caches():
+    """Сбрасывает кеши и кеши в памяти процесса.
+
+    Метки версий хранятся в отдельном кеше и переживают откат
+    транзакции теста, а сигналы on_commit в TestCase не срабатывают;
+    номера строк после отката повторяются, поэтому без сброса кеши
+    в памяти (цены услуг, индекс занятости, подсказки) отдали бы данные
+    предыдущего теста.
+    """
+    cache.clear()
+    caches[VERSIONS_CACHE].clear()
+    price_table.clear()
+    availability.index.clear()
+    search.autocomplete.clear()
+
+
+class CarwashTestCase(TestCase):
+    """Общие данные: администратор, бокс, мойщик Петр и клиент Иван.
+
+    Подклассы дополняют setUpTestData своими записями и задают day -
+    дату, от которой отсчитывает at(). Перед каждым тестом кеши
+    сбрасываются (reset_caches).
+    """
+
+    day = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("admin", password="admin")
+        cls.box = Box.objects.create(box_number=1, place_number=1)
+        cls.washer = Washer.objects.create(
+            user=User.objects.create(username="petr", first_name="Петр"),
+            phone="+79000000000",
+        )
+        cls.client_obj = Client.objects.create(name="Иван", phone="1")
+
+    def setUp(self):
+        reset_caches()
+
+    @classmethod
+    def at(cls, hour, minute=0):
+        """Местное время hour:minute в день day"""
+        return timezone.make_aware(
+            datetime.combine(cls.day, time(hour, minute))
+        )
@@ -4,8 +4,21 @@ from . import views
 urlpatterns = [
     path("", views.price_list, name="price_list"),
     path("dashboard/", views.dashboard, name="dashboard"),
+    path("reports/", views.reports, name="reports"),
+    path(
+        "reports/occupancy/",
+        views.occupancy_report,
+        name="occupancy_report",
+    ),
+    path(
+        "reports/washers/",
+        views.washer_stats_report,
+        name="washer_stats_report",
+    ),
     path("bookings/", views.booking_list, name="booking_list"),
     path("bookings/create/", views.booking_create, name="booking_create"),
+    path("bookings/export/", views.booking_export, name="booking_export"),
+    path("bookings/events/", views.booking_events, name="booking_events"),
     path("bookings/<int:pk>/", views.booking_detail, name="booking_detail"),
     path("bookings/<int:pk>/edit/", views.booking_edit, name="booking_edit"),
     path(
@@ -16,4 +29,21 @@ urlpatterns = [
     path("api/calculate-price/",
          views.calculate_price,
          name="calculate_price"),
+    path("api/free-slots/", views.free_slots, name="free_slots"),
+    path(
+        "api/clients/autocomplete/",
+        views.client_autocomplete,
+        name="client_autocomplete",
+    ),
+    path(
+        "api/analytics/occupancy/",
+        views.occupancy_api,
+        name="occupancy_api",
+    ),
+    path("api/washer/queue/", views.washer_queue, name="washer_queue"),
+    path(
+        "api/washers/stats/",
+        views.washer_stats_api,
+        name="washer_stats_api",
+    ),
 ]
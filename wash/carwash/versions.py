@@ -0,0 +1,62 @@
+"""Метки версий данных в кеше Django.
+
+Метка меняется при каждом изменении данных (см. signals.py), поэтому
+кеши в памяти процесса и ключи кеша, построенные на ней, становятся
+неактуальными без обращения к БД. Метки уникальны, а не счетчики:
+после очистки кеша новая метка не совпадет ни с одной из прежних.
+
+Метки хранятся в кеше VERSIONS_CACHE, общем для всех процессов
+(настройка CACHES): смена метки в одном веб-процессе или в команде
+управления видна остальным.
+"""
+
+import uuid
+
+from django.core.cache import caches
+
+KEY_PREFIX = "carwash:version:"
+VERSIONS_CACHE = "versions"
+
+
+def _cache():
+    return caches[VERSIONS_CACHE]
+
+
+def get_version(name):
+    """Текущая метка версии name; создается при первом обращении"""
+    key = KEY_PREFIX + name
+    cache = _cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(name):
+    """Асинхронный вариант get_version"""
+    key = KEY_PREFIX + name
+    cache = _cache()
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, uuid.uuid4().hex, timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(name):
+    """Выдает новую метку версии name"""
+    _cache().set(KEY_PREFIX + name, uuid.uuid4().hex, timeout=None)
+
+
+def get_versions(names):
+    """Метки версий для нескольких имен за одно обращение к кешу"""
+    cache = _cache()
+    keys = {KEY_PREFIX + name: name for name in names}
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    for key in missing:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+    if missing:
+        found.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in found.items()}
@@ -1,70 +1,234 @@
+import itertools
+from datetime import timedelta
+
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
-from django.http import JsonResponse
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max, Q
+from django.http import (
+    Http404,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
-
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+    quote_etag,
+)
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date
+
+from . import archive, events, export
+from .availability import day_bounds
 from .forms import BookingForm
-from .models import Booking, Service, Box, Washer
+from .models import MAX_DURATION, ArchivedBooking, Booking, Service, Box, Washer
+from .pagination import keyset_page
+from .pricing import price_table
+from .rollups import report
+from .scheduling import find_free_slots
+from .search import autocomplete, filter_bookings
+from .stats import METRICS, washer_stats
+from .washer_queue import queue_bookings, queue_etag, queue_item
+from .services import save_booking_form
 
 
-def price_list(request):
-    """Публичная страница с прайс-листом услуг"""
-    services = Service.objects.filter(is_active=True).order_by("name")
+def active_services():
+    return Service.objects.filter(is_active=True).order_by("name")
+
+
+def _render_price_list(request, services=None):
     context = {
-        "services": services,
+        "services": active_services() if services is None else services,
     }
     return render(request, "carwash/price_list.html", context)
 
 
+def price_list_is_personal(request, user):
+    """Страница администратора и страница с сообщениями не кешируются"""
+    return (
+        user.is_authenticated
+        or CookieStorage.cookie_name in request.COOKIES
+    )
+
+
+# Состояние услуг, от которого зависит прайс-лист
+PRICE_LIST_STATE = {
+    "count": Count("pk"),
+    "last_modified": Max("updated_at"),
+}
+
+
+def price_list_version(state):
+    """Версия прайс-листа по числу услуг и времени последнего изменения.
+
+    state - результат Service.objects.aggregate(**PRICE_LIST_STATE);
+    версия одинакова во всех процессах и не меняется при перезапуске.
+    """
+    last_modified = state["last_modified"]
+    stamp = int(last_modified.timestamp() * 1_000_000) if last_modified else 0
+    return f"{state['count']}-{stamp}"
+
+
+def price_list_cache_key(version):
+    return f"carwash:price_list:{version}"
+
+
+def price_list_entry(version, content, last_modified):
+    """Запись кеша прайс-листа"""
+    return {
+        "content": content,
+        "etag": quote_etag(version),
+        "last_modified": (
+            int(last_modified.timestamp()) if last_modified else None
+        ),
+    }
+
+
+def price_list_response(request, entry):
+    """Ответ из записи кеша прайс-листа с учетом If-None-Match и
+    If-Modified-Since"""
+    response = HttpResponse(entry["content"])
+    response.headers["ETag"] = entry["etag"]
+    if entry["last_modified"] is not None:
+        response.headers["Last-Modified"] = http_date(entry["last_modified"])
+    patch_vary_headers(response, ["Cookie"])
+    return get_conditional_response(
+        request,
+        etag=entry["etag"],
+        last_modified=entry["last_modified"],
+        response=response,
+    )
+
+
+def price_list(request):
+    """Публичная страница с прайс-листом услуг.
+
+    Для анонимных посетителей страница целиком берется из кеша по версии
+    услуг (один запрос-агрегат), а ETag/Last-Modified позволяют отвечать
+    304 без тела.
+    """
+    if price_list_is_personal(request, request.user):
+        return _render_price_list(request)
+
+    state = Service.objects.aggregate(**PRICE_LIST_STATE)
+    version = price_list_version(state)
+    key = price_list_cache_key(version)
+    entry = cache.get(key)
+    if entry is None:
+        entry = price_list_entry(
+            version, _render_price_list(request).content, state["last_modified"]
+        )
+        cache.set(key, entry, settings.PRICE_LIST_CACHE_SECONDS)
+    return price_list_response(request, entry)
+
+
 @login_required
 def booking_list(request):
     """Список всех записей для администратора"""
     bookings = (
-        Booking.objects.select_related("client", "box", "washer")
+        Booking.objects.select_related("client", "box", "washer__user")
         .prefetch_related("services")
         .all()
     )
 
-    # Фильтрация
-    status_filter = request.GET.get("status")
-    if status_filter:
-        bookings = bookings.filter(status=status_filter)
+    # Фильтрация и поиск
+    bookings = filter_bookings(bookings, request.GET)
+
+    # Постраничный вывод по курсору (created_at, id)
+    try:
+        page_size = int(request.GET.get("page_size", 0))
+    except ValueError:
+        page_size = 0
+    if not 1 <= page_size <= settings.BOOKING_LIST_MAX_PAGE_SIZE:
+        page_size = settings.BOOKING_LIST_PAGE_SIZE
+    page, next_cursor, prev_cursor = keyset_page(
+        bookings,
+        page_size,
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+    )
 
-    # Поиск
-    search = request.GET.get("search")
-    if search:
-        bookings = bookings.filter(
-            Q(client__name__icontains=search) | Q(client__phone__icontains=search)
-        )
+    def page_url(**cursor):
+        params = request.GET.copy()
+        params.pop("after", None)
+        params.pop("before", None)
+        params.update(cursor)
+        return "?" + params.urlencode()
 
     context = {
-        "bookings": bookings.order_by("-created_at", "-scheduled_time"),
+        "bookings": page,
         "status_choices": Booking.STATUS_CHOICES,
+        "next_url": page_url(after=next_cursor) if next_cursor else None,
+        "prev_url": page_url(before=prev_cursor) if prev_cursor else None,
     }
     return render(request, "carwash/booking_list.html", context)
 
 
+@login_required
+def booking_export(request):
+    """Выгрузка записей с фильтрами списка (format=csv или json)"""
+    output_format = request.GET.get("format", "csv")
+    if output_format not in export.FORMATS:
+        return JsonResponse({"error": "Invalid request"}, status=400)
+    generate, content_type = export.FORMATS[output_format]
+
+    bookings = filter_bookings(Booking.objects.all(), request.GET)
+    content = generate(bookings)
+    if output_format == "csv":
+        # BOM, чтобы Excel распознал UTF-8
+        content = itertools.chain(["\ufeff"], content)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    filename = f"bookings-{timezone.localdate():%Y%m%d}.{output_format}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+async def booking_events(request):
+    """Поток событий о записях (text/event-stream) для живого обновления
+    панели управления и списка записей"""
+    if not events.is_streaming(request):
+        # Под WSGI поток занял бы рабочий процесс; ответ 204 останавливает
+        # переподключения EventSource
+        return HttpResponse(status=204)
+    try:
+        last_event_id = int(request.headers.get("Last-Event-ID", ""))
+    except ValueError:
+        last_event_id = None
+    subscription = events.broker.subscribe(last_event_id)
+    response = StreamingHttpResponse(
+        events.stream(subscription), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Отключаем буферизацию ответа в nginx
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @login_required
 def booking_create(request):
     """Создание новой записи"""
     if request.method == "POST":
         form = BookingForm(request.POST)
         if form.is_valid():
-            booking = form.save(commit=False)
-            booking.created_by = request.user
-            booking.save()
-            form.save_m2m()  # Сохраняем ManyToMany связи (услуги)
-
-            # Пересчитываем цену
-            booking.calculate_price()
-            booking.save()
-
-            messages.success(
-                request, f"Запись для {booking.client.name} успешно создана!"
-            )
-            return redirect("booking_list")
+            try:
+                booking = save_booking_form(form, created_by=request.user)
+            except ValidationError as e:
+                # Время заняли, пока форма проходила проверку
+                form.add_error(None, e)
+            else:
+                messages.success(
+                    request,
+                    f"Запись для {booking.client.name} успешно создана!",
+                )
+                return redirect("booking_list")
     else:
         form = BookingForm()
 
@@ -79,20 +243,20 @@ def booking_create(request):
 def booking_edit(request, pk):
     """Редактирование записи (назначение мойщика и изменение статуса)"""
     booking = get_object_or_404(
-        Booking.objects.prefetch_related("services"), pk=pk
+        Booking.objects.select_related("client").prefetch_related("services"),
+        pk=pk,
     )
 
     if request.method == "POST":
         form = BookingForm(request.POST, instance=booking)
         if form.is_valid():
-            booking = form.save(commit=False)
-            booking.save()
-            form.save_m2m()  # Сохраняем ManyToMany связи (услуги)
-            # Пересчитываем цену при изменении услуг
-            booking.calculate_price()
-            booking.save()
-            messages.success(request, "Запись успешно обновлена!")
-            return redirect("booking_list")
+            try:
+                save_booking_form(form)
+            except ValidationError as e:
+                form.add_error(None, e)
+            else:
+                messages.success(request, "Запись успешно обновлена!")
+                return redirect("booking_list")
     else:
         form = BookingForm(instance=booking)
 
@@ -125,72 +289,402 @@ def booking_update_status(request, pk):
 
 @login_required
 def booking_detail(request, pk):
-    """Детальная информация о записи"""
-    booking = get_object_or_404(
-        Booking.objects.select_related(
-            "client", "box", "washer", "created_by"
-        ).prefetch_related("services"),
-        pk=pk,
+    """Детальная информация о записи (в том числе архивной)"""
+    related = ("client", "box", "washer__user", "created_by")
+    booking = archive.find_booking(
+        Booking.objects.select_related(*related).prefetch_related("services"),
+        ArchivedBooking.objects.select_related(*related).prefetch_related(
+            "services"
+        ),
+        pk,
     )
+    if booking is None:
+        raise Http404("Запись не найдена")
     context = {
         "booking": booking,
+        "is_archived": isinstance(booking, ArchivedBooking),
     }
     return render(request, "carwash/booking_detail.html", context)
 
 
+@login_required
+def washer_queue(request):
+    """Ожидающие и выполняемые записи текущего мойщика (JSON).
+
+    Ответ помечается ETag по метке версии записей мойщика: при
+    совпадении If-None-Match возвращается 304 без запроса записей.
+    """
+    washer_id = (
+        Washer.objects.filter(user=request.user, is_active=True)
+        .values_list("pk", flat=True)
+        .first()
+    )
+    if washer_id is None:
+        return JsonResponse({"error": "Not a washer"}, status=403)
+
+    today = timezone.localdate()
+    # Метка читается до записей: изменение во время запроса даст новую
+    etag = queue_etag(washer_id, today)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(
+            {
+                "washer": washer_id,
+                "date": today.isoformat(),
+                "bookings": [
+                    queue_item(booking)
+                    for booking in queue_bookings(washer_id, today)
+                ],
+            }
+        )
+        response.headers["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _parse_service_ids(values):
+    """Идентификаторы услуг из GET-параметров (некорректные пропускаются)"""
+    return [int(value) for value in values if value.isdigit()]
+
+
+def price_quotes(request, prices):
+    """Ответ calculate_price по GET-параметрам и ценам услуг prices"""
+    is_regular = request.GET.get("is_regular", "false") == "true"
+    service_ids = _parse_service_ids(request.GET.getlist("services[]"))
+
+    data = price_table.quote(service_ids, is_regular, prices)
+    combos = request.GET.getlist("combo")
+    if combos:
+        data["quotes"] = []
+        for combo in combos:
+            combo_ids = _parse_service_ids(combo.split(","))
+            quote = price_table.quote(combo_ids, is_regular, prices)
+            quote["services"] = sorted(set(combo_ids))
+            data["quotes"].append(quote)
+    return data
+
+
 @login_required
 def calculate_price(request):
-    """API endpoint для расчета цены по услугам и скидке"""
+    """API endpoint для расчета цены по услугам и скидке.
+
+    Кроме набора services[] принимает несколько наборов в параметрах
+    combo (id через запятую) и возвращает их расчет в quotes, чтобы
+    форма могла заранее получить цены соседних сочетаний.
+    """
     if request.method == "GET":
-        service_ids = request.GET.getlist("services[]")
-        is_regular = request.GET.get("is_regular", "false") == "true"
+        return JsonResponse(price_quotes(request, price_table.prices()))
 
-        services = Service.objects.filter(pk__in=service_ids, is_active=True)
-        base_price = sum(service.price for service in services)
+    return JsonResponse({"error": "Invalid request"}, status=400)
 
-        discount_percent = 10 if is_regular else 0
-        if is_regular:
-            discount_amount = base_price * discount_percent / 100
-        else:
-            discount_amount = 0
-        final_price = base_price - discount_amount
 
-        return JsonResponse(
-            {
-                "base_price": float(base_price),
-                "discount_percent": discount_percent,
-                "discount_amount": float(discount_amount),
-                "final_price": float(final_price),
-            }
+@login_required
+def client_autocomplete(request):
+    """API endpoint для подсказок клиентов по началу имени или телефона"""
+    try:
+        limit = int(request.GET.get("limit", 10))
+    except ValueError:
+        return JsonResponse({"error": "Invalid request"}, status=400)
+    if not 1 <= limit <= settings.CLIENT_AUTOCOMPLETE_MAX_LIMIT:
+        return JsonResponse({"error": "Invalid request"}, status=400)
+    clients = autocomplete.suggest(request.GET.get("q", ""), limit)
+    return JsonResponse({"clients": clients})
+
+
+def _parse_aware(value):
+    """Разбор даты/времени из GET-параметра в aware datetime (или None)"""
+    try:
+        moment = parse_datetime(value or "")
+    except ValueError:
+        # Верный формат, но несуществующая дата (например, 30 февраля)
+        return None
+    if moment and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+@login_required
+def free_slots(request):
+    """API endpoint для поиска свободного времени"""
+    start = _parse_aware(request.GET.get("start"))
+    end = _parse_aware(request.GET.get("end"))
+    try:
+        duration = int(request.GET.get("duration", 60))
+        step = int(request.GET.get("step", 15))
+        box_id = int(request.GET.get("box") or 0)
+        washer_id = int(request.GET.get("washer") or 0)
+    except ValueError:
+        return JsonResponse({"error": "Invalid request"}, status=400)
+    if (
+        not start
+        or not end
+        or start >= end
+        or end - start > timedelta(days=settings.FREE_SLOTS_MAX_DAYS)
+        or not 1 <= duration <= MAX_DURATION
+        or step < settings.FREE_SLOTS_MIN_STEP
+    ):
+        return JsonResponse({"error": "Invalid request"}, status=400)
+
+    box = washer = None
+    if box_id:
+        box = get_object_or_404(Box, pk=box_id)
+    if washer_id:
+        washer = get_object_or_404(
+            Washer.objects.select_related("user"), pk=washer_id
         )
 
-    return JsonResponse({"error": "Invalid request"}, status=400)
+    slots = find_free_slots(
+        start,
+        end,
+        timedelta(minutes=duration),
+        box=box,
+        washer=washer,
+        step=timedelta(minutes=step),
+        limit=settings.FREE_SLOTS_MAX_RESULTS + 1,
+    )
+    # Лишний слот показывает, что список обрезан
+    truncated = len(slots) > settings.FREE_SLOTS_MAX_RESULTS
+    return JsonResponse(
+        {
+            "slots": [
+                {
+                    "box": slot["box"].pk,
+                    "washer": slot["washer"].pk if slot["washer"] else None,
+                    "start": timezone.localtime(slot["start"]).isoformat(),
+                }
+                for slot in slots[: settings.FREE_SLOTS_MAX_RESULTS]
+            ],
+            "truncated": truncated,
+        }
+    )
+
+
+def dashboard_queries(today):
+    """Запросы панели управления за местные сутки today.
+
+    Возвращает (записи для счетчиков, их агрегаты, активные боксы,
+    активные мойщики, записи на сегодня, ближайшие ожидающие записи).
+    """
+    day_start, day_end = day_bounds(today)
+    now = timezone.now()
+    is_today = Q(scheduled_time__gte=day_start, scheduled_time__lt=day_end)
+    is_upcoming = Q(status="pending", scheduled_time__gte=now)
+
+    # Все счетчики записей - одним запросом по диапазону времени,
+    # который обслуживается индексом (в отличие от scheduled_time__date)
+    counters = {
+        "today": Count("pk", filter=is_today),
+        "today_pending": Count("pk", filter=is_today & Q(status="pending")),
+        "today_in_progress": Count(
+            "pk", filter=is_today & Q(status="in_progress")
+        ),
+        "today_completed": Count("pk", filter=is_today & Q(status="completed")),
+        "pending": Count("pk", filter=is_upcoming),
+    }
+    related = ("client", "box", "washer__user")
+    return (
+        Booking.objects.filter(is_today | is_upcoming),
+        counters,
+        Box.objects.filter(is_active=True),
+        Washer.objects.filter(is_active=True),
+        Booking.objects.filter(is_today).select_related(*related),
+        Booking.objects.filter(is_upcoming)
+        .select_related(*related)
+        .order_by("scheduled_time")[:10],
+    )
+
+
+def dashboard_context(counters, boxes, washers, today_bookings, pending):
+    return {
+        "counters": {
+            **counters,
+            "active_boxes": boxes,
+            "active_washers": washers,
+        },
+        "today_bookings": today_bookings,
+        "pending_bookings": pending,
+    }
+
+
+def dashboard_cache_key(today):
+    return f"carwash:dashboard:{today.isoformat()}"
+
+
+def _dashboard_data(today):
+    """Счетчики и списки панели управления за местные сутки today"""
+    bookings, counters, boxes, washers, today_bookings, pending = (
+        dashboard_queries(today)
+    )
+    return dashboard_context(
+        bookings.aggregate(**counters),
+        boxes.count(),
+        washers.count(),
+        list(today_bookings),
+        list(pending),
+    )
 
 
 @login_required
 def dashboard(request):
-    """Панель управления администратора"""
-    today = timezone.now().date()
+    """Панель управления администратора.
+
+    Данные на текущую дату кешируются на DASHBOARD_CACHE_SECONDS, чтобы
+    одновременно обновляемые вкладки не умножали нагрузку на БД.
+    """
+    today = timezone.localdate()
+    key = dashboard_cache_key(today)
+    context = cache.get(key)
+    if context is None:
+        context = _dashboard_data(today)
+        cache.set(key, context, settings.DASHBOARD_CACHE_SECONDS)
+    return render(
+        request, "carwash/dashboard.html", {**context, "today": today}
+    )
 
-    today_bookings = Booking.objects.filter(
-        scheduled_time__date=today
-    ).select_related("client", "box", "washer")
 
-    pending_bookings = (
-        Booking.objects.filter(
-            status="pending", scheduled_time__gte=timezone.now()
-        )
-        .select_related("client", "box")
-        .order_by("scheduled_time")[:10]
+@login_required
+def reports(request):
+    """Отчет о выручке и загрузке за период по ежедневным сводкам"""
+    today = timezone.localdate()
+    try:
+        date_from = parse_date(request.GET.get("date_from") or "")
+        date_to = parse_date(request.GET.get("date_to") or "")
+    except ValueError:
+        # Несуществующая дата в верном формате, например 2024-02-30
+        span = -1
+    else:
+        date_from = date_from or today.replace(day=1)
+        date_to = date_to or today
+        span = (date_to - date_from).days
+    if not 0 <= span < settings.ANALYTICS_MAX_DAYS:
+        messages.error(request, "Неверный период")
+        return redirect("reports")
+
+    data = report(date_from, date_to)
+    boxes = Box.objects.in_bulk([row["box"] for row in data["boxes"]])
+    washers = Washer.objects.select_related("user").in_bulk(
+        [row["washer"] for row in data["washers"] if row["washer"]]
     )
+    for row in data["boxes"]:
+        row["box"] = boxes.get(row["box"])
+    for row in data["washers"]:
+        row["washer"] = washers.get(row["washer"])
+
+    context = {**data, "date_from": date_from, "date_to": date_to}
+    return render(request, "carwash/reports.html", context)
+
+
+WEEKDAYS = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
 
-    active_washers = Washer.objects.filter(is_active=True)
-    active_boxes = Box.objects.filter(is_active=True)
 
+def _parse_period(request, default_days):
+    """Период отчета из GET-параметров date_from и date_to"""
+    today = timezone.localdate()
+    try:
+        date_from = parse_date(request.GET.get("date_from") or "")
+        date_to = parse_date(request.GET.get("date_to") or "") or today
+    except ValueError:
+        return None, None
+    date_from = date_from or date_to - timedelta(days=default_days - 1)
+    if not 0 <= (date_to - date_from).days < settings.ANALYTICS_MAX_DAYS:
+        return None, None
+    return date_from, date_to
+
+
+@login_required
+def occupancy_api(request):
+    """API endpoint загрузки боксов по 15-минутным интервалам.
+
+    profile - доля дней, когда бокс занят, по дню недели и интервалу
+    суток; с параметром matrix=1 добавляется полная матрица
+    бокс x интервал периода.
+    """
+    # NumPy нужен только аналитике
+    from . import analytics
+
+    date_from, date_to = _parse_period(request, default_days=28)
+    if date_from is None:
+        return JsonResponse({"error": "Invalid request"}, status=400)
+
+    data = analytics.occupancy(date_from, date_to)
+    result = {
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+        "bin_minutes": analytics.BIN_MINUTES,
+        "slots": analytics.slot_labels(),
+        "weekdays": WEEKDAYS,
+        "boxes": [{"id": box.pk, "name": str(box)} for box in data["boxes"]],
+        "profile": data["profile"].round(3).tolist(),
+        "saturation": data["saturation"].round(3).tolist(),
+    }
+    if request.GET.get("matrix") == "1":
+        result["matrix"] = data["matrix"].tolist()
+    return JsonResponse(result)
+
+
+@login_required
+def occupancy_report(request):
+    """Тепловая карта загрузки боксов по дням недели и часам"""
+    from . import analytics
+
+    date_from, date_to = _parse_period(request, default_days=28)
+    if date_from is None:
+        messages.error(request, "Неверный период")
+        return redirect("occupancy_report")
+
+    data = analytics.occupancy(date_from, date_to)
+    # Средняя доля занятых боксов по часам
+    hourly = data["saturation"].reshape(7, 24, -1).mean(axis=2)
+    rows = [
+        (weekday, [(round(value * 100), f"{value:.2f}") for value in values])
+        for weekday, values in zip(WEEKDAYS, hourly.tolist())
+    ]
     context = {
-        "today_bookings": today_bookings,
-        "pending_bookings": pending_bookings,
-        "active_washers": active_washers,
-        "active_boxes": active_boxes,
+        "date_from": date_from,
+        "date_to": date_to,
+        "hours": range(24),
+        "rows": rows,
+        "boxes": data["boxes"],
+    }
+    return render(request, "carwash/occupancy.html", context)
+
+
+def _washer_stats_row(row):
+    return {
+        "id": row["washer"].pk,
+        "name": str(row["washer"]),
+        "is_active": row["washer"].is_active,
+        **{metric: row[metric] for metric in METRICS if metric != "revenue"},
+        "revenue": float(row["revenue"]),
+    }
+
+
+@login_required
+def washer_stats_api(request):
+    """API endpoint показателей мойщиков за период"""
+    date_from, date_to = _parse_period(request, default_days=28)
+    if date_from is None:
+        return JsonResponse({"error": "Invalid request"}, status=400)
+    rows = washer_stats(date_from, date_to)
+    return JsonResponse(
+        {
+            "date_from": date_from.isoformat(),
+            "date_to": date_to.isoformat(),
+            "washers": [_washer_stats_row(row) for row in rows],
+        }
+    )
+
+
+@login_required
+def washer_stats_report(request):
+    """Страница показателей мойщиков за период"""
+    date_from, date_to = _parse_period(request, default_days=28)
+    if date_from is None:
+        messages.error(request, "Неверный период")
+        return redirect("washer_stats_report")
+    context = {
+        "date_from": date_from,
+        "date_to": date_to,
+        "rows": washer_stats(date_from, date_to),
     }
-    return render(request, "carwash/dashboard.html", context)
+    return render(request, "carwash/washer_stats.html", context)
@@ -0,0 +1,57 @@
+"""Очередь записей мойщика для мобильного клиента.
+
+Очередь - ожидающие записи мойщика начиная с текущих местных суток и
+все выполняемые, в том числе начатые до полуночи. Состав очереди
+зависит только от записей и даты, поэтому ETag строится из метки
+версии "washer:<id>" и даты: метку меняют сигналы при любом изменении
+записей мойщика и имени или телефона их клиентов (signals.py), а также
+импорт через rollups.apply. Метки общие для всех процессов, поэтому
+повторный запрос с той же меткой получает 304 без запроса записей.
+"""
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.cache import quote_etag
+
+from .availability import day_bounds
+from .models import ACTIVE_STATUSES, Booking
+from .stats import washer_version_name
+from .versions import get_version
+
+
+def queue_etag(washer_id, today):
+    """ETag очереди мойщика на местную дату today"""
+    version = get_version(washer_version_name(washer_id))
+    return quote_etag(f"{version}:{today.isoformat()}")
+
+
+def queue_bookings(washer_id, today):
+    """Записи очереди мойщика по времени начала"""
+    limit = getattr(settings, "WASHER_QUEUE_SIZE", 50)
+    return (
+        Booking.objects.filter(washer_id=washer_id, status__in=ACTIVE_STATUSES)
+        .filter(
+            Q(scheduled_time__gte=day_bounds(today)[0])
+            | Q(status="in_progress")
+        )
+        .select_related("client", "box")
+        .prefetch_related("services")
+        .order_by("scheduled_time", "pk")[:limit]
+    )
+
+
+def queue_item(booking):
+    return {
+        "id": booking.pk,
+        "status": booking.status,
+        "status_display": booking.get_status_display(),
+        "scheduled_time": timezone.localtime(booking.scheduled_time).isoformat(),
+        "end_time": timezone.localtime(booking.end_time).isoformat(),
+        "duration_minutes": booking.duration_minutes,
+        "box": str(booking.box),
+        "client_name": booking.client.name,
+        "client_phone": booking.client.phone,
+        "services": [service.name for service in booking.services.all()],
+        "notes": booking.notes,
+    }
@@ -1,7 +1,30 @@
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "wash.settings")
 
-application = get_asgi_application()
+ASGI_URLCONF = "wash.asgi_urls"
+
+
+class CarwashASGIHandler(ASGIHandler):
+    """ASGI-обработчик с асинхронными страницами только для чтения"""
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = ASGI_URLCONF
+        return request, error_response
+
+
+def get_application():
+    django.setup(set_prefix=False)
+    return CarwashASGIHandler()
+
+
+# Поток событий о записях (/bookings/events/) держит соединения
+# открытыми, поэтому приложение запускается ASGI-сервером, например:
+#   uvicorn wash.asgi:application
+# Брокер событий работает в памяти процесса (см. carwash/events.py).
+application = get_application()
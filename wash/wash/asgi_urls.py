@@ -0,0 +1,22 @@
+"""URL-схема для запуска под ASGI.
+
+Страницы только для чтения обслуживаются асинхронными представлениями
+(carwash/async_views.py), остальные маршруты - те же, что в wash.urls.
+"""
+
+from django.urls import path
+
+from carwash import async_views
+
+from .urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = [
+    path("", async_views.price_list, name="price_list"),
+    path("dashboard/", async_views.dashboard, name="dashboard"),
+    path(
+        "api/calculate-price/",
+        async_views.calculate_price,
+        name="calculate_price",
+    ),
+    *wsgi_urlpatterns,
+]
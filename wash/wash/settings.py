@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,6 +51,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "carwash.context_processors.live_updates",
             ],
         },
     },
@@ -65,6 +67,16 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # SQLite не поддерживает SELECT ... FOR UPDATE: транзакции сразу
+        # берут блокировку на запись, чтобы проверка конфликтов и
+        # сохранение записи не перемежались между соединениями
+        "OPTIONS": {
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+        },
+        # Тестовая БД в файле: in-memory БД с общим кешем не ждет
+        # освобождения блокировок, что ломает многопоточные тесты
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
@@ -118,3 +130,81 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Кеш данных - в памяти процесса; метки версий (carwash/versions.py) -
+# в общем для всех процессов файловом кеше рядом с БД: веб-процессы и
+# команды управления работают с одной SQLite на одной машине и должны
+# видеть изменения меток друг друга. Каталог меток можно задать
+# переменной окружения WASH_VERSIONS_CACHE_DIR; тесты подменяют его
+# временным (carwash/tests/runner.py)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "versions": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "WASH_VERSIONS_CACHE_DIR", BASE_DIR / "cache" / "versions"
+        ),
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 100_000},
+    },
+}
+
+TEST_RUNNER = "carwash.tests.runner.TestRunner"
+
+# Как часто (в секундах) индекс занятости в памяти процесса сверяет
+# версию загруженного дня с БД
+AVAILABILITY_VERSION_TTL = 2
+
+# Сколько дней индекс занятости держит в памяти (давно не использованные
+# вытесняются; прошедшие дни, кроме вчерашнего, не хранятся)
+AVAILABILITY_MAX_DAYS = 62
+
+# Время хранения прайс-листа в кеше (в секундах); кеш также
+# сбрасывается при любом изменении услуг
+PRICE_LIST_CACHE_SECONDS = 24 * 60 * 60
+
+# Время хранения данных панели управления в кеше (в секундах)
+DASHBOARD_CACHE_SECONDS = 5
+
+# Поиск свободного времени (/api/free-slots/): наибольшая длина окна
+# (в днях), наименьший шаг сетки (в минутах) и наибольшее число слотов
+# в ответе
+FREE_SLOTS_MAX_DAYS = 14
+FREE_SLOTS_MIN_STEP = 5
+FREE_SLOTS_MAX_RESULTS = 500
+
+# Максимальная длина периода аналитики загрузки (в днях)
+ANALYTICS_MAX_DAYS = 366
+
+# Продолжительность рабочего дня мойщика (в минутах) для расчета
+# простоя и время хранения показателей мойщиков в кеше (в секундах;
+# кеш также сбрасывается при изменении записей мойщика)
+WASHER_WORKDAY_MINUTES = 12 * 60
+WASHER_STATS_CACHE_SECONDS = 24 * 60 * 60
+
+# Наибольшее число записей в очереди мойщика (/api/washer/queue/)
+WASHER_QUEUE_SIZE = 50
+
+# Поток событий о записях (SSE): интервал keepalive (в секундах),
+# число последних событий для переподключившихся клиентов и размер
+# очереди одного соединения
+BOOKING_EVENTS_KEEPALIVE = 15
+BOOKING_EVENTS_HISTORY = 200
+BOOKING_EVENTS_QUEUE_SIZE = 500
+
+# Размер страницы списка записей (можно изменить параметром page_size
+# в пределах BOOKING_LIST_MAX_PAGE_SIZE)
+BOOKING_LIST_PAGE_SIZE = 50
+BOOKING_LIST_MAX_PAGE_SIZE = 500
+
+# Завершенные и отмененные записи старше стольких дней (считая от начала
+# суток) команда archive_bookings переносит в архив
+BOOKING_ARCHIVE_AFTER_DAYS = 31
+
+# Подсказки клиентов: число запросов в LRU-кеше процесса и
+# максимальное число подсказок в ответе
+CLIENT_AUTOCOMPLETE_CACHE_SIZE = 256
+CLIENT_AUTOCOMPLETE_MAX_LIMIT = 50